@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Encode/decode speed and size: JSON envelopes vs the binary codec.
+
+Usage:
+    python benchmarks/bench_codec.py [--iterations 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numbers_game.network.protocol import decode_message, encode_message
+
+MESSAGES = [
+    ('GUESS', '98765'),
+    ('RESULT', {'guess': '98765', 'count': 4, 'place': 2}),
+    ('START', 5),
+]
+
+
+def ops_per_sec(fn, iterations: int) -> float:
+    """Run fn `iterations` times and return calls per second."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200_000)
+    args = parser.parse_args()
+    
+    print(f"{'Message':<10}{'Codec':<8}{'Bytes':>7}{'Encode/s':>14}{'Decode/s':>14}")
+    for msg_type, data in MESSAGES:
+        for name, binary in (('json', False), ('binary', True)):
+            frame = encode_message(msg_type, data, framed=True, binary=binary)
+            payload = memoryview(frame)[4:]
+            enc = ops_per_sec(lambda: encode_message(msg_type, data, framed=True, binary=binary), args.iterations)
+            dec = ops_per_sec(lambda: decode_message(payload), args.iterations)
+            print(f"{msg_type:<10}{name:<8}{len(frame):>7}{enc:>14,.0f}{dec:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
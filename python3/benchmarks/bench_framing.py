@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Loopback throughput: legacy "|||" string framing vs length-prefixed frames.
+
+Usage:
+    python benchmarks/bench_framing.py [--messages 200000]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numbers_game.network.framing import FrameBuffer
+from numbers_game.network.protocol import encode_message
+
+
+def tcp_pair():
+    """Return a connected (sender, receiver) pair over loopback TCP."""
+    listener = socket.create_server(('127.0.0.1', 0))
+    sender = socket.create_connection(listener.getsockname())
+    receiver, _ = listener.accept()
+    listener.close()
+    return sender, receiver
+
+
+def receive_legacy(sock: socket.socket, expected: int) -> int:
+    """The pre-framing receive loop (decode, concatenate, split) at the same read size."""
+    buffer = ""
+    count = 0
+    while count < expected:
+        data = sock.recv(65536)
+        if not data:
+            break
+        buffer += data.decode('utf-8')
+        while "|||" in buffer:
+            msg_str, buffer = buffer.split("|||", 1)
+            if msg_str:
+                json.loads(msg_str)
+                count += 1
+    return count
+
+
+def receive_framed(sock: socket.socket, expected: int) -> int:
+    """The FrameBuffer receive loop."""
+    buffer = FrameBuffer()
+    count = 0
+    while count < expected:
+        if not buffer.recv_into(sock):
+            break
+        for payload in buffer.messages():
+            json.loads(bytes(payload))
+            count += 1
+    return count
+
+
+def parse_backlog(framed: bool, messages: int) -> float:
+    """Parse `messages` already-received messages held in one buffer."""
+    packet = encode_message('GUESS', '12345', framed=framed)
+    data = packet * messages
+    start = time.perf_counter()
+    if framed:
+        buffer = FrameBuffer()
+        buffer.feed(data)
+        count = len(buffer.messages())
+    else:
+        buffer = data.decode('utf-8')
+        count = 0
+        while "|||" in buffer:
+            msg_str, buffer = buffer.split("|||", 1)
+            count += 1
+    assert count == messages
+    return time.perf_counter() - start
+
+
+def run(framed: bool, messages: int, burst: int) -> float:
+    """Send `messages` GUESS messages and return the receive time."""
+    packet = encode_message('GUESS', '12345', framed=framed) * burst
+    sender, receiver = tcp_pair()
+    
+    def send_all():
+        for _ in range(messages // burst):
+            sender.sendall(packet)
+            
+    thread = threading.Thread(target=send_all)
+    start = time.perf_counter()
+    thread.start()
+    receive = receive_framed if framed else receive_legacy
+    got = receive(receiver, messages // burst * burst)
+    elapsed = time.perf_counter() - start
+    thread.join()
+    sender.close()
+    receiver.close()
+    assert got == messages // burst * burst
+    return elapsed
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=200_000)
+    args = parser.parse_args()
+    
+    print(f"{args.messages} messages over loopback TCP")
+    print(f"{'Framing':<12}{'Burst':>8}{'Msgs/s':>14}")
+    for burst in (1, 100, 1000):
+        for name, framed in (('legacy', False), ('frames', True)):
+            elapsed = run(framed, args.messages, burst)
+            print(f"{name:<12}{burst:>8}{args.messages / elapsed:>14,.0f}")
+            
+    print("\nSplitting a backlog already in the buffer (no JSON decode)")
+    print(f"{'Framing':<12}{'Backlog':>8}{'Time (ms)':>14}")
+    for backlog in (1_000, 10_000, 50_000):
+        for name, framed in (('legacy', False), ('frames', True)):
+            elapsed = parse_backlog(framed, backlog)
+            print(f"{name:<12}{backlog:>8}{elapsed * 1000:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
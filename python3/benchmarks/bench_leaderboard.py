@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent score writers: shared file vs leaderboard service.
+
+Each client process adds scores and reads a leaderboard page after every
+add, like a game showing the board after a win. In file mode every
+process loads and rewrites the scores file itself; in service mode they
+share one LeaderboardService over reused localhost connections.
+
+Usage:
+    python benchmarks/bench_leaderboard.py [--clients 8] [--adds 100]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numbers_game.core.high_scores import add_score, get_leaderboard_page, load_scores, use_service
+from numbers_game.core.leaderboard_service import LeaderboardService
+
+# Large enough that no score falls off the board, so lost writes show
+LIMIT = 1_000_000
+
+
+def client(filepath: str, address: str, index: int, adds: int) -> None:
+    """Add `adds` scores, reading a page after each (runs in a child process)."""
+    if address:
+        use_service(address, filepath)
+    for i in range(adds):
+        add_score(f'client{index}', 1 + i % 40, 0, i % 100, 4, filepath, limit=LIMIT)
+        get_leaderboard_page(4, 1, 10, filepath)
+
+
+def run(filepath: str, address: str, clients: int, adds: int) -> float:
+    """Run every client at once and return the wall time."""
+    procs = [
+        multiprocessing.Process(target=client, args=(filepath, address, i, adds))
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--adds', type=int, default=100, help="scores added per client")
+    args = parser.parse_args()
+    expected = args.clients * args.adds
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'file.dat')
+        elapsed = run(path, '', args.clients, args.adds)
+        rows.append(('file', elapsed, len(load_scores(path)['4'])))
+        
+        path = os.path.join(tmp, 'service.dat')
+        service = LeaderboardService(path, port=0, limit=LIMIT)
+        host, port = service.start()
+        try:
+            elapsed = run(path, f'{host}:{port}', args.clients, args.adds)
+        finally:
+            service.stop()
+        rows.append(('service', elapsed, len(load_scores(path)['4'])))
+        writes = service.writes
+        
+    print(f"{args.clients} clients x {args.adds} adds (+ a page read after each)")
+    print(f"{'Mode':<10}{'Time (s)':>10}{'Adds/s':>10}{'Kept':>10}{'Lost':>8}")
+    for name, elapsed, kept in rows:
+        print(f"{name:<10}{elapsed:>10.2f}{expected / elapsed:>10.0f}{kept:>10}{expected - kept:>8}")
+    print(f"service disk writes: {writes} for {expected} adds")
+
+
+if __name__ == '__main__':
+    main()
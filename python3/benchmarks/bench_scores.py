@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark loading and saving high scores: legacy JSON vs binary format.
+
+Usage:
+    python benchmarks/bench_scores.py [--entries 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numbers_game.core.high_scores import load_scores, save_scores
+
+
+def make_scores(count: int, players: int = 500) -> dict:
+    """Generate a synthetic scores dictionary."""
+    rng = random.Random(42)
+    scores = {'4': [], '5': [], '6': []}
+    for i in range(count):
+        difficulty = 4 + i % 3
+        scores[str(difficulty)].append({
+            'player_name': f'player{rng.randrange(players)}',
+            'tries': rng.randint(1, 40),
+            'hints_used': rng.randint(0, 5),
+            'score': rng.randint(1, 100),
+            'difficulty': difficulty,
+            'date': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:{rng.randint(0, 59):02d}',
+        })
+    return scores
+
+
+def timed(fn, repeat: int) -> float:
+    """Return the best wall time of `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    scores = make_scores(args.entries)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'scores.json')
+        bin_path = os.path.join(tmp, 'scores.dat')
+        
+        def save_json():
+            with open(json_path, 'w') as f:
+                json.dump(scores, f, indent=2)
+                
+        def load_json():
+            with open(json_path) as f:
+                json.load(f)
+                
+        rows = [
+            ('JSON (indent=2)', timed(save_json, args.repeat), timed(load_json, args.repeat), json_path),
+            ('binary', timed(lambda: save_scores(scores, bin_path), args.repeat),
+             timed(lambda: load_scores(bin_path), args.repeat), bin_path),
+        ]
+        
+        print(f"{args.entries} entries")
+        print(f"{'Format':<18}{'Save (ms)':>12}{'Load (ms)':>12}{'Size (KB)':>12}")
+        for name, save_t, load_t, path in rows:
+            print(f"{name:<18}{save_t * 1000:>12.1f}{load_t * 1000:>12.1f}{os.path.getsize(path) / 1024:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,12 +7,20 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from ttkbootstrap.scrolled import ScrolledText
 from ttkbootstrap.dialogs import Messagebox
-from tkinter import simpledialog
-from typing import Any, Optional
-from numbers_game.core import GameEngine as NumGame, DEFAULT_DIGIT_COUNT
+import os
+import threading
+from tkinter import Listbox, simpledialog
+from typing import Any, Optional, Tuple
+from numbers_game.core import GameEngine as NumGame, DEFAULT_DIGIT_COUNT, compare_numbers
 from numbers_game.utils import get_help_string
-from numbers_game.core import add_score, display_leaderboard
+from numbers_game.core import ScoreWriter, display_leaderboard
+from numbers_game.core.high_scores import SCORES_FILE, LeaderboardIndex, use_service
+from numbers_game.core.leaderboard_service import LeaderboardFeed, parse_address
+from numbers_game.core.ratings import DRAW, LOSS, WIN, RatingStore, display_ratings, ratings_path
 from numbers_game.network import NetworkManager, NetworkCallbacks
+from numbers_game.network.dispatch import CallbackQueue
+from numbers_game.network.protocol import CAP_SCORING
+from numbers_game.network.tk_pump import TkNetworkPump
 
 
 class NumbersGameGUI(ttk.Frame):
@@ -42,6 +50,9 @@ class NumbersGameGUI(ttk.Frame):
         # Online mode state
         self.online_mode = False
         self.network: Optional[NetworkManager] = None
+        self.network_pump: Optional[TkNetworkPump] = None
+        # Pending after() id of the network status refresh, so only one runs
+        self._status_after: Optional[str] = None
         self.is_host = False
         self.opponent_name = "Opponent"
         self.my_online_secret: Optional[int] = None
@@ -51,8 +62,32 @@ class NumbersGameGUI(ttk.Frame):
         # Theme state
         self.dark_mode = False
         
+        # Results from background threads are handed over in batches
+        self.dispatcher = CallbackQueue(lambda fn: self.after(0, fn))
+        leaderboard = os.environ.get('NUMBERS_GAME_LEADERBOARD')
+        self.leaderboard_feed: Optional[LeaderboardFeed] = None
+        if leaderboard:
+            # e.g. NUMBERS_GAME_LEADERBOARD=127.0.0.1:5556 to share one board
+            # between several games on this machine; new scores are pushed
+            # to us as they land
+            use_service(leaderboard)
+            self.leaderboard_feed = LeaderboardFeed(
+                *parse_address(leaderboard),
+                on_change=lambda d, board, delta: self.dispatcher.post(self._on_leaderboard_change, d, delta),
+            )
+        self.score_writer = ScoreWriter(dispatch=self.dispatcher.post)
+        # Name the single player last entered; only offered as the default
+        # when a name is asked for, never recorded without asking
+        self.player_name: Optional[str] = None
+        # Elo ratings from 2-player and online matches
+        self.ratings = RatingStore(ratings_path(SCORES_FILE))
+        
+        # Log areas needing a scroll to the end; flushed once per burst
+        self._scroll_pending: set = set()
+        
         self.pack(fill=BOTH, expand=True)
         self.init_window()
+        self.master.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def init_window(self) -> None:
         """Set up the main window layout."""
@@ -64,6 +99,7 @@ class NumbersGameGUI(ttk.Frame):
         self._create_controls()
         self._create_log_area()
         self._create_input_area()
+        self._create_status_bar()
         
         self._log(get_help_string(self.digit_count))
         self._log("\n" + "═" * 50)
@@ -273,6 +309,34 @@ class NumbersGameGUI(ttk.Frame):
             width=12
         ).pack(side=LEFT)
 
+    def _create_status_bar(self) -> None:
+        """Create the status bar showing connection quality."""
+        self.status_label = ttk.Label(
+            self,
+            text="",
+            font=("Segoe UI", 9),
+            bootstyle="secondary"
+        )
+        self.status_label.pack(fill=X, side=BOTTOM, pady=(5, 0))
+
+    def _refresh_network_status(self) -> None:
+        """Show round-trip time and send queue while online (repeats every second)."""
+        self._cancel_network_status()
+        if not (self.network and self.network.connected):
+            self.status_label.config(text="🔄 Reconnecting..." if self.network and self.network.resuming else "")
+            return
+        outbox = self.network.outbox
+        self.status_label.config(
+            text=f"🌐 {self.network.rtt.summary()} · queue {outbox.depth} · {outbox.bytes_per_sec:.0f} B/s"
+        )
+        self._status_after = self.after(1000, self._refresh_network_status)
+
+    def _cancel_network_status(self) -> None:
+        """Cancel the pending network status refresh, if any."""
+        if self._status_after is not None:
+            self.after_cancel(self._status_after)
+            self._status_after = None
+
     def _log(self, message: str, player: int = 0) -> None:
         """Add a message to the log area.
         
@@ -283,19 +347,27 @@ class NumbersGameGUI(ttk.Frame):
         if self.two_player_mode and hasattr(self, 'p1_log_area'):
             if player == 0:
                 # Log to both players
-                self.p1_log_area.insert(END, message + "\n")
-                self.p1_log_area.see(END)
-                self.p2_log_area.insert(END, message + "\n")
-                self.p2_log_area.see(END)
+                areas = (self.p1_log_area, self.p2_log_area)
             elif player == 1:
-                self.p1_log_area.insert(END, message + "\n")
-                self.p1_log_area.see(END)
+                areas = (self.p1_log_area,)
             elif player == 2:
-                self.p2_log_area.insert(END, message + "\n")
-                self.p2_log_area.see(END)
+                areas = (self.p2_log_area,)
+            else:
+                areas = ()
         else:
-            self.log_area.insert(END, message + "\n")
-            self.log_area.see(END)
+            areas = (self.log_area,)
+        for area in areas:
+            area.insert(END, message + "\n")
+        # Scrolling forces a redraw, so a burst of lines scrolls once at idle
+        if areas and not self._scroll_pending:
+            self.after_idle(self._flush_scroll)
+        self._scroll_pending.update(areas)
+        
+    def _flush_scroll(self) -> None:
+        """Scroll every log area written since the last flush to the end."""
+        for area in self._scroll_pending:
+            area.see(END)
+        self._scroll_pending.clear()
 
     def _switch_to_split_view(self) -> None:
         """Switch to split-screen view for 2-player mode."""
@@ -346,8 +418,7 @@ class NumbersGameGUI(ttk.Frame):
         
         # Disconnect existing network if switching away from Online
         if self.network and not self.online_mode:
-            self.network.disconnect()
-            self.network = None
+            self._close_network()
             
         if self.online_mode:
             self._setup_online_game()
@@ -374,14 +445,22 @@ class NumbersGameGUI(ttk.Frame):
         self.online_p2_ready = False
         self.my_online_secret = None
         
-        # Initialize network manager with callbacks
+        # Initialize network manager with callbacks; I/O is pumped from the
+        # Tk event loop, so callbacks already run on the main thread
         callbacks = NetworkCallbacks(
-            on_message=self._on_network_message,
-            on_connected=self._on_network_connected,
-            on_disconnected=self._on_network_disconnected
+            on_message=self._handle_network_message,
+            on_connected=self._handle_connected,
+            on_disconnected=self._handle_disconnected,
+            on_reconnecting=self._handle_reconnecting,
+            on_resumed=self._handle_resumed
         )
-        self.network = NetworkManager(callbacks)
-        
+        self.network = NetworkManager(callbacks, threaded=False)
+        self.network_pump = TkNetworkPump(self, self.network)
+        metrics_file = os.environ.get('NUMBERS_GAME_METRICS')
+        if metrics_file:
+            # e.g. NUMBERS_GAME_METRICS=network.jsonl
+            self.network.metrics.start_dump(metrics_file)
+            
         # Show Host/Join dialog
         dialog = ttk.Toplevel(self.master)
         dialog.title("🌐 Online Mode")
@@ -435,6 +514,7 @@ class NumbersGameGUI(ttk.Frame):
         success, info = self.network.host_game()
         
         if success:
+            self.network_pump.start()
             self.is_host = True
             self._switch_to_single_view()
             self._log(f"🌐 Hosting game on: {info}")
@@ -448,21 +528,19 @@ class NumbersGameGUI(ttk.Frame):
             
     def _join_game(self) -> None:
         """Join a hosted game."""
-        ip = simpledialog.askstring(
-            "Join Game",
-            "Enter Host IP Address:",
-            parent=self.master
-        )
+        address = self._ask_host_address()
         
-        if not ip:
+        if not address:
             self.mode_var.set("1 Player")
             self.online_mode = False
             self.new_game()
             return
             
-        success, info = self.network.join_game(ip.strip())
+        ip, port = address
+        success, info = self.network.join_game(ip, port)
         
         if success:
+            self.network_pump.start()
             self.is_host = False
             self._switch_to_single_view()
             self._log(f"🌐 Connecting to {ip}...")
@@ -472,15 +550,74 @@ class NumbersGameGUI(ttk.Frame):
             self.online_mode = False
             self.new_game()
             
-    def _on_network_connected(self, message: str) -> None:
-        """Handle successful network connection (called from network thread)."""
-        # Use after() for thread safety
-        self.after(0, lambda: self._handle_connected(message))
+    def _ask_host_address(self) -> Optional[Tuple[str, int]]:
+        """Let the player pick a game found on the LAN or type an address."""
+        dialog = ttk.Toplevel(self.master)
+        dialog.title("🔗 Join Game")
+        dialog.geometry("360x340")
+        dialog.transient(self.master)
+        dialog.grab_set()
+        
+        ttk.Label(dialog, text="Games on your network:", font=("Segoe UI", 11, "bold")).pack(pady=(12, 4))
+        host_list = Listbox(dialog, height=6, font=("Segoe UI", 10))
+        host_list.pack(padx=15, fill=X)
+        status_label = ttk.Label(dialog, text="", bootstyle="secondary")
+        status_label.pack(pady=2)
+        
+        ttk.Label(dialog, text="Or enter the host's IP address:").pack(pady=(8, 2))
+        ip_entry = ttk.Entry(dialog, width=22)
+        ip_entry.pack()
+        
+        hosts = []
+        result = [None]
+        
+        def show_hosts(found) -> None:
+            if not dialog.winfo_exists():
+                return
+            hosts[:] = found
+            host_list.delete(0, END)
+            for host in found:
+                host_list.insert(END, host.label)
+            status_label.config(text=f"Found {len(found)} game(s)" if found else "No games found")
+            
+        def browse(refresh: bool = False) -> None:
+            # Probing waits for answers, so it runs off the Tk thread
+            status_label.config(text="🔍 Searching...")
+            network = self.network
+            threading.Thread(
+                target=lambda: self.dispatcher.post(show_hosts, network.browse_hosts(refresh=refresh)),
+                daemon=True
+            ).start()
+            
+        def submit() -> None:
+            selection = host_list.curselection()
+            typed = ip_entry.get().strip()
+            if typed:
+                result[0] = (typed, NetworkManager.DEFAULT_PORT)
+            elif selection:
+                host = hosts[selection[0]]
+                result[0] = (host.address, host.port)
+            else:
+                return
+            dialog.destroy()
+            
+        host_list.bind("<Double-Button-1>", lambda e: submit())
+        ip_entry.bind("<Return>", lambda e: submit())
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.pack(pady=12)
+        ttk.Button(btn_frame, text="🔄 Refresh", command=lambda: browse(True), bootstyle="secondary").pack(side=LEFT, padx=5)
+        ttk.Button(btn_frame, text="Join", command=submit, bootstyle="success").pack(side=LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=dialog.destroy, bootstyle="secondary-outline").pack(side=LEFT, padx=5)
         
+        browse()
+        self.master.wait_window(dialog)
+        return result[0]
+            
     def _handle_connected(self, message: str) -> None:
         """Process connection on main thread."""
         self._log(f"✅ {message}")
         self.master.title("Numbers Game - Online Connected")
+        self._refresh_network_status()
         
         # Get player name
         name = simpledialog.askstring(
@@ -497,9 +634,16 @@ class NumbersGameGUI(ttk.Frame):
         # Send name to opponent
         self.network.send("NAME", name)
         
-    def _on_network_disconnected(self, reason: str) -> None:
-        """Handle network disconnection (called from network thread)."""
-        self.after(0, lambda: self._handle_disconnected(reason))
+    def _handle_reconnecting(self, reason: str) -> None:
+        """Report a dropped connection that is being resumed."""
+        self._log(f"⚠️ {reason} - reconnecting...")
+        self.master.title("Numbers Game - Reconnecting...")
+        
+    def _handle_resumed(self, message: str) -> None:
+        """Report a resumed connection."""
+        self._log(f"✅ {message}")
+        self.master.title("Numbers Game - Online Connected")
+        self._refresh_network_status()
         
     def _handle_disconnected(self, reason: str) -> None:
         """Process disconnection on main thread."""
@@ -509,15 +653,10 @@ class NumbersGameGUI(ttk.Frame):
         # Reset to single player
         self.online_mode = False
         self.mode_var.set("1 Player")
-        self.network = None
+        self._close_network()
         self.master.title("🎮 Numbers Discovery Game")
         self.new_game()
         
-    def _on_network_message(self, msg_type: str, data: Any) -> None:
-        """Handle incoming network message (called from network thread)."""
-        # Use after() for thread safety - all GUI updates must be on main thread
-        self.after(0, lambda: self._handle_network_message(msg_type, data))
-        
     def _handle_network_message(self, msg_type: str, data: Any) -> None:
         """Process network message on main thread."""
         if msg_type == "NAME":
@@ -560,31 +699,16 @@ class NumbersGameGUI(ttk.Frame):
                 "count": count,
                 "place": place
             })
+            self._handle_opponent_result(data, count, place)
             
-            # Log opponent's guess in their panel (player=2)
-            if place == self.digit_count:
-                emoji = "🎉"
-            elif place > 0:
-                emoji = "🟡"
-            elif count > 0:
-                emoji = "🟠"
-            else:
-                emoji = "⚫"
-            self._log(f"{emoji} {data} → {count}/{place}", player=2)
+        elif msg_type == "OPPONENT_RESULT":
+            # The server scored the opponent's guess against my secret
+            self._handle_opponent_result(data["guess"], data["count"], data["place"])
+            
+        elif msg_type == "ERROR":
+            # The server refused my last message (e.g. an invalid guess)
+            self._log(f"⚠️ {data}", player=1)
             
-            # Check if opponent won
-            if place == self.digit_count:
-                if hasattr(self, 'i_won_online') and self.i_won_online:
-                    # I already won - now opponent also won = DRAW
-                    self._log(f"\n🤝 IT'S A DRAW!", player=0)
-                    Messagebox.show_info("Both players cracked the code!", "Draw!")
-                else:
-                    # Opponent won first - I get one more guess
-                    self.opponent_won_online = True
-                    self._log(f"\n🎯 {self.opponent_name} cracked your code!", player=1)
-                    self._log("⏳ You have one final guess for a draw!", player=1)
-                    self._log(f"\n🏆 Cracked the code!", player=2)
-                
         elif msg_type == "RESULT":
             # Received result for my guess
             guess = data["guess"]
@@ -610,6 +734,7 @@ class NumbersGameGUI(ttk.Frame):
                 if hasattr(self, 'opponent_won_online') and self.opponent_won_online:
                     # Opponent already won - we both won = DRAW
                     self._log(f"\n🤝 IT'S A DRAW!", player=0)
+                    self._record_online_result(DRAW)
                     Messagebox.show_info("Both players cracked the code!", "Draw!")
                 else:
                     # I won first - opponent gets one more guess
@@ -619,8 +744,58 @@ class NumbersGameGUI(ttk.Frame):
             elif hasattr(self, 'opponent_won_online') and self.opponent_won_online:
                 # I missed my final chance - opponent wins
                 self._log(f"\n🏆 {self.opponent_name} wins!", player=0)
+                self._record_online_result(LOSS)
                 Messagebox.show_info(f"{self.opponent_name} cracked your code!", "Game Over")
                 
+    def _handle_opponent_result(self, guess: str, count: int, place: int) -> None:
+        """Show the score of the opponent's guess at my secret and check for their win."""
+        # Log opponent's guess in their panel (player=2)
+        if place == self.digit_count:
+            emoji = "🎉"
+        elif place > 0:
+            emoji = "🟡"
+        elif count > 0:
+            emoji = "🟠"
+        else:
+            emoji = "⚫"
+        self._log(f"{emoji} {guess} → {count}/{place}", player=2)
+        
+        # Check if opponent won
+        if place == self.digit_count:
+            if hasattr(self, 'i_won_online') and self.i_won_online:
+                # I already won - now opponent also won = DRAW
+                self._log(f"\n🤝 IT'S A DRAW!", player=0)
+                self._record_online_result(DRAW)
+                Messagebox.show_info("Both players cracked the code!", "Draw!")
+            else:
+                # Opponent won first - I get one more guess
+                self.opponent_won_online = True
+                self._log(f"\n🎯 {self.opponent_name} cracked your code!", player=1)
+                self._log("⏳ You have one final guess for a draw!", player=1)
+                self._log(f"\n🏆 Cracked the code!", player=2)
+        elif hasattr(self, 'i_won_online') and self.i_won_online:
+            # Opponent missed their final guess - I win
+            self._log(f"\n🏆 You win!", player=0)
+            self._record_online_result(WIN)
+            
+    def _record_online_result(self, score: float) -> None:
+        """Rate a finished online match once, from my point of view."""
+        if not self.online_rated:
+            self.online_rated = True
+            self._record_match(self.online_my_name, self.opponent_name, score)
+            
+    def _record_match(self, player_a: str, player_b: str, score_a: float) -> None:
+        """Update both players' ratings and show the change."""
+        if player_a == player_b:
+            return
+        before = (self.ratings.rating(player_a), self.ratings.rating(player_b))
+        after = self.ratings.record_match(player_a, player_b, score_a)
+        changes = ", ".join(
+            f"{name} {new:.0f} ({new - old:+.0f})"
+            for name, old, new in zip((player_a, player_b), before, after)
+        )
+        self._log(f"⚔️ Ratings: {changes}")
+        
     def _initiate_online_setup(self) -> None:
         """Host sends setup request to both players."""
         self.network.send("SETUP_REQ", self.digit_count)
@@ -633,8 +808,12 @@ class NumbersGameGUI(ttk.Frame):
         num = self._ask_secret_number(my_name, "for opponent to guess")
         self.my_online_secret = num
         
-        # Notify opponent that I'm ready
-        self.network.send("SECRET_SET", True)
+        # Notify opponent that I'm ready. A match server that scores guesses
+        # itself is given the secret instead; it never forwards it.
+        if CAP_SCORING in self.network.peer_caps:
+            self.network.send("SECRET_SET", str(num))
+        else:
+            self.network.send("SECRET_SET", True)
         self._log("✅ Secret number set! Waiting for opponent...")
         
         if self.is_host:
@@ -658,12 +837,14 @@ class NumbersGameGUI(ttk.Frame):
         # Reset win tracking for fair play
         self.i_won_online = False
         self.opponent_won_online = False
+        self.online_rated = False
         
         # Enable 2-player mode flag for split view logging
         self.two_player_mode = True
         
         # Set player names for display
         my_name = self.player1_name if self.is_host else self.player2_name
+        self.online_my_name = my_name
         self.player1_name = "You"
         self.player2_name = self.opponent_name
         
@@ -775,7 +956,7 @@ class NumbersGameGUI(ttk.Frame):
             return
         
         # Handle Online mode - send guess to opponent
-        if self.online_mode and self.network and self.network.connected:
+        if self.online_mode and self.network and self.network.online:
             self.network.send("GUESS", str(processed_val))
             self.tries += 1
             return
@@ -861,20 +1042,7 @@ class NumbersGameGUI(ttk.Frame):
 
     def _compare_numbers(self, guess: int, target: int) -> tuple:
         """Compare a guess against a target number."""
-        ref_n = str(target)
-        ip_s = str(guess)
-        count = 0
-        place = 0
-        
-        for i in range(len(ref_n)):
-            val_i = ref_n[i]
-            for j in range(len(ip_s)):
-                val_j = ip_s[j]
-                if val_i == val_j:
-                    count += 1
-                    if i == j:
-                        place += 1
-        return count, place
+        return compare_numbers(target, guess)
 
     def _handle_win(self, winner: int = None) -> None:
         """Handle winning the game."""
@@ -896,6 +1064,7 @@ class NumbersGameGUI(ttk.Frame):
             self._log(f"\n🎊 {winner_name} WINS!", player=2)
             self._log(f"🔓 Cracked: {cracked_number}", player=2)
             self._log(f"⭐ Tries: {winner_tries}\n", player=2)
+            self._record_match(winner_name, loser_name, WIN)
             
             if Messagebox.yesno(f"{winner_name} cracked {loser_name}'s number!\n\nScore: {score}\n\nPlay again?", "🎉 Game Over!"):
                 self.new_game()
@@ -909,12 +1078,42 @@ class NumbersGameGUI(ttk.Frame):
             
             name = self._ask_player_name()
             if name:
-                rank = add_score(name, self.tries, self.game.hints_used, score, self.digit_count)
-                self._log(f"🏅 {name} ranked #{rank} on the leaderboard!\n")
+                self.player_name = name
+                self.score_writer.submit(
+                    name, self.tries, self.game.hints_used, score, self.digit_count,
+                    on_rank=lambda rank: self._on_score_ranked(name, rank)
+                )
             
             if Messagebox.yesno(f"You won with score {score}!\n\nPlay again?", "🎉 Congratulations!"):
                 self.new_game()
 
+    def _on_score_ranked(self, name: str, rank: Optional[int]) -> None:
+        """Report a saved score's rank (called on main thread)."""
+        if rank is None:
+            self._log(f"📋 {name}'s score didn't make the leaderboard this time.\n")
+        else:
+            self._log(f"🏅 {name} ranked #{rank} on the leaderboard!\n")
+
+    def _close_network(self) -> None:
+        """Stop pumping and close any online connection."""
+        self._cancel_network_status()
+        if self.network_pump:
+            self.network_pump.stop()
+            self.network_pump = None
+        if self.network:
+            self.network.disconnect()
+            self.network.metrics.stop_dump()
+            self.network = None
+
+    def _on_close(self) -> None:
+        """Flush pending scores and close connections before exiting."""
+        self._close_network()
+        self.score_writer.close()
+        self.ratings.save()
+        if self.leaderboard_feed:
+            self.leaderboard_feed.close()
+        self.master.destroy()
+
     def _handle_draw(self) -> None:
         """Handle a draw when both players crack the code on the same turn."""
         self._log(f"\n🤝 IT'S A DRAW!", player=1)
@@ -922,6 +1121,7 @@ class NumbersGameGUI(ttk.Frame):
         
         self._log(f"\n🤝 IT'S A DRAW!", player=2)
         self._log(f"Both players cracked the code in {self.player2_tries} tries!", player=2)
+        self._record_match(self.player1_name, self.player2_name, DRAW)
         
         if Messagebox.yesno("It's a draw! Both players cracked the code!\n\nPlay again?", "🤝 Draw!"):
             self.new_game()
@@ -950,6 +1150,7 @@ class NumbersGameGUI(ttk.Frame):
         ).pack(pady=15)
         
         name_entry = ttk.Entry(dialog, width=25, font=("Segoe UI", 12))
+        name_entry.insert(0, self.player_name or "")
         name_entry.pack(pady=5)
         name_entry.focus()
         
@@ -1023,13 +1224,37 @@ class NumbersGameGUI(ttk.Frame):
     def give_up(self) -> None:
         """Reveal the answer and offer new game."""
         self._log(f"\n😔 The answer was: {self.game.num}")
+        if not (self.two_player_mode or self.online_mode):
+            # Whoever is playing says who they are; cancelling records nothing
+            name = simpledialog.askstring(
+                "Your Name",
+                "Enter your name to count this game in your stats:",
+                initialvalue=self.player_name or "",
+                parent=self.master
+            )
+            if name and name.strip():
+                self.player_name = name.strip()
+                self.score_writer.submit_loss(self.player_name, self.tries, self.game.hints_used)
         if Messagebox.yesno(f"The number was {self.game.num}\n\nPlay again?", "Game Over"):
             self.new_game()
 
     def show_leaderboard(self) -> None:
         """Display the leaderboard."""
-        self._log(display_leaderboard(self.digit_count))
-
+        if self.leaderboard_feed and self.leaderboard_feed.wait_synced(0):
+            index = LeaderboardIndex(self.leaderboard_feed.board(self.digit_count))
+            self._log(display_leaderboard(self.digit_count, index=index))
+        else:
+            self._log(display_leaderboard(self.digit_count))
+        if len(self.ratings):
+            self._log(display_ratings(self.ratings))
+            
+    def _on_leaderboard_change(self, difficulty: int, delta: Optional[dict]) -> None:
+        """Announce scores that just made the shared leaderboard."""
+        if delta is None or difficulty != self.digit_count:
+            return
+        for rank, entry in delta['inserts']:
+            self._log(f"📈 #{rank} {entry['player_name']} - {entry['score']} points")
+            
     def open_thinking_area(self) -> None:
         """Open the thinking area window."""
         ThinkingAreaWindow(self.master, self.digit_count)
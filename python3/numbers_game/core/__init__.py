@@ -1,3 +1,7 @@
 # Core game logic
-from .engine import GameEngine, DEFAULT_DIGIT_COUNT
-from .high_scores import add_score, display_leaderboard, get_leaderboard
+from .engine import GameEngine, DEFAULT_DIGIT_COUNT, compare_numbers
+from .high_scores import (
+    add_score, add_scores, display_leaderboard, get_leaderboard,
+    get_leaderboard_page, get_player_rank, record_loss
+)
+from .score_writer import ScoreWriter
@@ -11,6 +11,34 @@ from typing import Tuple, Optional, Union
 DEFAULT_DIGIT_COUNT = 5
 
 
+def compare_numbers(target: Union[int, str], guess: Union[int, str]) -> Tuple[int, int]:
+    """Compare a guess against a secret number.
+    
+    Args:
+        target: The secret number.
+        guess: The guess.
+        
+    Returns:
+        A tuple of (count, place) where:
+        - count: How many digits from the guess exist in the secret number
+        - place: How many of those digits are in the correct position
+    """
+    ref_n = str(target)
+    ip_s = str(guess)
+    count = 0
+    place = 0
+    
+    for i in range(len(ref_n)):
+        val_i = ref_n[i]
+        for j in range(len(ip_s)):
+            val_j = ip_s[j]
+            if val_i == val_j:
+                count += 1
+                if i == j:
+                    place += 1
+    return count, place
+
+
 class GameEngine:
     """Main game class that handles number generation, validation, and comparison.
     
@@ -47,7 +75,7 @@ class GameEngine:
             return False, mesg_string
             
         # Check if all inputs are numbers
-        if not ip.isdigit():
+        if not (ip.isascii() and ip.isdigit()):
             mesg_string = 'All values input should be numbers'
             return False, mesg_string
             
@@ -108,20 +136,7 @@ class GameEngine:
             - count: How many digits from the guess exist in the secret number
             - place: How many of those digits are in the correct position
         """
-        ref_n = str(self.num)
-        ip_s = str(ip)
-        count = 0
-        place = 0
-        
-        for i in range(len(ref_n)):
-            val_i = ref_n[i]
-            for j in range(len(ip_s)):
-                val_j = ip_s[j]
-                if val_i == val_j:
-                    count += 1
-                    if i == j:
-                        place += 1
-        return count, place
+        return compare_numbers(self.num, ip)
 
     def get_hint(self) -> Tuple[int, str]:
         """Reveal one digit of the secret number as a hint.
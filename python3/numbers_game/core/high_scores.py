@@ -1,16 +1,49 @@
 """High Scores module for the Numbers Game.
 
-Handles saving and loading high scores to a JSON file.
+Handles saving and loading high scores. Scores are stored in a compact
+binary file (see score_format.py); files from older versions, written as
+JSON, are still read and are converted on the next save.
+
+Several game processes on one machine can share a board through a
+leaderboard service (see leaderboard_service.py): after `use_service()`,
+the functions here send reads and writes for that scores file to the
+service over one reused connection instead of touching the file.
 """
 
+import bisect
+import heapq
 import json
 import os
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from .score_format import ScoreFormatError, is_binary, encode_scores, read_scores_file
+from .player_stats import PlayerStatsStore, display_player_stats, log_games, stats_path
+from .storage import atomic_write
+
+if TYPE_CHECKING:
+    from .leaderboard_service import LeaderboardClient
+
 # Default path for high scores file (in project root)
-SCORES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'high_scores.json')
+SCORES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'high_scores.dat')
+
+
+def _retention_from_env(default: int = 10) -> int:
+    """Read the number of scores kept per difficulty from the environment."""
+    try:
+        return max(1, int(os.environ.get('NUMBERS_GAME_MAX_SCORES', default)))
+    except ValueError:
+        return default
+
+
+# Number of scores kept per difficulty unless a caller asks otherwise; set
+# NUMBERS_GAME_MAX_SCORES to keep a longer leaderboard
+MAX_SCORES = _retention_from_env()
+
+# Rows shown per leaderboard page
+PAGE_SIZE = 10
 
 
 @dataclass
@@ -24,34 +57,113 @@ class ScoreEntry:
     date: str
 
 
+# Type accepted by the bulk ingestion API
+ScoreInput = Union[ScoreEntry, dict]
+
+# Leaderboard service clients by absolute scores file path (see use_service)
+_services: Dict[str, 'LeaderboardClient'] = {}
+
+
+def use_service(address: str, filepath: str = SCORES_FILE) -> 'LeaderboardClient':
+    """Route reads and writes for a scores file through a leaderboard service.
+    
+    The service must own `filepath`. Scores added through this module are
+    then ranked by the service (its `limit` applies, not the caller's),
+    and one connection is reused for every call.
+    
+    Args:
+        address: The service's "host:port".
+        filepath: Scores file the service owns.
+        
+    Returns:
+        The client now used for `filepath`.
+    """
+    from .leaderboard_service import LeaderboardClient, parse_address
+    
+    host, port = parse_address(address)
+    stop_using_service(filepath)
+    client = _services[os.path.abspath(filepath)] = LeaderboardClient(host, port)
+    return client
+
+
+def stop_using_service(filepath: str = SCORES_FILE) -> None:
+    """Go back to reading and writing `filepath` directly."""
+    client = _services.pop(os.path.abspath(filepath), None)
+    if client is not None:
+        client.close()
+
+
+def _service_for(filepath: str) -> Optional['LeaderboardClient']:
+    """Return the service client for a scores file, if one is in use."""
+    return _services.get(os.path.abspath(filepath)) if _services else None
+
+
+def _empty_scores() -> Dict[str, List[dict]]:
+    """Return an empty scores dictionary with all difficulty levels."""
+    return {'4': [], '5': [], '6': []}
+
+
+def _sort_key(entry: dict) -> Tuple[int, int]:
+    """Leaderboard ordering: score descending, then tries ascending."""
+    return (-entry['score'], entry['tries'])
+
+
+def rank_at(board: List[dict], position: int) -> int:
+    """Rank of the entry at a 1-indexed position of a sorted board.
+    
+    Leaderboards use competition ranking: entries that tie share a rank,
+    which is one more than the number of strictly better entries.
+    """
+    key = _sort_key(board[position - 1])
+    while position > 1 and _sort_key(board[position - 2]) == key:
+        position -= 1
+    return position
+
+
+def legacy_path(filepath: str) -> str:
+    """Return the path of the JSON scores file older versions wrote."""
+    return os.path.splitext(filepath)[0] + '.json'
+
+
 def load_scores(filepath: str = SCORES_FILE) -> Dict[str, List[dict]]:
     """Load high scores from file.
     
+    If `filepath` does not exist yet but a legacy JSON file with the same
+    base name does, that file is loaded instead.
+    
     Args:
-        filepath: Path to the scores JSON file.
+        filepath: Path to the scores file (binary or legacy JSON).
         
     Returns:
         Dictionary with difficulty levels as keys and lists of scores as values.
     """
     if not os.path.exists(filepath):
-        return {'4': [], '5': [], '6': []}
-    
+        legacy = legacy_path(filepath)
+        if legacy == filepath or not os.path.exists(legacy):
+            return _empty_scores()
+        filepath = legacy
+        
     try:
+        with open(filepath, 'rb') as f:
+            head = f.read(4)
+        if is_binary(head):
+            return read_scores_file(filepath)
         with open(filepath, 'r') as f:
             return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {'4': [], '5': [], '6': []}
+    except (json.JSONDecodeError, ScoreFormatError, UnicodeDecodeError, IOError):
+        return _empty_scores()
 
 
 def save_scores(scores: Dict[str, List[dict]], filepath: str = SCORES_FILE) -> None:
-    """Save high scores to file.
+    """Save high scores to file in the binary format.
+    
+    The write is atomic, so a crash never leaves a half-written scores file.
     
     Args:
         scores: Dictionary of scores to save.
-        filepath: Path to the scores JSON file.
+        filepath: Path to the scores file.
     """
-    with open(filepath, 'w') as f:
-        json.dump(scores, f, indent=2)
+    atomic_write(filepath, encode_scores(scores))
 
 
 def add_score(
@@ -60,7 +172,8 @@ def add_score(
     hints_used: int,
     score: int,
     difficulty: int,
-    filepath: str = SCORES_FILE
+    filepath: str = SCORES_FILE,
+    limit: int = MAX_SCORES
 ) -> int:
     """Add a new score and return the player's rank.
     
@@ -71,10 +184,24 @@ def add_score(
         score: Final calculated score.
         difficulty: Digit count (4, 5, or 6).
         filepath: Path to scores file.
+        limit: Number of scores kept per difficulty.
         
     Returns:
-        The player's rank (1-indexed) for this difficulty.
+        The score's rank for this difficulty (see rank_at); a score that
+        did not make the board gets the rank it would have had.
     """
+    service = _service_for(filepath)
+    if service is not None:
+        entry = {'player_name': player_name, 'tries': tries, 'hints_used': hints_used,
+                 'score': score, 'difficulty': difficulty}
+        # In one request, so no other write lands between the two
+        added, would_be = service.request([
+            {'op': 'add', 'entries': [entry]},
+            {'op': 'score_rank', 'difficulty': difficulty, 'score': score, 'tries': tries},
+        ])
+        # Only an entry that missed a full board has no rank
+        return added[0] if added[0] is not None else would_be
+        
     scores = load_scores(filepath)
     difficulty_key = str(difficulty)
     
@@ -87,21 +214,325 @@ def add_score(
         date=datetime.now().strftime('%Y-%m-%d %H:%M')
     )
     
-    scores[difficulty_key].append(asdict(entry))
+    new = asdict(entry)
+    scores[difficulty_key].append(new)
     
     # Sort by score (descending), then by tries (ascending)
-    scores[difficulty_key].sort(key=lambda x: (-x['score'], x['tries']))
+    scores[difficulty_key].sort(key=_sort_key)
+    
+    # Rank among the scores before trimming, so a score that missed the
+    # board still learns where it would have been
+    key = _sort_key(new)
+    rank = 1 + sum(1 for s in scores[difficulty_key] if _sort_key(s) < key)
     
-    # Keep only top 10 scores per difficulty
-    scores[difficulty_key] = scores[difficulty_key][:10]
+    # Keep only the top scores per difficulty
+    scores[difficulty_key] = scores[difficulty_key][:limit]
     
     save_scores(scores, filepath)
+    log_games(stats_path(filepath), [(player_name, True, tries, hints_used, score)])
+    return rank
+
+
+def add_scores(
+    entries: Iterable[ScoreInput],
+    filepath: str = SCORES_FILE,
+    limit: int = MAX_SCORES
+) -> List[Optional[int]]:
+    """Add many scores at once with a single load and a single save.
+    
+    Intended for bulk imports such as tournament results. Entries are
+    consumed one at a time, and only the best `limit` entries per
+    difficulty are kept in memory, so `entries` may be an arbitrarily
+    large iterator.
+    
+    Args:
+        entries: Iterable of ScoreEntry objects or dicts with the same keys.
+            A missing `date` defaults to the current time.
+        filepath: Path to scores file.
+        limit: Number of scores kept per difficulty.
+        
+    Returns:
+        One rank per input entry, in input order: the entry's rank on the
+        final leaderboard (see rank_at), or None if it did not make it.
+    """
+    service = _service_for(filepath)
+    if service is not None:
+        return service.add_scores(entries)
+        
+    scores = load_scores(filepath)
+    stats = PlayerStatsStore(stats_path(filepath))
+    ranks = merge_scores(scores, entries, stats, limit)
+    save_scores(scores, filepath)
+    stats.save()
+    return ranks
+
+
+def merge_scores(
+    scores: Dict[str, List[dict]],
+    entries: Iterable[ScoreInput],
+    stats: PlayerStatsStore,
+    limit: int = MAX_SCORES
+) -> List[Optional[int]]:
+    """Merge scores into a loaded scores dictionary, in place.
+    
+    The work behind `add_scores`, for callers that keep the scores in
+    memory.
+    
+    Args:
+        scores: Scores dictionary as returned by load_scores().
+        entries: ScoreEntry objects or dicts; a missing `date` defaults to now.
+        stats: Player statistics to record every entry in.
+        limit: Number of scores kept per difficulty.
+        
+    Returns:
+        One rank per input entry, as for add_scores().
+    """
+    ranks: List[Optional[int]] = []
+    for placed in place_scores(scores, entries, stats, limit):
+        ranks.append(rank_at(scores[placed[0]], placed[1]) if placed else None)
+    return ranks
+
+
+def place_scores(
+    scores: Dict[str, List[dict]],
+    entries: Iterable[ScoreInput],
+    stats: PlayerStatsStore,
+    limit: int = MAX_SCORES
+) -> List[Optional[Tuple[str, int]]]:
+    """Merge scores like merge_scores(), returning where each one landed.
+    
+    For callers that need board positions rather than ranks, such as the
+    leaderboard service when it builds deltas.
+    
+    Args:
+        scores: Scores dictionary as returned by load_scores().
+        entries: ScoreEntry objects or dicts; a missing `date` defaults to now.
+        stats: Player statistics to record every entry in.
+        limit: Number of scores kept per difficulty.
+        
+    Returns:
+        Per input entry, its board's key and its 1-indexed position on
+        that board, or None if it did not make the board.
+    """
+    now = datetime.now().strftime('%Y-%m-%d %H:%M')
+    
+    # Per difficulty: min-heap of the best `limit` entries. The heap key is
+    # the inverted sort key so the worst kept entry sits on top. Existing
+    # entries are tagged with negative sequence numbers so that, on ties,
+    # they keep their place ahead of newly imported ones.
+    heaps: Dict[str, list] = {}
+    for key, board in scores.items():
+        heap = heaps.setdefault(key, [])
+        for i, existing in enumerate(board):
+            _push_bounded(heap, existing, i - len(board), limit)
+            
+    added: List[dict] = []
+    for raw in entries:
+        entry = asdict(raw) if isinstance(raw, ScoreEntry) else dict(raw)
+        entry.setdefault('date', now)
+        heap = heaps.setdefault(str(entry['difficulty']), [])
+        _push_bounded(heap, entry, len(added), limit)
+        added.append(entry)
+    count = len(added)
+    
+    # Only once every entry is known to sort, so a bad one records nothing
+    for entry in added:
+        stats.record_game(entry['player_name'], True, entry['tries'],
+                          entry['hints_used'], entry['score'])
+        
+    placed: List[Optional[Tuple[str, int]]] = [None] * count
+    for key, heap in heaps.items():
+        ordered = sorted(heap, key=lambda item: (_sort_key(item[2]), item[1]))
+        scores[key] = [item[2] for item in ordered]
+        for position, (_, seq, _) in enumerate(ordered, 1):
+            if seq >= 0:
+                placed[seq] = (key, position)
+    return placed
+
+
+def _push_bounded(heap: list, entry: dict, seq: int, limit: int) -> None:
+    """Push an entry onto a bounded min-heap of the best entries."""
+    score_key, tries_key = _sort_key(entry)
+    # Inverted so that heap[0] is the worst entry; later seq loses ties
+    item = ((-score_key, -tries_key, -seq), seq, entry)
+    if len(heap) < limit:
+        heapq.heappush(heap, item)
+    elif item[0] > heap[0][0]:
+        heapq.heapreplace(heap, item)
+
+
+class LeaderboardIndex:
+    """Ordered index over one difficulty's leaderboard.
+    
+    Supports O(log n) rank lookups by player and by score, and cheap
+    range queries for pagination. Ranks use competition ranking: an
+    entry's rank is one more than the number of strictly better entries.
+    
+    Attributes:
+        entries: Score entries in leaderboard order.
+    """
+    
+    def __init__(self, entries: Iterable[dict]) -> None:
+        """Build the index.
+        
+        Args:
+            entries: Score entries, in any order.
+        """
+        self.entries = sorted(entries, key=_sort_key)
+        self._keys = [_sort_key(e) for e in self.entries]
+        # Best sort key per player; entries are sorted so the first one wins
+        self._best: Dict[str, Tuple[int, int]] = {}
+        for entry, key in zip(self.entries, self._keys):
+            self._best.setdefault(entry['player_name'], key)
+            
+    def __len__(self) -> int:
+        """Number of entries in the index."""
+        return len(self.entries)
+        
+    def rank_of_score(self, score: int, tries: int) -> int:
+        """Rank that a result with this score and tries has (or would have)."""
+        return bisect.bisect_left(self._keys, (-score, tries)) + 1
+        
+    def rank_of_player(self, player_name: str) -> Optional[int]:
+        """Rank of a player's best entry, or None if they are not on the board."""
+        key = self._best.get(player_name)
+        if key is None:
+            return None
+        return bisect.bisect_left(self._keys, key) + 1
+        
+    def insert(self, entry: dict) -> int:
+        """Insert an entry and return its rank.
+        
+        Equal entries keep insertion order, matching `add_score`.
+        """
+        key = _sort_key(entry)
+        pos = bisect.bisect_right(self._keys, key)
+        self._keys.insert(pos, key)
+        self.entries.insert(pos, entry)
+        best = self._best.get(entry['player_name'])
+        if best is None or key < best:
+            self._best[entry['player_name']] = key
+        return bisect.bisect_left(self._keys, key) + 1
+        
+    def iter_range(self, start_rank: int = 1, count: int = PAGE_SIZE) -> Iterator[Tuple[int, dict]]:
+        """Iterate (rank, entry) pairs for a range of positions.
+        
+        Args:
+            start_rank: First position to return (1-indexed).
+            count: Maximum number of entries.
+        """
+        start = max(start_rank, 1) - 1
+        rank = 0
+        previous = None
+        for position, entry in enumerate(islice(self.entries, start, start + max(count, 0)), start):
+            key = self._keys[position]
+            if key != previous:
+                # Competition ranking: a tie keeps the rank of its first entry
+                rank = position + 1 if previous is not None else bisect.bisect_left(self._keys, key) + 1
+                previous = key
+            yield rank, entry
+            
+    def page(self, start_rank: int = 1, count: int = PAGE_SIZE) -> List[dict]:
+        """Return the entries for a range of positions."""
+        return [entry for _, entry in self.iter_range(start_rank, count)]
+
+
+# Cached indexes keyed by (filepath, difficulty), invalidated on file change
+_index_cache: Dict[Tuple[str, int], Tuple[Tuple[int, int, int], LeaderboardIndex]] = {}
+
+
+def get_leaderboard_index(difficulty: int, filepath: str = SCORES_FILE) -> LeaderboardIndex:
+    """Get the ordered index for a difficulty level.
+    
+    The index is cached and rebuilt only when the scores file changes.
+    
+    Args:
+        difficulty: Digit count (4, 5, or 6).
+        filepath: Path to scores file.
+        
+    Returns:
+        LeaderboardIndex for the difficulty.
+    """
+    try:
+        st = os.stat(filepath)
+        version = (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        version = (0, 0, 0)
+    cache_key = (os.path.abspath(filepath), difficulty)
+    cached = _index_cache.get(cache_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = LeaderboardIndex(load_scores(filepath).get(str(difficulty), []))
+    _index_cache[cache_key] = (version, index)
+    return index
+
+
+def get_leaderboard_page(
+    difficulty: int,
+    start_rank: int = 1,
+    count: int = PAGE_SIZE,
+    filepath: str = SCORES_FILE
+) -> List[dict]:
+    """Get a range of leaderboard entries, e.g. ranks 500-520.
+    
+    Args:
+        difficulty: Digit count (4, 5, or 6).
+        start_rank: First rank to return (1-indexed).
+        count: Maximum number of entries.
+        filepath: Path to scores file.
+        
+    Returns:
+        List of score entries in rank order.
+    """
+    service = _service_for(filepath)
+    if service is not None:
+        return service.page(difficulty, start_rank, count)
+    return get_leaderboard_index(difficulty, filepath).page(start_rank, count)
+
+
+def get_player_rank(player_name: str, difficulty: int, filepath: str = SCORES_FILE) -> Optional[int]:
+    """Get the rank of a player's best score.
     
-    # Find and return rank
-    for i, s in enumerate(scores[difficulty_key]):
-        if s['player_name'] == player_name and s['score'] == score:
-            return i + 1
-    return len(scores[difficulty_key])
+    Args:
+        player_name: Name of the player.
+        difficulty: Digit count (4, 5, or 6).
+        filepath: Path to scores file.
+        
+    Returns:
+        The player's rank (1-indexed), or None if they have no score.
+    """
+    service = _service_for(filepath)
+    if service is not None:
+        return service.rank(player_name, difficulty)
+    return get_leaderboard_index(difficulty, filepath).rank_of_player(player_name)
+
+
+def record_loss(player_name: str, tries: int, hints_used: int, filepath: str = SCORES_FILE) -> None:
+    """Record a game the player did not win (e.g. gave up) in their statistics.
+    
+    Args:
+        player_name: Name of the player.
+        tries: Number of tries used.
+        hints_used: Number of hints used.
+        filepath: Path to scores file.
+    """
+    log_games(stats_path(filepath), [(player_name, False, tries, hints_used, 0)])
+
+
+def rebuild_player_stats(filepath: str = SCORES_FILE) -> int:
+    """Recompute the player statistics from the full game history log.
+    
+    Use this to recover a lost or corrupted stats file.
+    
+    Args:
+        filepath: Path to scores file.
+        
+    Returns:
+        Number of players in the rebuilt store.
+    """
+    stats = PlayerStatsStore(stats_path(filepath))
+    stats.rebuild()
+    return len(stats)
 
 
 def get_top_scores(difficulty: int, limit: int = 5, filepath: str = SCORES_FILE) -> List[dict]:
@@ -115,6 +546,9 @@ def get_top_scores(difficulty: int, limit: int = 5, filepath: str = SCORES_FILE)
     Returns:
         List of top score entries.
     """
+    service = _service_for(filepath)
+    if service is not None:
+        return service.page(difficulty, 1, limit)
     scores = load_scores(filepath)
     return scores.get(str(difficulty), [])[:limit]
 
@@ -129,34 +563,57 @@ def get_leaderboard(difficulty: int, filepath: str = SCORES_FILE) -> List[dict]:
     Returns:
         List of all score entries for the difficulty.
     """
-    return get_top_scores(difficulty, limit=10, filepath=filepath)
+    return get_top_scores(difficulty, limit=MAX_SCORES, filepath=filepath)
 
 
-def display_leaderboard(difficulty: int, filepath: str = SCORES_FILE) -> str:
-    """Generate a formatted leaderboard string.
+def display_leaderboard(
+    difficulty: int,
+    filepath: str = SCORES_FILE,
+    start_rank: int = 1,
+    count: int = PAGE_SIZE,
+    index: Optional[LeaderboardIndex] = None
+) -> str:
+    """Generate a formatted leaderboard string for one page of ranks.
+    
+    Statistics for the players on the page are shown below the table.
     
     Args:
         difficulty: Digit count (4, 5, or 6).
         filepath: Path to scores file.
-        
+        start_rank: First rank to show (1-indexed).
+        count: Number of ranks to show.
+        index: Board to show (e.g. a LeaderboardFeed's copy) instead of
+            reading it from the scores file.
+            
     Returns:
         Formatted leaderboard string.
     """
     difficulty_names = {4: 'Easy', 5: 'Medium', 6: 'Hard'}
-    top_scores = get_top_scores(difficulty, limit=10, filepath=filepath)
-    
-    if not top_scores:
+    if index is None:
+        index = get_leaderboard_index(difficulty, filepath)
+        
+    if not len(index):
         return f"\n🏆 {difficulty_names[difficulty]} Leaderboard\nNo scores yet!\n"
-    
-    lines = [f"\n🏆 {difficulty_names[difficulty]} Leaderboard"]
+        
+    rows = list(index.iter_range(start_rank, count))
+    title = f"\n🏆 {difficulty_names[difficulty]} Leaderboard"
+    if rows and (start_rank > 1 or len(index) > count):
+        title += f" (ranks {rows[0][0]}-{rows[-1][0]} of {len(index)})"
+    lines = [title]
     lines.append("-" * 50)
     lines.append(f"{'Rank':<6}{'Name':<15}{'Score':<10}{'Tries':<8}{'Date'}")
     lines.append("-" * 50)
     
-    for i, entry in enumerate(top_scores, 1):
+    names = []
+    for i, entry in rows:
+        names.append(entry['player_name'])
         lines.append(
             f"{i:<6}{entry['player_name']:<15}{entry['score']:<10}"
             f"{entry['tries']:<8}{entry['date']}"
         )
-    
+        
+    stats_table = display_player_stats(names, PlayerStatsStore(stats_path(filepath)))
+    if stats_table:
+        lines.append(stats_table)
+        
     return "\n".join(lines)
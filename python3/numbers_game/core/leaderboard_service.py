@@ -0,0 +1,702 @@
+"""Local leaderboard service shared by several game processes.
+
+Without it, every game process reads, modifies and rewrites the scores
+file on its own, so processes on one machine race each other and scores
+get lost. The service owns the file instead: it loads it once, keeps
+the scores and player statistics in memory, and is the only writer.
+Games talk to it over localhost TCP.
+
+The wire format is one JSON object per line. A request carries a batch
+of operations and gets one result per operation, in order:
+
+    {"ops": [{"op": "add", "entries": [{...}, ...]},
+             {"op": "page", "difficulty": 5, "start": 1, "count": 10}]}
+    {"results": [[3, null], [{...}, ...]]}
+
+Operations:
+    add         entries                  -> rank per entry (null if off the board)
+    page        difficulty, start, count -> score entries
+    rank        difficulty, player_name  -> rank or null
+    score_rank  difficulty, score, tries -> rank of such a result, on the board or not
+    changes     difficulty, since, epoch -> catch-up (see below)
+    stats                                -> service counters
+
+Every change to a board is a versioned delta: the rows inserted, each
+at its final (1-indexed) position, and the board's new size. Applying the inserts in
+order and truncating to the size turns version N-1 of a board into
+version N, so a client holding a copy needs only the changed rows. A
+client that has fallen behind asks for `changes` since its version and
+gets the missed deltas, or the whole board if they are no longer kept
+(or the service restarted, which changes its `epoch`).
+
+A connection whose request is a single `subscribe` operation
+(difficulties, since: {difficulty: version}, epoch) gets the catch-up for
+each board as its result, then one ``{"delta": {...}}`` line per change
+as scores land. A subscriber that cannot keep up is disconnected and
+catches up when it reconnects; LeaderboardFeed does all of this.
+
+Leaderboards are served from an in-memory LeaderboardIndex per
+difficulty, rebuilt only after that difficulty changes. Writes use
+group commit: a batch is acknowledged only once it is on disk, and
+batches that arrive while a write is in progress share the next write.
+
+Run with ``python -m numbers_game.core.leaderboard_service``, then start
+the game with ``NUMBERS_GAME_LEADERBOARD=127.0.0.1:5556``.
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .high_scores import (
+    MAX_SCORES, PAGE_SIZE, SCORES_FILE, LeaderboardIndex, ScoreInput,
+    load_scores, place_scores, rank_at, save_scores
+)
+from .player_stats import PlayerStatsStore, stats_path
+
+DEFAULT_PORT = 5556
+
+# Longest request line accepted
+MAX_REQUEST_SIZE = 4 * 1024 * 1024
+
+# Operations that do not change the store
+_READ_OPS = frozenset(('page', 'rank', 'score_rank', 'changes', 'stats'))
+
+# Fields every added entry must have ('date' defaults to now)
+_ENTRY_FIELDS = ('player_name', 'tries', 'hints_used', 'score', 'difficulty')
+
+# Types of the entry fields that are folded into statistics and sorted on
+_ENTRY_TYPES = (('player_name', str), ('tries', int), ('hints_used', int), ('score', int))
+
+
+class LeaderboardServiceError(Exception):
+    """The service rejected a request."""
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split "host:port" (or ":port") into a (host, port) pair."""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def apply_delta(board: List[dict], delta: Dict[str, Any]) -> None:
+    """Apply one board delta to a local copy of the board, in place."""
+    for position, entry in delta['inserts']:
+        board.insert(position - 1, entry)
+    del board[delta['size']:]
+
+
+class _Subscriber:
+    """Deltas waiting to be pushed to one subscribed connection."""
+    
+    def __init__(self, difficulties: Iterable[str], max_pending: int) -> None:
+        self.difficulties = set(difficulties)
+        self.max_pending = max_pending
+        self.dropped = False
+        self._pending: Deque[Optional[dict]] = deque()
+        self._cond = threading.Condition()
+        
+    def push(self, delta: Optional[dict]) -> bool:
+        """Queue a delta (None closes the subscription); False if too far behind."""
+        with self._cond:
+            if delta is not None and len(self._pending) >= self.max_pending:
+                self.dropped = True
+                self._pending.clear()
+                self._pending.append(None)
+            else:
+                self._pending.append(delta)
+            self._cond.notify()
+            return not self.dropped
+            
+    def next(self) -> Optional[dict]:
+        """Wait for the next delta; None once the subscription is over."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending)
+            return self._pending.popleft()
+
+
+class LeaderboardService:
+    """Owns a scores file and serves it to local clients.
+    
+    Attributes:
+        filepath: Scores file owned by the service.
+        limit: Scores kept per difficulty.
+        epoch: Identifies this run of the service; versions restart with it.
+        requests: Requests handled.
+        adds: Score entries added.
+        writes: Times the store was written to disk.
+        cache_hits: Queries answered from a cached index.
+        cache_misses: Queries that had to build an index.
+        deltas_pushed: Deltas queued for subscribers.
+        subscribers_dropped: Subscribers disconnected for falling behind.
+    """
+    
+    def __init__(
+        self,
+        filepath: str = SCORES_FILE,
+        host: str = '127.0.0.1',
+        port: int = DEFAULT_PORT,
+        limit: int = MAX_SCORES,
+        history: int = 256,
+        max_pending: int = 1024
+    ) -> None:
+        """Load the store; call start() to begin serving.
+        
+        Args:
+            filepath: Scores file to own.
+            host: Interface to listen on (keep it local).
+            port: Port to listen on (0 picks a free port).
+            limit: Scores kept per difficulty.
+            history: Deltas kept per board for catching up.
+            max_pending: Unsent deltas at which a subscriber is dropped.
+        """
+        self.filepath = filepath
+        self.host = host
+        self.port = port
+        self.limit = limit
+        self._scores = load_scores(filepath)
+        self._player_stats = PlayerStatsStore(stats_path(filepath))
+        self._indexes: Dict[str, LeaderboardIndex] = {}
+        self.epoch = uuid.uuid4().hex[:12]
+        self.max_pending = max_pending
+        self._versions: Dict[str, int] = {key: 0 for key in self._scores}
+        self._deltas: Dict[str, Deque[dict]] = {key: deque(maxlen=history) for key in self._scores}
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._generation = 0
+        self._saved_generation = 0
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        
+        # Counters
+        self.requests = 0
+        self.adds = 0
+        self.writes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.deltas_pushed = 0
+        self.subscribers_dropped = 0
+        
+    def start(self) -> Tuple[str, int]:
+        """Start serving on a background thread.
+        
+        Returns:
+            The (host, port) actually bound.
+        """
+        service = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                service._serve_connection(self.rfile, self.wfile)
+                
+        server = socketserver.ThreadingTCPServer((self.host, self.port), Handler, bind_and_activate=False)
+        server.daemon_threads = True
+        server.allow_reuse_address = True
+        server.server_bind()
+        server.server_activate()
+        self._server = server
+        self.host, self.port = server.server_address[:2]
+        self._thread = threading.Thread(target=server.serve_forever, name='LeaderboardService', daemon=True)
+        self._thread.start()
+        return self.host, self.port
+        
+    def serve_forever(self) -> None:
+        """Start (if needed) and serve until stop() is called from another thread."""
+        if self._server is None:
+            self.start()
+        self._thread.join()
+        
+    def stop(self) -> None:
+        """Stop serving. Every acknowledged score is already on disk."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.push(None)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+            
+    def stats(self) -> Dict[str, int]:
+        """Return the service counters."""
+        return {
+            'requests': self.requests,
+            'adds': self.adds,
+            'writes': self.writes,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'subscribers': len(self._subscribers),
+            'deltas_pushed': self.deltas_pushed,
+            'subscribers_dropped': self.subscribers_dropped,
+        }
+        
+    def handle(self, ops: List[Dict[str, Any]]) -> List[Any]:
+        """Run one batch of operations and return their results.
+        
+        Raises:
+            LeaderboardServiceError: If an operation is malformed.
+        """
+        with self._lock:
+            self.requests += 1
+            start = self._generation
+        try:
+            with self._lock:
+                return [self._run(op) for op in ops]
+        finally:
+            # Saved even if a later operation in the batch failed
+            if self._generation != start:
+                self._commit(self._generation)
+                
+    def _run(self, op: Dict[str, Any]) -> Any:
+        """Run one operation; the store lock is held."""
+        if not isinstance(op, dict):
+            raise LeaderboardServiceError("operation must be an object")
+        name = op.get('op')
+        try:
+            if name == 'add':
+                return self._add(op['entries'])
+            if name == 'page':
+                index = self._index(int(op['difficulty']))
+                return index.page(int(op.get('start', 1)), int(op.get('count', PAGE_SIZE)))
+            if name == 'rank':
+                return self._index(int(op['difficulty'])).rank_of_player(str(op['player_name']))
+            if name == 'score_rank':
+                return self._index(int(op['difficulty'])).rank_of_score(int(op['score']), int(op['tries']))
+            if name == 'changes':
+                return self._changes(str(int(op['difficulty'])), int(op.get('since', 0)), op.get('epoch'))
+            if name == 'stats':
+                return self.stats()
+        except (KeyError, TypeError, ValueError) as e:
+            raise LeaderboardServiceError(f"bad {name} operation: {e!r}") from e
+        raise LeaderboardServiceError(f"unknown operation {name!r}")
+        
+    def _add(self, entries: List[dict]) -> List[Optional[int]]:
+        """Merge entries into the in-memory store."""
+        # Validate everything first so a bad entry changes nothing
+        for entry in entries:
+            if not isinstance(entry, dict):
+                raise TypeError(f"entry must be an object, not {entry!r}")
+            missing = [f for f in _ENTRY_FIELDS if f not in entry]
+            if missing:
+                raise KeyError(f"entry missing {', '.join(missing)}")
+            for field, kind in _ENTRY_TYPES:
+                value = entry[field]
+                if not isinstance(value, kind) or isinstance(value, bool):
+                    raise TypeError(f"entry {field} must be {kind.__name__}, not {value!r}")
+            if str(entry['difficulty']) not in self._scores:
+                raise ValueError(f"unknown difficulty {entry['difficulty']!r}")
+        placed = place_scores(self._scores, entries, self._player_stats, self.limit)
+        
+        # One delta per board: the new rows at their final positions, best first
+        inserted: Dict[str, List[int]] = {}
+        ranks: List[Optional[int]] = []
+        for entry_place in placed:
+            if entry_place is None:
+                ranks.append(None)
+                continue
+            key, position = entry_place
+            inserted.setdefault(key, []).append(position)
+            ranks.append(rank_at(self._scores[key], position))
+        for key, positions in inserted.items():
+            board = self._scores[key]
+            self._indexes.pop(key, None)
+            self._versions[key] += 1
+            delta = {
+                'difficulty': int(key),
+                'version': self._versions[key],
+                'inserts': [[position, board[position - 1]] for position in sorted(positions)],
+                'size': len(board),
+            }
+            self._deltas[key].append(delta)
+            self._publish(key, delta)
+        self.adds += len(entries)
+        self._generation += 1
+        return ranks
+        
+    def _publish(self, key: str, delta: dict) -> None:
+        """Queue a delta for every subscriber of its board; the store lock is held."""
+        for subscriber in list(self._subscribers):
+            if key in subscriber.difficulties:
+                self.deltas_pushed += 1
+                if not subscriber.push(delta):
+                    self._subscribers.remove(subscriber)
+                    self.subscribers_dropped += 1
+                    
+    def _changes(self, key: str, since: int, epoch: Optional[str]) -> Dict[str, Any]:
+        """Catch-up for a client holding version `since`; the store lock is held."""
+        if key not in self._versions:
+            raise ValueError(f"unknown difficulty {key}")
+        version = self._versions[key]
+        result: Dict[str, Any] = {'difficulty': int(key), 'epoch': self.epoch, 'version': version}
+        deltas = self._deltas[key]
+        oldest = deltas[0]['version'] if deltas else version + 1
+        if epoch == self.epoch and since <= version and since + 1 >= oldest:
+            result['deltas'] = [d for d in deltas if d['version'] > since]
+        else:
+            result['board'] = list(self._scores[key])
+        return result
+        
+    def _index(self, difficulty: int) -> LeaderboardIndex:
+        """Return the cached index for a difficulty, building it if needed."""
+        key = str(difficulty)
+        index = self._indexes.get(key)
+        if index is not None:
+            self.cache_hits += 1
+            return index
+        self.cache_misses += 1
+        index = self._indexes[key] = LeaderboardIndex(self._scores.get(key, []))
+        return index
+        
+    def _commit(self, generation: int) -> None:
+        """Make sure the store as of `generation` is on disk.
+        
+        Only one thread writes at a time. A thread that waited while
+        another wrote usually finds its changes already saved.
+        """
+        with self._write_lock:
+            if self._saved_generation >= generation:
+                return
+            with self._lock:
+                saving = self._generation
+                save_scores(self._scores, self.filepath)
+                self._player_stats.save()
+                self.writes += 1
+            self._saved_generation = saving
+            
+    def _serve_connection(self, rfile, wfile) -> None:
+        """Answer requests on one connection until the client closes it."""
+        while True:
+            line = rfile.readline(MAX_REQUEST_SIZE + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST_SIZE:
+                wfile.write(b'{"error": "request too large"}\n')
+                return
+            try:
+                request = json.loads(line)
+                ops = request['ops']
+                if len(ops) == 1 and isinstance(ops[0], dict) and ops[0].get('op') == 'subscribe':
+                    self._serve_subscription(ops[0], wfile)
+                    return
+                response = {'results': self.handle(ops)}
+            except (LeaderboardServiceError, ValueError, KeyError, TypeError) as e:
+                response = {'error': str(e)}
+            except OSError as e:
+                # Not saved yet; the next write that succeeds includes it
+                response = {'error': f"could not save scores: {e}"}
+            wfile.write(json.dumps(response, separators=(',', ':')).encode('utf-8') + b'\n')
+            wfile.flush()
+            
+    def _serve_subscription(self, op: Dict[str, Any], wfile) -> None:
+        """Send the catch-up for each board, then push deltas until the end."""
+        try:
+            keys = [str(int(d)) for d in op.get('difficulties', self._versions)]
+            since = {str(k): int(v) for k, v in (op.get('since') or {}).items()}
+        except (TypeError, ValueError, AttributeError) as e:
+            raise LeaderboardServiceError(f"bad subscribe operation: {e!r}") from e
+        subscriber = _Subscriber(keys, self.max_pending)
+        with self._lock:
+            self.requests += 1
+            results = [self._changes(key, since.get(key, 0), op.get('epoch')) for key in keys]
+            self._subscribers.append(subscriber)
+        try:
+            wfile.write(json.dumps({'results': [results]}, separators=(',', ':')).encode('utf-8') + b'\n')
+            wfile.flush()
+            while True:
+                delta = subscriber.next()
+                if delta is None:
+                    return
+                wfile.write(json.dumps({'delta': delta}, separators=(',', ':')).encode('utf-8') + b'\n')
+                wfile.flush()
+        finally:
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+
+class LeaderboardClient:
+    """Connection to a leaderboard service, reused across calls. Thread-safe.
+    
+    Attributes:
+        connections: Connections opened so far.
+        limit: Scores kept per difficulty by the service (assumed MAX_SCORES).
+    """
+    
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = DEFAULT_PORT,
+        timeout: float = 5.0,
+        limit: int = MAX_SCORES
+    ) -> None:
+        """Create a client; it connects on first use.
+        
+        Args:
+            host: Service address.
+            port: Service port.
+            timeout: Socket timeout in seconds.
+            limit: The service's per-difficulty limit.
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.limit = limit
+        self.connections = 0
+        self._sock: Optional[socket.socket] = None
+        self._rfile = None
+        self._lock = threading.Lock()
+        
+    def request(self, ops: List[Dict[str, Any]]) -> List[Any]:
+        """Send one batch of operations and return their results.
+        
+        A batch of reads is retried once on a fresh connection if the
+        reused one turns out to be dead; a batch that adds scores is not,
+        since the service may already have applied it.
+        
+        Raises:
+            LeaderboardServiceError: If the service rejected the request.
+            OSError: If the service cannot be reached.
+        """
+        line = json.dumps({'ops': ops}, separators=(',', ':')).encode('utf-8') + b'\n'
+        retry = all(op.get('op') in _READ_OPS for op in ops)
+        with self._lock:
+            reused = self._sock is not None
+            try:
+                response = self._exchange(line)
+            except OSError:
+                self._disconnect()
+                if not (reused and retry):
+                    raise
+                response = self._exchange(line)
+        if 'error' in response:
+            raise LeaderboardServiceError(response['error'])
+        return response['results']
+        
+    def _exchange(self, line: bytes) -> Dict[str, Any]:
+        """Write one request line and read the response line; the lock is held."""
+        if self._sock is None:
+            self._sock = socket.create_connection((self.host, self.port), self.timeout)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._rfile = self._sock.makefile('rb')
+            self.connections += 1
+        self._sock.sendall(line)
+        reply = self._rfile.readline()
+        if not reply:
+            raise ConnectionError("leaderboard service closed the connection")
+        return json.loads(reply)
+        
+    def _disconnect(self) -> None:
+        """Drop the current connection; the lock is held."""
+        if self._sock is not None:
+            try:
+                self._rfile.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._rfile = None
+        
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self._disconnect()
+            
+    def add_scores(self, entries: Iterable[ScoreInput]) -> List[Optional[int]]:
+        """Add scores in one request; returns a rank (or None) per entry."""
+        rows = [asdict(e) if is_dataclass(e) else dict(e) for e in entries]
+        return self.request([{'op': 'add', 'entries': rows}])[0]
+        
+    def page(self, difficulty: int, start_rank: int = 1, count: int = PAGE_SIZE) -> List[dict]:
+        """Return a range of leaderboard entries."""
+        return self.request([{'op': 'page', 'difficulty': difficulty, 'start': start_rank, 'count': count}])[0]
+        
+    def rank(self, player_name: str, difficulty: int) -> Optional[int]:
+        """Return a player's best rank, or None."""
+        return self.request([{'op': 'rank', 'difficulty': difficulty, 'player_name': player_name}])[0]
+        
+    def changes(self, difficulty: int, since: int = 0, epoch: Optional[str] = None) -> Dict[str, Any]:
+        """Return the deltas after version `since`, or the whole board.
+        
+        The result has 'epoch' and 'version', plus either 'deltas' to
+        apply in order or 'board' if the service can no longer catch the
+        caller up (or `epoch` is not the service's current one).
+        """
+        op = {'op': 'changes', 'difficulty': difficulty, 'since': since, 'epoch': epoch}
+        return self.request([op])[0]
+        
+    def stats(self) -> Dict[str, int]:
+        """Return the service counters."""
+        return self.request([{'op': 'stats'}])[0]
+
+
+class LeaderboardFeed:
+    """Live copy of leaderboards, kept current by a service subscription.
+    
+    A background thread subscribes to the service and applies each delta
+    to its boards. If the connection drops (or a delta is missing) it
+    resubscribes with the versions it holds, so only the missed changes
+    are sent unless the service has restarted or no longer has them.
+    
+    Attributes:
+        deltas_applied: Deltas applied to the local boards.
+        full_reloads: Boards replaced wholesale.
+        reconnects: Times the subscription was re-established.
+    """
+    
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = DEFAULT_PORT,
+        difficulties: Iterable[int] = (4, 5, 6),
+        on_change: Optional[Callable[[int, List[dict], Optional[dict]], None]] = None,
+        reconnect_delay: float = 1.0,
+        timeout: float = 5.0
+    ) -> None:
+        """Start following the service.
+        
+        Args:
+            host: Service address.
+            port: Service port.
+            difficulties: Boards to follow.
+            on_change: Called from the feed's thread as (difficulty, board,
+                delta) after each change; delta is None for a full reload.
+                The board is the feed's own list; copy it to keep it.
+            reconnect_delay: Seconds to wait before resubscribing.
+            timeout: Connect timeout in seconds.
+        """
+        self.host = host
+        self.port = port
+        self.on_change = on_change
+        self.reconnect_delay = reconnect_delay
+        self.timeout = timeout
+        self.deltas_applied = 0
+        self.full_reloads = 0
+        self.reconnects = 0
+        self._keys = [str(d) for d in difficulties]
+        self._boards: Dict[str, List[dict]] = {key: [] for key in self._keys}
+        self._versions: Dict[str, int] = {key: 0 for key in self._keys}
+        self._epoch: Optional[str] = None
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._thread = threading.Thread(target=self._run, name='LeaderboardFeed', daemon=True)
+        self._thread.start()
+        
+    def board(self, difficulty: int) -> List[dict]:
+        """Return a copy of the local board for a difficulty."""
+        with self._lock:
+            return list(self._boards[str(difficulty)])
+            
+    def version(self, difficulty: int) -> int:
+        """Return the version of the local board for a difficulty."""
+        with self._lock:
+            return self._versions[str(difficulty)]
+            
+    def wait_synced(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the boards have been loaded; False on timeout."""
+        return self._synced.wait(timeout)
+        
+    def close(self) -> None:
+        """Stop following the service."""
+        self._stopped.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._thread.join(timeout=2.0)
+        
+    def _run(self) -> None:
+        """Subscribe, follow, and resubscribe until closed."""
+        while not self._stopped.is_set():
+            try:
+                self._follow()
+            except (OSError, ValueError, KeyError, LeaderboardServiceError):
+                pass
+            if self._stopped.wait(self.reconnect_delay):
+                return
+            self.reconnects += 1
+            
+    def _follow(self) -> None:
+        """One subscription: catch up, then apply deltas until it ends."""
+        sock = socket.create_connection((self.host, self.port), self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(None)
+        self._sock = sock
+        try:
+            with sock, sock.makefile('rb') as rfile:
+                op = {
+                    'op': 'subscribe', 'difficulties': [int(k) for k in self._keys],
+                    'since': dict(self._versions), 'epoch': self._epoch,
+                }
+                sock.sendall(json.dumps({'ops': [op]}, separators=(',', ':')).encode('utf-8') + b'\n')
+                response = json.loads(rfile.readline() or b'{}')
+                if 'error' in response:
+                    raise LeaderboardServiceError(response['error'])
+                for catch_up in response['results'][0]:
+                    self._catch_up(catch_up)
+                self._synced.set()
+                for line in rfile:
+                    delta = json.loads(line)['delta']
+                    if delta['version'] != self._versions[str(delta['difficulty'])] + 1:
+                        return  # missed one; resubscribe to catch up
+                    self._apply(delta)
+        finally:
+            self._sock = None
+            
+    def _catch_up(self, result: Dict[str, Any]) -> None:
+        """Apply a `changes` result for one board."""
+        key = str(result['difficulty'])
+        self._epoch = result['epoch']
+        if 'board' in result:
+            with self._lock:
+                self._boards[key] = result['board']
+                self._versions[key] = result['version']
+            self.full_reloads += 1
+            if self.on_change:
+                self.on_change(int(key), self._boards[key], None)
+        else:
+            for delta in result['deltas']:
+                self._apply(delta)
+                
+    def _apply(self, delta: Dict[str, Any]) -> None:
+        """Apply one delta to the local board."""
+        key = str(delta['difficulty'])
+        with self._lock:
+            apply_delta(self._boards[key], delta)
+            self._versions[key] = delta['version']
+        self.deltas_applied += 1
+        if self.on_change:
+            self.on_change(int(key), self._boards[key], delta)
+
+
+def main() -> None:
+    """Run the leaderboard service from the command line."""
+    parser = argparse.ArgumentParser(description="Numbers Game leaderboard service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--file', default=SCORES_FILE, help="scores file to own")
+    parser.add_argument('--limit', type=int, default=MAX_SCORES, help="scores kept per difficulty")
+    args = parser.parse_args()
+    
+    service = LeaderboardService(args.file, args.host, args.port, args.limit)
+    host, port = service.start()
+    print(f"Leaderboard service for {args.file} on {host}:{port}")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        service.stop()
+
+
+if __name__ == '__main__':
+    main()
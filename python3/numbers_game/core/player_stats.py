@@ -0,0 +1,323 @@
+"""Per-player statistics for the Numbers Game.
+
+Aggregates (games, wins, average tries and hints, best score, current
+streak) are updated incrementally as games finish, so showing them never
+requires scanning the full game history.
+
+Every finished game, won or not, is appended as one line to a game
+history log next to the high scores file; recording a game never
+rewrites anything. The aggregates are cached in a compact JSON snapshot
+that notes how much of the log it covers: opening a store loads the
+snapshot and folds in the rest of the log, and the snapshot is rewritten
+once SNAPSHOT_EVERY games have been folded in since the last one. As the
+log holds every game, the aggregates can always be rebuilt from it.
+"""
+
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .storage import append_lines, atomic_write
+
+# Games folded in from the history log between snapshot rewrites
+SNAPSHOT_EVERY = 256
+
+# (player_name, won, tries, hints_used, score) for one finished game
+GameRecord = Tuple[str, bool, int, int, int]
+
+
+def stats_path(scores_filepath: str) -> str:
+    """Return the stats store path that belongs to a scores file.
+    
+    Args:
+        scores_filepath: Path to the high scores file.
+        
+    Returns:
+        Path of the stats file in the same directory.
+    """
+    base, _ = os.path.splitext(scores_filepath)
+    return base + '_stats.json'
+
+
+def history_path(stats_filepath: str) -> str:
+    """Return the game history log path that belongs to a stats file."""
+    return os.path.splitext(stats_filepath)[0] + '.log'
+
+
+def _game_line(game: GameRecord) -> str:
+    """Serialize one game to a history log line."""
+    player_name, won, tries, hints_used, score = game
+    return json.dumps(
+        [player_name, int(bool(won)), tries, hints_used, score],
+        ensure_ascii=False, separators=(',', ':')
+    ) + '\n'
+
+
+def log_games(stats_filepath: str, games: Iterable[GameRecord]) -> None:
+    """Append finished games to the history log without opening the store.
+    
+    The aggregates pick the games up the next time a store is opened (or
+    saved).
+    
+    Args:
+        stats_filepath: Path of the stats file the log belongs to.
+        games: (player_name, won, tries, hints_used, score) per game.
+    """
+    text = ''.join(_game_line(game) for game in games)
+    if text:
+        append_lines(history_path(stats_filepath), text)
+
+
+def _valid_game(player_name, won, tries, hints_used, score) -> bool:
+    """Check the field types of a game read back from the history log."""
+    numbers = (won, tries, hints_used, score)
+    return isinstance(player_name, str) and all(
+        isinstance(n, int) and not isinstance(n, bool) for n in numbers
+    )
+
+
+@dataclass
+class PlayerStats:
+    """Aggregated statistics for one player."""
+    games: int = 0
+    wins: int = 0
+    total_tries: int = 0
+    total_hints: int = 0
+    best_score: int = 0
+    current_streak: int = 0
+    
+    @property
+    def avg_tries(self) -> float:
+        """Average tries per game."""
+        return self.total_tries / self.games if self.games else 0.0
+        
+    @property
+    def avg_hints(self) -> float:
+        """Average hints per game."""
+        return self.total_hints / self.games if self.games else 0.0
+        
+    def to_row(self) -> List[int]:
+        """Serialize to the compact on-disk row."""
+        return [self.games, self.wins, self.total_tries, self.total_hints,
+                self.best_score, self.current_streak]
+        
+    @classmethod
+    def from_row(cls, row: List[int]) -> 'PlayerStats':
+        """Deserialize from the compact on-disk row."""
+        return cls(*row)
+
+
+class PlayerStatsStore:
+    """Incrementally maintained per-player statistics.
+    
+    Each recorded game is an O(1) update of the in-memory aggregates.
+    For a store opened from a file, `save()` appends the games recorded
+    since the last save to the history log.
+    
+    Attributes:
+        filepath: Path of the snapshot file, or None for an in-memory store.
+        history_filepath: Path of the game history log.
+    """
+    
+    def __init__(self, filepath: Optional[str] = None) -> None:
+        """Open a store: load the snapshot, then fold in the newer history.
+        
+        A missing or corrupt snapshot is recovered by replaying the whole
+        history log.
+        
+        Args:
+            filepath: Path of the stats file.
+        """
+        self.filepath = filepath
+        self.history_filepath = history_path(filepath) if filepath else None
+        self._stats: Dict[str, PlayerStats] = {}
+        # Bytes of the history log folded into _stats
+        self._offset = 0
+        # Games folded in since the snapshot was written
+        self._unsnapshotted = 0
+        # Log lines of games recorded here but not saved yet
+        self._pending: List[str] = []
+        if filepath and os.path.exists(filepath):
+            try:
+                with open(filepath, 'r') as f:
+                    snapshot = json.load(f)
+                rows = snapshot.get('players')
+                if isinstance(rows, dict):
+                    self._offset = int(snapshot['offset'])
+                else:
+                    # Written before the history log existed
+                    rows = snapshot
+                self._stats = {name: PlayerStats.from_row(row) for name, row in rows.items()}
+            except (json.JSONDecodeError, IOError, TypeError, ValueError, KeyError, AttributeError):
+                self._stats = {}
+                self._offset = 0
+        self.refresh()
+        
+    def __len__(self) -> int:
+        """Number of players with statistics."""
+        return len(self._stats)
+        
+    def players(self) -> List[str]:
+        """Names of all players with statistics, sorted."""
+        return sorted(self._stats)
+        
+    def get(self, player_name: str) -> Optional[PlayerStats]:
+        """Get a player's statistics, or None if they have never played."""
+        return self._stats.get(player_name)
+        
+    def record_game(
+        self,
+        player_name: str,
+        won: bool,
+        tries: int,
+        hints_used: int,
+        score: int = 0
+    ) -> PlayerStats:
+        """Fold one finished game into a player's aggregates.
+        
+        Args:
+            player_name: Name of the player.
+            won: Whether the player cracked the number.
+            tries: Number of tries used.
+            hints_used: Number of hints used.
+            score: Final score (only counts for wins).
+            
+        Returns:
+            The player's updated statistics.
+        """
+        if self.filepath:
+            self._pending.append(_game_line((player_name, won, tries, hints_used, score)))
+        return self._fold(player_name, won, tries, hints_used, score)
+        
+    def _fold(self, player_name: str, won: bool, tries: int, hints_used: int, score: int) -> PlayerStats:
+        """Add one game to the in-memory aggregates."""
+        stats = self._stats.get(player_name)
+        if stats is None:
+            stats = self._stats[player_name] = PlayerStats()
+        stats.games += 1
+        stats.total_tries += tries
+        stats.total_hints += hints_used
+        if won:
+            stats.wins += 1
+            stats.current_streak += 1
+            stats.best_score = max(stats.best_score, score)
+        else:
+            stats.current_streak = 0
+        return stats
+        
+    def refresh(self) -> int:
+        """Fold in games other writers appended to the history log.
+        
+        Returns:
+            Number of games folded in.
+        """
+        if not self.history_filepath:
+            return 0
+        try:
+            with open(self.history_filepath, 'rb') as f:
+                self._offset = min(self._offset, os.fstat(f.fileno()).st_size)
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return 0
+        # A last line without its newline is still being written
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        return self._fold_lines(data[:end].splitlines())
+        
+    def _fold_lines(self, lines: Iterable[bytes], skip: Optional[Counter] = None) -> int:
+        """Fold history log lines into the aggregates, except those in `skip`."""
+        count = 0
+        for line in lines:
+            if skip and skip[line]:
+                skip[line] -= 1
+                continue
+            try:
+                player_name, won, tries, hints_used, score = json.loads(line)
+            except (ValueError, TypeError):
+                continue  # cut short by a crash
+            if not _valid_game(player_name, won, tries, hints_used, score):
+                continue
+            self._fold(player_name, bool(won), tries, hints_used, score)
+            count += 1
+        self._unsnapshotted += count
+        return count
+        
+    def save(self) -> None:
+        """Append the games recorded since the last save to the history log.
+        
+        Games other writers logged meanwhile are folded in on the way. The
+        snapshot is rewritten once SNAPSHOT_EVERY games have been folded in
+        since the last one.
+        """
+        if not self.filepath:
+            return
+        self.refresh()
+        if self._pending:
+            start = self._offset
+            end = append_lines(self.history_filepath, ''.join(self._pending))
+            # Our games are already counted; fold in any that landed in between
+            with open(self.history_filepath, 'rb') as f:
+                f.seek(start)
+                lines = f.read(end - start).splitlines()
+            self._offset = end
+            self._unsnapshotted += len(self._pending)
+            self._fold_lines(lines, Counter(line.rstrip('\n').encode('utf-8') for line in self._pending))
+            self._pending = []
+        if self._unsnapshotted >= SNAPSHOT_EVERY:
+            self._write_snapshot()
+            
+    def _write_snapshot(self) -> None:
+        """Write the aggregates and the history offset they cover."""
+        rows = {name: stats.to_row() for name, stats in self._stats.items()}
+        snapshot = {'offset': self._offset, 'players': rows}
+        atomic_write(self.filepath, json.dumps(snapshot, separators=(',', ':')))
+        self._unsnapshotted = 0
+        
+    def rebuild(self) -> None:
+        """Recompute all aggregates from the full game history log.
+        
+        Unsaved games are saved first. Does nothing for an in-memory store.
+        """
+        if not self.filepath:
+            return
+        self.save()
+        self._stats = {}
+        self._offset = 0
+        self.refresh()
+        self._write_snapshot()
+
+
+def display_player_stats(player_names: Iterable[str], store: PlayerStatsStore) -> str:
+    """Generate a formatted statistics table for some players.
+    
+    Args:
+        player_names: Players to show, in display order (duplicates skipped).
+        store: Store to read statistics from.
+        
+    Returns:
+        Formatted table, or an empty string if none of the players has stats.
+    """
+    lines = []
+    seen = set()
+    for name in player_names:
+        stats = store.get(name)
+        if name in seen or stats is None:
+            continue
+        seen.add(name)
+        lines.append(
+            f"{name:<15}{stats.games:<7}{stats.wins:<6}{stats.avg_tries:<8.1f}"
+            f"{stats.avg_hints:<8.1f}{stats.best_score:<6}{stats.current_streak}"
+        )
+    if not lines:
+        return ""
+    header = [
+        "\n📊 Player Stats",
+        "-" * 50,
+        f"{'Name':<15}{'Games':<7}{'Wins':<6}{'Tries':<8}{'Hints':<8}{'Best':<6}{'Streak'}",
+        "-" * 50,
+    ]
+    return "\n".join(header + lines)
+
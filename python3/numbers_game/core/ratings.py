@@ -0,0 +1,229 @@
+"""Elo ratings for two-player and online matches.
+
+Each finished match is an O(1) Elo update of the two players' ratings.
+Ratings are also kept in a list sorted best first, so top-N and
+rank-of-player queries are binary searches and slices rather than a
+recomputation from match history; moving a player after an update is one
+bisect and one list shift. Updates are written back in batches: the
+store saves itself every `batch_size` matches, and `save()` writes the
+rest (e.g. on exit).
+"""
+
+import bisect
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .storage import atomic_write
+
+DEFAULT_RATING = 1500.0
+
+# Rating points at stake in one match
+K_FACTOR = 32.0
+
+# Match outcomes, as the first player's score
+WIN = 1.0
+DRAW = 0.5
+LOSS = 0.0
+
+
+def ratings_path(scores_filepath: str) -> str:
+    """Return the ratings store path that belongs to a scores file.
+    
+    Args:
+        scores_filepath: Path to the high scores file.
+        
+    Returns:
+        Path of the ratings file in the same directory.
+    """
+    base, _ = os.path.splitext(scores_filepath)
+    return base + '_ratings.json'
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    """Probability-like score a player is expected to take from a match."""
+    return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / 400.0))
+
+
+@dataclass
+class PlayerRating:
+    """Rating and match record for one player."""
+    rating: float = DEFAULT_RATING
+    games: int = 0
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    
+    def to_row(self) -> List[float]:
+        """Serialize to the compact on-disk row."""
+        return [round(self.rating, 2), self.games, self.wins, self.losses, self.draws]
+        
+    @classmethod
+    def from_row(cls, row: List[float]) -> 'PlayerRating':
+        """Deserialize from the compact on-disk row."""
+        return cls(float(row[0]), *(int(v) for v in row[1:]))
+
+
+class RatingStore:
+    """Incrementally maintained Elo ratings with ranked queries.
+    
+    Ranks use competition ranking, like the leaderboards: a player's rank
+    is one more than the number of players rated strictly higher.
+    
+    Attributes:
+        filepath: Path of the backing file, or None for an in-memory store.
+        k_factor: Rating points at stake in one match.
+        batch_size: Matches recorded between automatic saves.
+        unsaved: Matches recorded since the last save.
+    """
+    
+    def __init__(
+        self,
+        filepath: Optional[str] = None,
+        k_factor: float = K_FACTOR,
+        batch_size: int = 32
+    ) -> None:
+        """Open a store, loading existing ratings if the file exists.
+        
+        Args:
+            filepath: Path of the ratings file.
+            k_factor: Rating points at stake in one match.
+            batch_size: Matches recorded between automatic saves.
+        """
+        self.filepath = filepath
+        self.k_factor = k_factor
+        self.batch_size = batch_size
+        self.unsaved = 0
+        self._ratings: Dict[str, PlayerRating] = {}
+        if filepath and os.path.exists(filepath):
+            try:
+                with open(filepath, 'r') as f:
+                    rows = json.load(f)
+                self._ratings = {name: PlayerRating.from_row(row) for name, row in rows.items()}
+            except (json.JSONDecodeError, IOError, TypeError, ValueError, IndexError, AttributeError):
+                # AttributeError: valid JSON that is not an object
+                self._ratings = {}
+        # (-rating, name) per player, best first
+        self._order: List[Tuple[float, str]] = sorted(
+            (-r.rating, name) for name, r in self._ratings.items()
+        )
+        
+    def __len__(self) -> int:
+        """Number of rated players."""
+        return len(self._ratings)
+        
+    def get(self, player_name: str) -> Optional[PlayerRating]:
+        """Get a player's rating record, or None if they have never played."""
+        return self._ratings.get(player_name)
+        
+    def rating(self, player_name: str) -> float:
+        """Get a player's rating (DEFAULT_RATING for a newcomer)."""
+        record = self._ratings.get(player_name)
+        return record.rating if record is not None else DEFAULT_RATING
+        
+    def record_match(self, player_a: str, player_b: str, score_a: float) -> Tuple[float, float]:
+        """Fold one finished match into both players' ratings.
+        
+        Args:
+            player_a: Name of one player.
+            player_b: Name of the other player.
+            score_a: WIN, DRAW or LOSS, from player_a's point of view.
+            
+        Returns:
+            The players' new ratings, (player_a's, player_b's).
+            
+        Raises:
+            ValueError: If a player would play themselves or the score is
+                not between 0 and 1.
+        """
+        if player_a == player_b:
+            raise ValueError("A player cannot be rated against themselves")
+        if not 0.0 <= score_a <= 1.0:
+            raise ValueError(f"Match score must be between 0 and 1, got {score_a}")
+        a = self._record(player_a)
+        b = self._record(player_b)
+        delta = self.k_factor * (score_a - expected_score(a.rating, b.rating))
+        self._move(player_a, a, a.rating + delta)
+        self._move(player_b, b, b.rating - delta)
+        for record, score in ((a, score_a), (b, 1.0 - score_a)):
+            record.games += 1
+            if score == WIN:
+                record.wins += 1
+            elif score == LOSS:
+                record.losses += 1
+            else:
+                record.draws += 1
+                
+        self.unsaved += 1
+        if self.unsaved >= self.batch_size:
+            self.save()
+        return a.rating, b.rating
+        
+    def _record(self, player_name: str) -> PlayerRating:
+        """Get a player's record, adding a newcomer at the default rating."""
+        record = self._ratings.get(player_name)
+        if record is None:
+            record = self._ratings[player_name] = PlayerRating()
+            bisect.insort(self._order, (-record.rating, player_name))
+        return record
+        
+    def _move(self, player_name: str, record: PlayerRating, rating: float) -> None:
+        """Change a player's rating and their place in the order."""
+        del self._order[bisect.bisect_left(self._order, (-record.rating, player_name))]
+        record.rating = rating
+        bisect.insort(self._order, (-rating, player_name))
+        
+    def rank(self, player_name: str) -> Optional[int]:
+        """Rank of a player (1 = best), or None if they are not rated."""
+        record = self._ratings.get(player_name)
+        if record is None:
+            return None
+        return bisect.bisect_left(self._order, (-record.rating,)) + 1
+        
+    def top(self, count: int = 10, start_rank: int = 1) -> List[Tuple[str, PlayerRating]]:
+        """Return a range of players by rating, best first.
+        
+        Args:
+            count: Number of players to return.
+            start_rank: First position to return (1-indexed).
+            
+        Returns:
+            (name, rating record) pairs.
+        """
+        start = max(start_rank, 1) - 1
+        return [(name, self._ratings[name]) for _, name in self._order[start:start + count]]
+        
+    def save(self) -> None:
+        """Write the ratings to the backing file."""
+        self.unsaved = 0
+        if not self.filepath:
+            return
+        rows = {name: record.to_row() for name, record in self._ratings.items()}
+        atomic_write(self.filepath, json.dumps(rows, separators=(',', ':')))
+
+
+def display_ratings(store: RatingStore, count: int = 10) -> str:
+    """Generate a formatted table of the best-rated players.
+    
+    Args:
+        store: Store to read ratings from.
+        count: Number of players to show.
+        
+    Returns:
+        Formatted table.
+    """
+    lines = [
+        "\n⚔️ Match Ratings",
+        "-" * 50,
+        f"{'Rank':<6}{'Name':<15}{'Rating':<8}{'Games':<7}{'W-L-D'}",
+        "-" * 50,
+    ]
+    if not len(store):
+        lines.append("No matches played yet!")
+    for name, record in store.top(count):
+        lines.append(
+            f"{store.rank(name):<6}{name:<15}{record.rating:<8.0f}{record.games:<7}"
+            f"{record.wins}-{record.losses}-{record.draws}"
+        )
+    return "\n".join(lines)
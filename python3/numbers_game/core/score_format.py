@@ -0,0 +1,242 @@
+"""Compact binary file format for high scores.
+
+Layout (little-endian):
+
+    header   magic b'NGSB', uint8 version, 3 pad bytes,
+             uint32 name count, uint32 record count
+    names    per name: uint16 byte length + UTF-8 bytes
+    records  fixed 24-byte records: uint32 name index, uint16 tries,
+             uint16 hints used, int32 score, uint8 difficulty, 3 pad
+             bytes, int64 date as epoch seconds (0 = unknown, -n = the
+             n-th entry of the date table)
+    dates    uint32 count, then per date: uint16 byte length + UTF-8 bytes
+
+Dates that do not survive the trip through epoch seconds (another format,
+or a local time skipped by a DST change) are kept verbatim in the date
+table. Counters beyond the field widths saturate when written. Version 1
+files, which have no date table, are still read.
+
+Player names are interned, so each name is stored once however many
+scores it has. Records are decoded straight out of the file buffer with
+`struct.iter_unpack` over a memoryview, without intermediate copies.
+"""
+
+import mmap
+import os
+import struct
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+MAGIC = b'NGSB'
+VERSION = 2
+DATE_FORMAT = '%Y-%m-%d %H:%M'
+
+_HEADER = struct.Struct('<4sB3xII')
+_NAME_LEN = struct.Struct('<H')
+_RECORD = struct.Struct('<IHHiB3xq')
+_COUNT = struct.Struct('<I')
+
+_UINT16_MAX = 0xFFFF
+_INT32_MIN, _INT32_MAX = -0x80000000, 0x7FFFFFFF
+
+
+class ScoreFormatError(ValueError):
+    """Raised when a binary scores file is malformed."""
+
+
+def is_binary(data: bytes) -> bool:
+    """Check whether a buffer starts with the binary scores magic."""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def _date_to_epoch(date: str, cache: Dict[str, int], table: List[str]) -> int:
+    """Convert a leaderboard date string to its record field.
+    
+    Returns epoch seconds, or -n for a date stored verbatim as the n-th
+    entry of `table`.
+    """
+    epoch = cache.get(date)
+    if epoch is None:
+        epoch = 0
+        if date:
+            try:
+                epoch = int(datetime.strptime(date, DATE_FORMAT).timestamp())
+            except (TypeError, ValueError, OverflowError, OSError):
+                pass
+            if epoch <= 0 or _epoch_to_date(epoch) != date:
+                table.append(str(date))
+                epoch = -len(table)
+        cache[date] = epoch
+    return epoch
+
+
+def _epoch_to_date(epoch: int) -> str:
+    """Convert epoch seconds back to a leaderboard date string."""
+    return datetime.fromtimestamp(epoch).strftime(DATE_FORMAT) if epoch else ''
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    """Saturate a value to a field's range."""
+    return min(max(int(value), low), high)
+
+
+def _pack_strings(strings: Iterable[str]) -> bytes:
+    """Encode strings as uint16 length-prefixed UTF-8."""
+    out = bytearray()
+    for text in strings:
+        raw = text.encode('utf-8')
+        if len(raw) > _UINT16_MAX:
+            # Cut on a character boundary
+            raw = raw[:_UINT16_MAX].decode('utf-8', 'ignore').encode('utf-8')
+        out += _NAME_LEN.pack(len(raw)) + raw
+    return bytes(out)
+
+
+def _unpack_strings(data: memoryview, offset: int, count: int) -> Tuple[List[str], int]:
+    """Decode `count` length-prefixed strings; return them and the end offset."""
+    strings = []
+    for _ in range(count):
+        (length,) = _NAME_LEN.unpack_from(data, offset)
+        offset += _NAME_LEN.size
+        if offset + length > len(data):
+            raise ScoreFormatError("Truncated string table")
+        strings.append(str(data[offset:offset + length], 'utf-8'))
+        offset += length
+    return strings, offset
+
+
+def encode_scores(scores: Dict[str, List[dict]]) -> bytes:
+    """Serialize a scores dictionary to the binary format.
+    
+    Tries, hints used and scores outside their fields' ranges are
+    saturated rather than rejected.
+    
+    Args:
+        scores: Dictionary with difficulty levels as keys and lists of scores.
+        
+    Returns:
+        The encoded file contents.
+        
+    Raises:
+        ScoreFormatError: If a difficulty key is not a number from 0 to 255.
+    """
+    name_index: Dict[str, int] = {}
+    date_cache: Dict[str, int] = {}
+    date_table: List[str] = []
+    records = bytearray()
+    count = 0
+    pack = _RECORD.pack
+    
+    for key, board in scores.items():
+        try:
+            difficulty = int(key)
+        except ValueError:
+            difficulty = -1
+        if not 0 <= difficulty <= 0xFF:
+            raise ScoreFormatError(f"Bad difficulty {key!r}")
+        for entry in board:
+            name = entry['player_name']
+            idx = name_index.get(name)
+            if idx is None:
+                idx = name_index[name] = len(name_index)
+            records += pack(
+                idx,
+                _clamp(entry['tries'], 0, _UINT16_MAX),
+                _clamp(entry['hints_used'], 0, _UINT16_MAX),
+                _clamp(entry['score'], _INT32_MIN, _INT32_MAX),
+                difficulty,
+                _date_to_epoch(entry.get('date', ''), date_cache, date_table)
+            )
+            count += 1
+            
+    return b''.join((
+        _HEADER.pack(MAGIC, VERSION, len(name_index), count),
+        _pack_strings(name_index),
+        bytes(records),
+        _COUNT.pack(len(date_table)),
+        _pack_strings(date_table),
+    ))
+
+
+def decode_scores(data: memoryview) -> Dict[str, List[dict]]:
+    """Deserialize the binary format into a scores dictionary.
+    
+    Args:
+        data: Buffer holding the file contents.
+        
+    Returns:
+        Dictionary with difficulty levels as keys and lists of scores as values.
+        
+    Raises:
+        ScoreFormatError: If the buffer is truncated, corrupt or has a bad
+            header.
+    """
+    try:
+        return _decode_scores(data)
+    except ScoreFormatError:
+        raise
+    except (struct.error, IndexError, ValueError, OverflowError, OSError) as e:
+        # Bad counts, name indexes, UTF-8 or dates
+        raise ScoreFormatError(f"Corrupt scores file: {e}") from e
+
+
+def _decode_scores(data: memoryview) -> Dict[str, List[dict]]:
+    """Decode a scores buffer; malformed data may raise any decoding error."""
+    if len(data) < _HEADER.size:
+        raise ScoreFormatError("File too short")
+    magic, version, name_count, record_count = _HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ScoreFormatError(f"Unsupported scores file (version {version})")
+        
+    names, offset = _unpack_strings(data, _HEADER.size, name_count)
+    end = offset + record_count * _RECORD.size
+    if end > len(data):
+        raise ScoreFormatError("Truncated score records")
+    date_table: List[str] = []
+    if version >= 2:
+        (date_count,) = _COUNT.unpack_from(data, end)
+        date_table, _ = _unpack_strings(data, end + _COUNT.size, date_count)
+        
+    scores: Dict[str, List[dict]] = {'4': [], '5': [], '6': []}
+    boards = {int(key): board for key, board in scores.items()}
+    dates: Dict[int, str] = {}
+    for idx, tries, hints, score, difficulty, epoch in _RECORD.iter_unpack(data[offset:end]):
+        board = boards.get(difficulty)
+        if board is None:
+            board = boards[difficulty] = scores[str(difficulty)] = []
+        date = dates.get(epoch)
+        if date is None:
+            if epoch < 0 and version >= 2:
+                date = date_table[-epoch - 1]
+            else:
+                date = _epoch_to_date(epoch)
+            dates[epoch] = date
+        board.append({
+            'player_name': names[idx],
+            'tries': tries,
+            'hints_used': hints,
+            'score': score,
+            'difficulty': difficulty,
+            'date': date,
+        })
+    return scores
+
+
+def read_scores_file(filepath: str) -> Dict[str, List[dict]]:
+    """Memory-map a binary scores file and decode it.
+    
+    Args:
+        filepath: Path to the binary scores file.
+        
+    Returns:
+        Dictionary with difficulty levels as keys and lists of scores as values.
+    """
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ScoreFormatError("Empty scores file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return decode_scores(view)
+            finally:
+                view.release()
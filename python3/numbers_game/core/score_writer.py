@@ -0,0 +1,249 @@
+"""Background score writer for the Numbers Game.
+
+Moves high score persistence off the caller's thread so the GUI never
+blocks on a slow disk. Submitted scores go through a bounded queue to a
+single writer thread, which coalesces bursts into one `add_scores` call.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+from itertools import groupby
+from typing import Callable, List, Optional, Tuple
+
+from .high_scores import MAX_SCORES, SCORES_FILE, ScoreEntry, add_scores
+from .player_stats import log_games, stats_path
+
+# Callback receiving the rank of a written score (None if it missed the board)
+RankCallback = Callable[[Optional[int]], None]
+
+
+class ScoreWriter:
+    """Single-threaded asynchronous writer for high scores.
+    
+    Rank callbacks are invoked through `dispatch`, which receives a
+    zero-argument callable. GUI code should pass something that marshals
+    onto the UI thread, e.g. ``lambda fn: widget.after(0, fn)``. Without
+    a dispatcher, callbacks run on the writer thread.
+    
+    A batch that fails to write is counted in `write_errors`, its error is
+    kept in `last_error`, and its callbacks receive None; the writer then
+    carries on with the next batch.
+    """
+    
+    def __init__(
+        self,
+        filepath: str = SCORES_FILE,
+        max_queue: int = 256,
+        max_batch: int = 64,
+        dispatch: Optional[Callable[[Callable[[], None]], None]] = None,
+        limit: int = MAX_SCORES
+    ) -> None:
+        """Start the writer thread.
+        
+        Args:
+            filepath: Path to the scores file.
+            max_queue: Maximum number of pending scores before submit blocks.
+            max_batch: Maximum number of scores coalesced into one write.
+            dispatch: Optional function used to deliver rank callbacks.
+            limit: Number of scores kept per difficulty.
+        """
+        self.filepath = filepath
+        self.limit = limit
+        self.max_batch = max_batch
+        self.dispatch = dispatch
+        self._queue: "queue.Queue[Optional[Tuple[dict, Optional[RankCallback]]]]" = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        
+        # Metrics
+        self.batches_written = 0
+        self.entries_written = 0
+        self.write_errors = 0
+        self.last_error: Optional[str] = None
+        self.last_write_latency = 0.0
+        self.max_write_latency = 0.0
+        self._total_write_latency = 0.0
+        
+        self._thread = threading.Thread(target=self._run, name='ScoreWriter', daemon=True)
+        self._thread.start()
+        
+    @property
+    def queue_depth(self) -> int:
+        """Number of scores waiting to be written."""
+        return self._queue.qsize()
+        
+    def submit(
+        self,
+        player_name: str,
+        tries: int,
+        hints_used: int,
+        score: int,
+        difficulty: int,
+        on_rank: Optional[RankCallback] = None,
+        timeout: Optional[float] = None
+    ) -> bool:
+        """Queue a score for writing.
+        
+        Args:
+            player_name: Name of the player.
+            tries: Number of tries to solve.
+            hints_used: Number of hints used.
+            score: Final calculated score.
+            difficulty: Digit count (4, 5, or 6).
+            on_rank: Optional callback receiving the resulting rank.
+            timeout: Seconds to wait if the queue is full (None waits forever).
+            
+        Returns:
+            True if queued, False if the writer is closed or the queue stayed full.
+        """
+        entry = ScoreEntry(
+            player_name=player_name,
+            tries=tries,
+            hints_used=hints_used,
+            score=score,
+            difficulty=difficulty,
+            date=datetime.now().strftime('%Y-%m-%d %H:%M')
+        )
+        return self._put((asdict(entry), on_rank), timeout)
+        
+    def submit_loss(
+        self,
+        player_name: str,
+        tries: int,
+        hints_used: int,
+        timeout: Optional[float] = None
+    ) -> bool:
+        """Queue a game the player did not win, for their statistics only.
+        
+        Args:
+            player_name: Name of the player.
+            tries: Number of tries used.
+            hints_used: Number of hints used.
+            timeout: Seconds to wait if the queue is full (None waits forever).
+            
+        Returns:
+            True if queued, False if the writer is closed or the queue stayed full.
+        """
+        loss = {'player_name': player_name, 'tries': tries, 'hints_used': hints_used, 'won': False}
+        return self._put((loss, None), timeout)
+        
+    def _put(self, item: Tuple[dict, Optional[RankCallback]], timeout: Optional[float]) -> bool:
+        """Queue an item unless the writer is closed."""
+        # Queued under the lock so nothing lands behind close()'s sentinel
+        with self._lock:
+            if self._closed:
+                return False
+            try:
+                self._queue.put(item, timeout=timeout)
+            except queue.Full:
+                return False
+        return True
+        
+    def flush(self) -> None:
+        """Block until every queued score has been written."""
+        self._queue.join()
+        
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush pending scores and stop the writer thread.
+        
+        Args:
+            timeout: Maximum seconds to wait for the thread to finish.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        
+    def stats(self) -> dict:
+        """Return a snapshot of the writer metrics."""
+        batches = self.batches_written
+        return {
+            'queue_depth': self.queue_depth,
+            'batches_written': batches,
+            'entries_written': self.entries_written,
+            'write_errors': self.write_errors,
+            'last_error': self.last_error,
+            'last_write_latency': self.last_write_latency,
+            'avg_write_latency': self._total_write_latency / batches if batches else 0.0,
+            'max_write_latency': self.max_write_latency,
+        }
+        
+    def _run(self) -> None:
+        """Writer thread main loop."""
+        running = True
+        while running:
+            item = self._queue.get()
+            batch: List[Tuple[dict, Optional[RankCallback]]] = []
+            if item is None:
+                running = False
+            else:
+                batch.append(item)
+            
+            # Coalesce whatever else is already waiting
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                else:
+                    batch.append(item)
+                    
+            try:
+                if batch:
+                    self._write_batch(batch)
+            finally:
+                # One task_done per get(), including the sentinel
+                for _ in range(len(batch) + (0 if running else 1)):
+                    self._queue.task_done()
+                    
+    def _write_batch(self, batch: List[Tuple[dict, Optional[RankCallback]]]) -> None:
+        """Write a batch of scores and deliver their ranks."""
+        start = time.perf_counter()
+        ranks: List[Optional[int]] = []
+        try:
+            # Runs of scores and losses, in order, so streaks come out right
+            for lost, run in groupby(batch, key=lambda item: item[0].get('won') is False):
+                entries = [entry for entry, _ in run]
+                if lost:
+                    log_games(stats_path(self.filepath), (
+                        (e['player_name'], False, e['tries'], e['hints_used'], 0) for e in entries
+                    ))
+                    ranks += [None] * len(entries)
+                else:
+                    ranks += add_scores(entries, self.filepath, self.limit)
+        except Exception as e:
+            self.write_errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            for _, on_rank in batch:
+                if on_rank is not None:
+                    self._deliver(on_rank, None)
+            return
+        latency = time.perf_counter() - start
+        
+        self.batches_written += 1
+        self.entries_written += len(batch)
+        self.last_write_latency = latency
+        self._total_write_latency += latency
+        self.max_write_latency = max(self.max_write_latency, latency)
+        
+        for (_, on_rank), rank in zip(batch, ranks):
+            if on_rank is not None:
+                self._deliver(on_rank, rank)
+                
+    def _deliver(self, on_rank: RankCallback, rank: Optional[int]) -> None:
+        """Invoke a rank callback, through the dispatcher if one is set."""
+        try:
+            if self.dispatch is None:
+                on_rank(rank)
+            else:
+                self.dispatch(lambda: on_rank(rank))
+        except Exception as e:
+            # A failing callback must not stop the writer thread
+            self.last_error = f"{type(e).__name__}: {e}"
@@ -0,0 +1,54 @@
+"""File helpers shared by the persistence modules."""
+
+import os
+import tempfile
+from typing import Union
+
+
+def atomic_write(filepath: str, data: Union[str, bytes]) -> None:
+    """Durably replace a file's contents.
+    
+    The data is written to a temporary sibling, flushed to disk and then
+    atomically renamed over the target, so a crash never leaves a
+    half-written file behind.
+    
+    Args:
+        filepath: Path of the file to write.
+        data: Text or bytes to write.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data.encode('utf-8') if isinstance(data, str) else data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def append_lines(filepath: str, text: str) -> int:
+    """Durably append complete lines of text to a file.
+    
+    A last line left unterminated by an interrupted append is ended first,
+    so it cannot run into the new lines.
+    
+    Args:
+        filepath: Path of the file to append to (created if missing).
+        text: Lines to append, each ending in a newline.
+        
+    Returns:
+        The file's size after the append.
+    """
+    with open(filepath, 'a+b') as f:
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                text = '\n' + text
+        f.write(text.encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
@@ -0,0 +1,263 @@
+"""Scripted players for online matches.
+
+A BotPlayer drives a NetworkManager through the same message sequence as
+the GUI, so bot-vs-bot matches exercise the real protocol. Paired over a
+LoopbackTransport they need no sockets or threads, which makes them
+cheap enough to play thousands of games in tests and simulations.
+"""
+
+import itertools
+import random
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from numbers_game.core import DEFAULT_DIGIT_COUNT, GameEngine
+from .manager import NetworkCallbacks, NetworkManager
+from .messages import MessageType
+from .protocol import CAP_SCORING
+from .ratelimit import RateLimiter
+from .transport import LoopbackTransport
+
+WIN = 'win'
+LOSS = 'loss'
+DRAW = 'draw'
+ABANDONED = 'abandoned'
+
+# Bots reply as fast as the transport delivers, far beyond a human's
+# pace, so their managers get a limiter that never trips.
+BOT_LIMIT = (1e9, 1e9)
+
+
+def all_numbers(digit_count: int) -> List[str]:
+    """Every valid secret: distinct digits, no leading zero."""
+    return [
+        ''.join(p) for p in itertools.permutations('0123456789', digit_count) if p[0] != '0'
+    ]
+
+
+class BotPlayer:
+    """Plays one online match through a NetworkManager.
+    
+    The protocol is the GUI's: both sides send NAME once connected; the
+    host answers the joiner's NAME with SETUP_REQ; each side picks a
+    secret and sends SECRET_SET; the host sends START once both are
+    ready. Each bot then guesses the other's secret with one GUESS in
+    flight at a time and answers every GUESS with a RESULT. When one
+    cracks the code the other's guess already in flight is its final
+    chance, so every game ends in a win, a loss or a draw.
+    
+    Against a match server that scores guesses (CAP_SCORING) the bot
+    sends its secret in SECRET_SET and is told of the opponent's guesses
+    by OPPONENT_RESULT instead of answering them.
+    
+    Attributes:
+        name: Name sent to the opponent.
+        network: The NetworkManager, set after construction (see attach()).
+        outcome: None while playing, then WIN, LOSS, DRAW or ABANDONED.
+        guesses: Guesses sent.
+        secret: The secret number the opponent must find.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        digit_count: int = DEFAULT_DIGIT_COUNT,
+        pool: Optional[Sequence[str]] = None,
+        rng: Optional[random.Random] = None,
+        on_finished: Optional[Callable[['BotPlayer'], None]] = None
+    ) -> None:
+        """Create a bot.
+        
+        Args:
+            name: Name to play under.
+            digit_count: Digits used if this bot hosts (a joiner follows SETUP_REQ).
+            pool: Numbers the secret and guesses are drawn from; both bots
+                must share it. Small pools make short games. Every valid
+                number if None.
+            rng: Random source (seed it for reproducible games).
+            on_finished: Called with the bot once its outcome is known.
+            
+        Raises:
+            ValueError: If the pool's numbers are not digit_count long.
+        """
+        if pool is not None and any(len(number) != digit_count for number in pool):
+            raise ValueError(f"Pool numbers must have {digit_count} digits")
+        self.name = name
+        self.digit_count = digit_count
+        self.pool = pool
+        self.rng = rng or random.Random()
+        self.on_finished = on_finished
+        self.network: Optional[NetworkManager] = None
+        self.outcome: Optional[str] = None
+        self.opponent_name: Optional[str] = None
+        self.guesses = 0
+        self.secret: Optional[str] = None
+        self._engine: Optional[GameEngine] = None
+        self._candidates: List[str] = []
+        self._ready = False
+        self._opponent_ready = False
+        self._i_won = False
+        self._opponent_won = False
+        self._answered_since_guess = 0
+        
+    def callbacks(self) -> NetworkCallbacks:
+        """Callbacks to construct the bot's NetworkManager with."""
+        return NetworkCallbacks(
+            on_message=self._on_message,
+            on_connected=lambda message: self._send(MessageType.NAME.value, self.name),
+            on_disconnected=self._on_disconnected,
+        )
+        
+    def attach(self, network: NetworkManager) -> NetworkManager:
+        """Use `network` for this bot's messages and return it."""
+        self.network = network
+        return network
+        
+    def _send(self, msg_type: str, data=None) -> None:
+        self.network.send(msg_type, data)
+        
+    def _finish(self, outcome: str) -> None:
+        if self.outcome is None:
+            self.outcome = outcome
+            if self.on_finished:
+                self.on_finished(self)
+                
+    def _on_disconnected(self, reason: str) -> None:
+        self._finish(ABANDONED)
+        
+    def _choose_secret(self) -> None:
+        """Pick a secret and tell the opponent we are ready."""
+        numbers = list(self.pool) if self.pool is not None else all_numbers(self.digit_count)
+        self.secret = self.rng.choice(numbers)
+        self._engine = GameEngine(self.digit_count)
+        self._engine.num = int(self.secret)
+        self.rng.shuffle(numbers)
+        self._candidates = numbers
+        self._ready = True
+        if CAP_SCORING in self.network.peer_caps:
+            self._send(MessageType.SECRET_SET.value, self.secret)
+        else:
+            self._send(MessageType.SECRET_SET.value, True)
+            
+    def _maybe_start(self) -> None:
+        """Host: start the game once both secrets are set."""
+        if self.network.is_host and self._ready and self._opponent_ready:
+            self._send(MessageType.START.value, self.digit_count)
+            self._guess()
+            
+    def _guess(self) -> None:
+        self._answered_since_guess = 0
+        self.guesses += 1
+        self._send(MessageType.GUESS.value, self._candidates.pop())
+        
+    def _on_message(self, msg_type: str, data) -> None:
+        if msg_type == MessageType.NAME.value:
+            self.opponent_name = data
+            if self.network.is_host:
+                self._send(MessageType.SETUP_REQ.value, self.digit_count)
+                self._choose_secret()
+                self._maybe_start()
+        elif msg_type == MessageType.SETUP_REQ.value:
+            self.digit_count = int(data)
+            self._choose_secret()
+        elif msg_type == MessageType.SECRET_SET.value:
+            self._opponent_ready = True
+            self._maybe_start()
+        elif msg_type == MessageType.START.value:
+            self._guess()
+        elif msg_type == MessageType.GUESS.value:
+            self._answer(str(data))
+        elif msg_type == MessageType.OPPONENT_RESULT.value:
+            self._on_opponent_result(data['place'])
+        elif msg_type == MessageType.RESULT.value:
+            self._on_result(data)
+            
+    def _answer(self, guess: str) -> None:
+        """Score the opponent's guess against our secret."""
+        count, place = self._engine.compare(int(guess))
+        self._send(MessageType.RESULT.value, {'guess': guess, 'count': count, 'place': place})
+        self._on_opponent_result(place)
+        
+    def _on_opponent_result(self, place: int) -> None:
+        """Track the opponent's progress after one of their guesses was scored."""
+        self._answered_since_guess += 1
+        if place == self.digit_count:
+            if self._i_won:
+                self._finish(DRAW)
+            else:
+                self._opponent_won = True
+        elif self._i_won:
+            # That was their final guess
+            self._finish(WIN)
+            
+    def _on_result(self, data) -> None:
+        """Handle the opponent's score for our last guess."""
+        if self.outcome is not None:
+            return
+        if data['place'] == self.digit_count:
+            if self._opponent_won:
+                self._finish(DRAW)
+            elif self._answered_since_guess:
+                # Their final guess crossed ours in flight, and missed
+                self._finish(WIN)
+            else:
+                self._i_won = True
+        elif self._opponent_won:
+            self._finish(LOSS)
+        else:
+            self._guess()
+
+
+def play_loopback_match(
+    host: BotPlayer,
+    joiner: BotPlayer,
+    threaded: bool = False,
+    timeout: float = 10.0
+) -> Tuple[Optional[str], Optional[str]]:
+    """Play one bot-vs-bot match over an in-memory transport.
+    
+    Args:
+        host: Bot playing the host's role.
+        joiner: Bot playing the joiner's role.
+        threaded: Use threaded NetworkManagers instead of pumping them here.
+        timeout: Longest to wait for both outcomes.
+        
+    Returns:
+        (host outcome, joiner outcome); None for a side that did not finish.
+    """
+    host_net = host.attach(NetworkManager(
+        host.callbacks(), threaded=threaded, rate_limiter=RateLimiter({}, BOT_LIMIT)
+    ))
+    join_net = joiner.attach(NetworkManager(
+        joiner.callbacks(), threaded=threaded, rate_limiter=RateLimiter({}, BOT_LIMIT)
+    ))
+    host_end, join_end = LoopbackTransport.pair()
+    deadline = time.monotonic() + timeout
+    try:
+        if threaded:
+            done = threading.Event()
+            finished = []
+            
+            def on_finished(bot: BotPlayer, previous=(host.on_finished, joiner.on_finished)) -> None:
+                callback = previous[0] if bot is host else previous[1]
+                if callback:
+                    callback(bot)
+                finished.append(bot)
+                if len(finished) == 2:
+                    done.set()
+                    
+            host.on_finished = joiner.on_finished = on_finished
+            host_net.connect_transport(host_end, host=True)
+            join_net.connect_transport(join_end)
+            done.wait(timeout)
+        else:
+            host_net.connect_transport(host_end, host=True)
+            join_net.connect_transport(join_end)
+            while (host.outcome is None or joiner.outcome is None) and time.monotonic() < deadline:
+                if not host_net.pump() + join_net.pump() and not (host_net.online or join_net.online):
+                    break
+    finally:
+        join_net.disconnect()
+        host_net.disconnect()
+    return host.outcome, joiner.outcome
@@ -0,0 +1,197 @@
+"""Compact binary encoding for protocol messages.
+
+Each message is a 1-byte opcode (derived from MessageType) followed by a
+fixed struct layout for that type, e.g. a GUESS is 5 bytes and a RESULT 7
+bytes instead of a 40-60 byte JSON envelope. Messages whose type or data
+do not fit a layout are left to the JSON encoding; JSON payloads always
+begin with "{", which is never a valid opcode, so decoders can tell the
+two apart by the first byte.
+"""
+
+import struct
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .messages import MessageType
+
+_U8 = struct.Struct('B')
+_GUESS = struct.Struct('>BI')
+_SEQ = struct.Struct('>BI')
+_RESULT = struct.Struct('>BIBB')
+
+# Opcodes are fixed on the wire; never renumber existing entries
+OPCODES: Dict[MessageType, int] = {
+    MessageType.NAME: 1,
+    MessageType.SETUP_REQ: 2,
+    MessageType.SECRET_SET: 3,
+    MessageType.START: 4,
+    MessageType.GUESS: 5,
+    MessageType.RESULT: 6,
+    MessageType.DISCONNECT: 7,
+    MessageType.PING: 8,
+    MessageType.PONG: 9,
+    MessageType.ACK: 10,
+    MessageType.OPPONENT_RESULT: 11,
+}
+_TYPE_BY_NAME = {t.value: t for t in OPCODES}
+_NAME_BY_OPCODE = {code: t.value for t, code in OPCODES.items()}
+
+
+def _guess_value(guess: Any) -> Optional[int]:
+    """Return a guess as an int if it round-trips through str() unchanged."""
+    if isinstance(guess, str) and guess.isascii() and guess.isdigit() and guess[0] != '0' and len(guess) <= 9:
+        return int(guess)
+    return None
+
+
+def _encode_text(op: int, data: Any) -> Optional[bytes]:
+    """Layout: opcode + optional UTF-8 text."""
+    if data is None:
+        return bytes((op,))
+    if isinstance(data, str):
+        return bytes((op,)) + data.encode('utf-8')
+    return None
+
+
+def _encode_small_int(op: int, data: Any) -> Optional[bytes]:
+    """Layout: opcode + uint8."""
+    if type(data) is int and 0 <= data <= 255:
+        return bytes((op, data))
+    return None
+
+
+def _encode_flag(op: int, data: Any) -> Optional[bytes]:
+    """Layout: opcode + uint8 boolean."""
+    if type(data) is bool:
+        return bytes((op, data))
+    return None
+
+
+def _encode_guess(op: int, data: Any) -> Optional[bytes]:
+    """Layout: opcode + uint32 guess."""
+    value = _guess_value(data)
+    return None if value is None else _GUESS.pack(op, value)
+
+
+def _encode_seq(op: int, data: Any) -> Optional[bytes]:
+    """Layout: opcode + uint32 sequence number."""
+    if type(data) is int and 0 <= data < 2 ** 32:
+        return _SEQ.pack(op, data)
+    return None
+
+
+def _encode_result(op: int, data: Any) -> Optional[bytes]:
+    """Layout: opcode + uint32 guess + uint8 count + uint8 place."""
+    if not isinstance(data, dict) or data.keys() != {'guess', 'count', 'place'}:
+        return None
+    value = _guess_value(data['guess'])
+    count, place = data['count'], data['place']
+    if value is None or type(count) is not int or type(place) is not int:
+        return None
+    if not (0 <= count <= 255 and 0 <= place <= 255):
+        return None
+    return _RESULT.pack(op, value, count, place)
+
+
+def _decode_text(payload: memoryview) -> Any:
+    """Decode opcode + optional UTF-8 text."""
+    return str(payload[1:], 'utf-8') if len(payload) > 1 else None
+
+
+def _decode_small_int(payload: memoryview) -> Any:
+    """Decode opcode + uint8."""
+    return payload[1]
+
+
+def _decode_flag(payload: memoryview) -> Any:
+    """Decode opcode + uint8 boolean."""
+    return bool(payload[1])
+
+
+def _decode_guess(payload: memoryview) -> Any:
+    """Decode opcode + uint32 guess."""
+    return str(_GUESS.unpack_from(payload)[1])
+
+
+def _decode_seq(payload: memoryview) -> Any:
+    """Decode opcode + uint32 sequence number."""
+    return _SEQ.unpack_from(payload)[1]
+
+
+def _decode_result(payload: memoryview) -> Any:
+    """Decode opcode + uint32 guess + uint8 count + uint8 place."""
+    _, guess, count, place = _RESULT.unpack_from(payload)
+    return {'guess': str(guess), 'count': count, 'place': place}
+
+
+_ENCODERS: Dict[MessageType, Callable[[int, Any], Optional[bytes]]] = {
+    MessageType.NAME: _encode_text,
+    MessageType.SETUP_REQ: _encode_small_int,
+    MessageType.SECRET_SET: _encode_flag,
+    MessageType.START: _encode_small_int,
+    MessageType.GUESS: _encode_guess,
+    MessageType.RESULT: _encode_result,
+    MessageType.DISCONNECT: _encode_text,
+    MessageType.PING: _encode_seq,
+    MessageType.PONG: _encode_seq,
+    MessageType.ACK: _encode_seq,
+    MessageType.OPPONENT_RESULT: _encode_result,
+}
+
+_DECODERS: Dict[int, Callable[[memoryview], Any]] = {
+    OPCODES[MessageType.NAME]: _decode_text,
+    OPCODES[MessageType.SETUP_REQ]: _decode_small_int,
+    OPCODES[MessageType.SECRET_SET]: _decode_flag,
+    OPCODES[MessageType.START]: _decode_small_int,
+    OPCODES[MessageType.GUESS]: _decode_guess,
+    OPCODES[MessageType.RESULT]: _decode_result,
+    OPCODES[MessageType.DISCONNECT]: _decode_text,
+    OPCODES[MessageType.PING]: _decode_seq,
+    OPCODES[MessageType.PONG]: _decode_seq,
+    OPCODES[MessageType.ACK]: _decode_seq,
+    OPCODES[MessageType.OPPONENT_RESULT]: _decode_result,
+}
+
+
+def is_binary_payload(payload: memoryview) -> bool:
+    """Check whether a payload uses the binary encoding rather than JSON."""
+    return len(payload) > 0 and payload[0] in _DECODERS
+
+
+def encode(msg_type: str, data: Any = None) -> Optional[bytes]:
+    """Encode a message in binary form.
+    
+    Args:
+        msg_type: Type of message (from MessageType enum).
+        data: Data payload.
+        
+    Returns:
+        The encoded payload, or None if the message has no binary layout
+        and must be sent as JSON.
+    """
+    kind = _TYPE_BY_NAME.get(msg_type)
+    if kind is None:
+        return None
+    return _ENCODERS[kind](OPCODES[kind], data)
+
+
+def decode(payload: memoryview) -> Tuple[str, Any]:
+    """Decode a binary payload.
+    
+    Args:
+        payload: One message payload starting with an opcode.
+        
+    Returns:
+        Tuple of (message type, data).
+        
+    Raises:
+        ValueError: If the opcode is unknown or the payload is truncated.
+    """
+    if not payload:
+        raise ValueError("Empty payload")
+    decoder = _DECODERS.get(payload[0])
+    if decoder is None:
+        raise ValueError(f"Unknown opcode {payload[0]}")
+    try:
+        return _NAME_BY_OPCODE[payload[0]], decoder(payload)
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"Truncated payload: {e}") from e
@@ -0,0 +1,259 @@
+"""LAN host discovery over UDP broadcast.
+
+A hosting NetworkManager runs a DiscoveryResponder on DISCOVERY_PORT.
+Joiners broadcast a small probe there and every waiting host answers
+with its game port and name; the source address of the answer is the
+host's address, so nobody has to type an IP. Answers are cached for a
+TTL so that repeatedly opening the join dialog doesn't flood the LAN.
+"""
+
+import json
+import selectors
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DISCOVERY_PORT = 5556
+
+# Probe sent by joiners; answers are the magic followed by a JSON object
+PROBE = b'NUMBERS-GAME/DISCOVER/1'
+_ANSWER_MAGIC = b'NUMBERS-GAME/HOST/1 '
+
+BROADCAST = '<broadcast>'
+
+
+@dataclass
+class HostInfo:
+    """A host that answered a discovery probe.
+    
+    Attributes:
+        address: IP address the answer came from.
+        port: TCP port of the game.
+        name: Name the host advertises.
+        seen_at: time.monotonic() of the latest answer.
+    """
+    address: str
+    port: int
+    name: str
+    seen_at: float = 0.0
+    
+    @property
+    def label(self) -> str:
+        """Text for a host list, e.g. ``"Alice (192.168.1.5)"``."""
+        return f"{self.name} ({self.address})"
+
+
+def local_ip() -> str:
+    """Best guess at this machine's LAN address, without sending anything.
+    
+    Asks the routing table which interface would reach a private
+    address (connecting a UDP socket sends no packets), then falls back
+    to the hostname's addresses and finally to loopback.
+    """
+    for probe in ('10.255.255.255', '192.168.255.255'):
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect((probe, 1))
+                address = s.getsockname()[0]
+            if not address.startswith('127.') and address != '0.0.0.0':
+                return address
+        except OSError:
+            continue
+    try:
+        for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+            address = info[4][0]
+            if not address.startswith('127.'):
+                return address
+    except OSError:
+        pass
+    return '127.0.0.1'
+
+
+class DiscoveryResponder:
+    """Answers discovery probes for one hosted game.
+    
+    Either call `start()` to answer on a background thread, or register
+    `sock` with a selector and call `handle()` when it is readable.
+    
+    Attributes:
+        port: UDP port being listened on.
+        answered: Number of probes answered.
+    """
+    
+    def __init__(self, game_port: int, name: str, port: int = DISCOVERY_PORT) -> None:
+        """Bind the discovery port.
+        
+        Args:
+            game_port: TCP port joiners should connect to.
+            name: Name to advertise.
+            port: UDP port to listen on (0 picks a free one, for tests).
+            
+        Raises:
+            OSError: If the port cannot be bound.
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # Several hosts on one machine may share the port
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, 'SO_REUSEPORT'):
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self.sock.bind(('', port))
+        except OSError:
+            self.sock.close()
+            raise
+        self.sock.setblocking(False)
+        self.port = self.sock.getsockname()[1]
+        self.answered = 0
+        self._answer = _ANSWER_MAGIC + json.dumps({'port': game_port, 'name': name}).encode('utf-8')
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        
+    def handle(self) -> None:
+        """Answer every probe waiting on the socket."""
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(512)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            if data == PROBE:
+                try:
+                    self.sock.sendto(self._answer, addr)
+                    self.answered += 1
+                except OSError:
+                    pass
+                    
+    def start(self) -> None:
+        """Answer probes on a daemon thread until close()."""
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        
+    def _serve(self) -> None:
+        """Thread body: wait for probes and answer them."""
+        try:
+            with selectors.DefaultSelector() as sel:
+                sel.register(self.sock, selectors.EVENT_READ)
+                while not self._closed:
+                    if sel.select(0.2):
+                        self.handle()
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.sock.close()
+            
+    def close(self) -> None:
+        """Stop answering and release the port (without waiting for the thread)."""
+        self._closed = True
+        if self._thread is None:
+            self.sock.close()
+
+
+class HostBrowser:
+    """Finds hosts on the LAN, caching answers for `ttl` seconds.
+    
+    Attributes:
+        ttl: Seconds an answer stays valid, and the least time between probes.
+        probes_sent: Number of probe rounds actually sent.
+    """
+    
+    def __init__(
+        self,
+        ttl: float = 5.0,
+        port: int = DISCOVERY_PORT,
+        targets: Iterable[str] = (BROADCAST,)
+    ) -> None:
+        """Create a browser with an empty cache.
+        
+        Args:
+            ttl: Cache lifetime in seconds.
+            port: UDP port hosts listen on.
+            targets: Addresses to probe (the LAN broadcast by default).
+        """
+        self.ttl = ttl
+        self.port = port
+        self.targets = tuple(targets)
+        self.probes_sent = 0
+        self._hosts: Dict[Tuple[str, int], HostInfo] = {}
+        self._last_probe = float('-inf')
+        self._lock = threading.Lock()
+        
+    def browse(self, timeout: float = 0.3, refresh: bool = False) -> List[HostInfo]:
+        """Return hosts on the LAN, probing only if the cache is stale.
+        
+        Args:
+            timeout: How long to collect answers after probing.
+            refresh: Probe even if the cache is still fresh.
+            
+        Returns:
+            Hosts seen within the TTL, sorted by name.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if refresh or now - self._last_probe >= self.ttl:
+                self._probe(timeout)
+                self._last_probe = time.monotonic()
+            cutoff = time.monotonic() - self.ttl
+            for key in [k for k, h in self._hosts.items() if h.seen_at < cutoff]:
+                del self._hosts[key]
+            return sorted(self._hosts.values(), key=lambda h: (h.name.lower(), h.address))
+            
+    def _probe(self, timeout: float) -> None:
+        """Send one probe round and collect answers until timeout."""
+        self.probes_sent += 1
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            for target in self.targets:
+                try:
+                    sock.sendto(PROBE, (target, self.port))
+                except OSError:
+                    continue
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                sock.settimeout(remaining)
+                try:
+                    data, addr = sock.recvfrom(512)
+                except socket.timeout:
+                    break
+                except OSError:
+                    break
+                host = self._parse_answer(data, addr[0])
+                if host is not None:
+                    self._hosts[(host.address, host.port)] = host
+                    
+    @staticmethod
+    def _parse_answer(data: bytes, address: str) -> Optional[HostInfo]:
+        """Decode an answer, ignoring anything malformed."""
+        if not data.startswith(_ANSWER_MAGIC):
+            return None
+        try:
+            info = json.loads(data[len(_ANSWER_MAGIC):])
+            port = int(info['port'])
+            name = str(info.get('name') or address)
+        except (ValueError, KeyError, TypeError):
+            return None
+        return HostInfo(address, port, name, time.monotonic())
+
+
+_default_browser: Optional[HostBrowser] = None
+
+
+def browse_hosts(timeout: float = 0.3, refresh: bool = False) -> List[HostInfo]:
+    """Find hosts on the LAN using a shared, cached HostBrowser.
+    
+    Args:
+        timeout: How long to collect answers after probing.
+        refresh: Probe even if cached answers are still fresh.
+        
+    Returns:
+        Hosts that answered within the cache TTL.
+    """
+    global _default_browser
+    if _default_browser is None:
+        _default_browser = HostBrowser()
+    return _default_browser.browse(timeout, refresh)
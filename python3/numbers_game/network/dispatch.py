@@ -0,0 +1,124 @@
+"""Batched hand-off of callbacks from worker threads to a GUI thread."""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .manager import NetworkCallbacks
+
+
+class CallbackQueue:
+    """Thread-safe queue drained in batches on the GUI thread.
+
+    Worker threads call `post()`; the first post into an empty queue asks
+    `schedule` (e.g. ``lambda fn: widget.after(0, fn)``) to run `drain()`
+    once. A drain runs up to `max_batch` callbacks and reschedules itself
+    if more remain, so a burst of N messages costs N/max_batch scheduled
+    callbacks instead of N.
+
+    Attributes:
+        max_batch: Most callbacks run by a single drain.
+        high_water: Deepest the queue has been.
+        batches: Number of drains that ran at least one callback.
+        delivered: Total callbacks run.
+        largest_batch: Most callbacks run by one drain so far.
+    """
+
+    def __init__(self, schedule: Callable[[Callable[[], None]], Any],
+                 max_batch: int = 64) -> None:
+        """Create an empty queue.
+
+        Args:
+            schedule: Runs a function later on the GUI thread
+            max_batch: Most callbacks run per drain
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self._schedule = schedule
+        self.max_batch = max_batch
+        self._items: Deque[Tuple[Callable[..., None], tuple]] = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.high_water = 0
+        self.batches = 0
+        self.delivered = 0
+        self.largest_batch = 0
+
+    def post(self, callback: Callable[..., None], *args: Any) -> None:
+        """Queue `callback(*args)` to run on the GUI thread. Thread-safe."""
+        with self._lock:
+            self._items.append((callback, args))
+            depth = len(self._items)
+            if depth > self.high_water:
+                self.high_water = depth
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule(self.drain)
+
+    def drain(self) -> int:
+        """Run up to max_batch queued callbacks (call on the GUI thread).
+
+        Returns:
+            Number of callbacks run.
+        """
+        count = 0
+        try:
+            while count < self.max_batch:
+                with self._lock:
+                    if not self._items:
+                        break
+                    callback, args = self._items.popleft()
+                count += 1
+                callback(*args)
+        finally:
+            with self._lock:
+                self.delivered += count
+                if count:
+                    self.batches += 1
+                    self.largest_batch = max(self.largest_batch, count)
+                more = bool(self._items)
+                self._scheduled = more
+            if more:
+                self._schedule(self.drain)
+        return count
+
+    def wrap(self, callbacks: NetworkCallbacks) -> NetworkCallbacks:
+        """Return callbacks that queue calls to `callbacks` instead of running them.
+
+        Args:
+            callbacks: Callbacks to run on the GUI thread
+
+        Returns:
+            NetworkCallbacks safe to hand to a threaded NetworkManager.
+        """
+        return NetworkCallbacks(
+            on_message=self._queued(callbacks.on_message),
+            on_connected=self._queued(callbacks.on_connected),
+            on_disconnected=self._queued(callbacks.on_disconnected),
+            on_reconnecting=self._queued(callbacks.on_reconnecting),
+            on_resumed=self._queued(callbacks.on_resumed),
+        )
+
+    def _queued(self, callback: Optional[Callable[..., None]]) -> Optional[Callable[..., None]]:
+        """Return a function that queues calls to `callback` (None stays None)."""
+        if callback is None:
+            return None
+        return lambda *args: self.post(callback, *args)
+
+    @property
+    def depth(self) -> int:
+        """Number of callbacks waiting."""
+        return len(self._items)
+
+    def stats(self) -> Dict[str, float]:
+        """Return delivery counters."""
+        with self._lock:
+            return {
+                'depth': len(self._items),
+                'high_water': self.high_water,
+                'batches': self.batches,
+                'delivered': self.delivered,
+                'largest_batch': self.largest_batch,
+                'avg_batch': self.delivered / self.batches if self.batches else 0.0,
+            }
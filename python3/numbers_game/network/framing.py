@@ -0,0 +1,149 @@
+"""Stream framing for network messages.
+
+Messages are sent as length-prefixed frames: a 4-byte big-endian payload
+length followed by the payload. Older clients terminate each JSON message
+with a "|||" separator instead. FrameBuffer accepts both on the same
+stream and tells them apart by the first byte of each message: frames
+are capped well below 16 MiB, so their first byte is always 0, while a
+legacy JSON message always starts with "{".
+"""
+
+import socket
+import struct
+from typing import List
+
+HEADER = struct.Struct('>I')
+LEGACY_SEPARATOR = b'|||'
+
+# Largest payload accepted; must stay below 2**24 for format detection
+MAX_FRAME_SIZE = 1 << 20
+
+
+class FrameError(ValueError):
+    """Raised when the incoming stream violates the framing rules."""
+
+
+def encode_frame(payload: bytes) -> bytes:
+    """Prefix a payload with its length.
+    
+    Args:
+        payload: Message bytes.
+        
+    Returns:
+        The framed message.
+    """
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}")
+    return HEADER.pack(len(payload)) + payload
+
+
+class FrameBuffer:
+    """Reusable receive buffer that splits a byte stream into payloads.
+    
+    Data is received straight into a preallocated bytearray with
+    `recv_into`, and complete payloads are handed out as memoryview
+    slices of that buffer. Consumed bytes are reclaimed by compacting the
+    buffer only when more space is needed, so draining n queued messages
+    costs O(n) rather than O(n^2).
+    
+    Payload views are only valid until the next `recv_into` or `feed`.
+    """
+    
+    def __init__(self, capacity: int = 65536, max_frame_size: int = MAX_FRAME_SIZE) -> None:
+        """Allocate the buffer.
+        
+        Args:
+            capacity: Initial buffer size in bytes.
+            max_frame_size: Largest payload accepted before raising FrameError.
+        """
+        self.max_frame_size = max_frame_size
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        
+    def __len__(self) -> int:
+        """Number of buffered, not yet consumed bytes."""
+        return self._end - self._start
+        
+    def recv_into(self, sock: socket.socket, max_bytes: int = 65536) -> int:
+        """Receive from a socket directly into the buffer.
+        
+        Args:
+            sock: Connected socket.
+            max_bytes: Maximum bytes to read in this call.
+            
+        Returns:
+            Number of bytes received (0 means the peer closed the stream).
+        """
+        self._reserve(max_bytes)
+        n = sock.recv_into(self._view[self._end:self._end + max_bytes])
+        self._end += n
+        return n
+        
+    def feed(self, data: bytes) -> None:
+        """Append bytes obtained elsewhere (e.g. from an asyncio stream)."""
+        self._reserve(len(data))
+        self._view[self._end:self._end + len(data)] = data
+        self._end += len(data)
+        
+    def messages(self) -> List[memoryview]:
+        """Split off every complete payload currently buffered.
+        
+        Returns:
+            Payload views in arrival order.
+            
+        Raises:
+            FrameError: If a frame, or a legacy message still missing its
+                separator, is larger than the allowed maximum.
+        """
+        buf = self._buf
+        view = self._view
+        unpack_from = HEADER.unpack_from
+        header_size = HEADER.size
+        max_size = self.max_frame_size
+        start = self._start
+        end = self._end
+        out = []
+        try:
+            while start < end:
+                if buf[start] == 0:
+                    body = start + header_size
+                    if body > end:
+                        break
+                    (length,) = unpack_from(buf, start)
+                    if length > max_size:
+                        raise FrameError(f"Frame of {length} bytes exceeds {max_size}")
+                    if body + length > end:
+                        break
+                    out.append(view[body:body + length])
+                    start = body + length
+                else:
+                    sep = buf.find(LEGACY_SEPARATOR, start, end)
+                    if sep < 0:
+                        if end - start > max_size:
+                            raise FrameError("Unterminated message exceeds maximum size")
+                        break
+                    if sep > start:
+                        out.append(view[start:sep])
+                    start = sep + len(LEGACY_SEPARATOR)
+        finally:
+            self._start = start
+        return out
+        
+    def _reserve(self, size: int) -> None:
+        """Make room for `size` more bytes at the end of the buffer."""
+        if len(self._buf) - self._end >= size:
+            return
+        pending = self._end - self._start
+        if self._start and len(self._buf) - pending >= size:
+            # Compact: slide unread bytes to the front
+            self._buf[:pending] = self._buf[self._start:self._end]
+        else:
+            # Grow: views may be exported, so copy into a new buffer
+            new_buf = bytearray(max(len(self._buf) * 2, pending + size))
+            new_buf[:pending] = self._view[self._start:self._end]
+            self._buf = new_buf
+            self._view = memoryview(new_buf)
+        self._start = 0
+        self._end = pending
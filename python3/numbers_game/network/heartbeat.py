@@ -0,0 +1,66 @@
+"""Round-trip time tracking for connection heartbeats."""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class RttStats:
+    """Tracks round-trip time samples.
+    
+    Keeps a smoothed estimate (EWMA, as TCP's SRTT does) plus a window of
+    recent samples for percentiles. Thread-safe.
+    
+    Attributes:
+        ewma: Smoothed RTT in seconds, or None before the first sample.
+        last: Most recent sample in seconds, or None.
+        count: Total number of samples recorded.
+    """
+    
+    def __init__(self, alpha: float = 0.125, window: int = 256) -> None:
+        """Create an empty tracker.
+        
+        Args:
+            alpha: Weight of each new sample in the EWMA.
+            window: Number of recent samples kept for percentiles.
+        """
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self.last: Optional[float] = None
+        self.count = 0
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        
+    def add(self, rtt: float) -> None:
+        """Record one RTT sample in seconds."""
+        with self._lock:
+            self.last = rtt
+            self.count += 1
+            self.ewma = rtt if self.ewma is None else self.ewma + self.alpha * (rtt - self.ewma)
+            self._samples.append(rtt)
+            
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return a percentile (0-100) of the recent samples, or None if empty."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+        
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Return the current estimates in seconds."""
+        return {
+            'ewma': self.ewma,
+            'last': self.last,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'samples': self.count,
+        }
+        
+    def summary(self) -> str:
+        """Short human-readable summary, e.g. for a status bar."""
+        if self.ewma is None:
+            return "RTT: --"
+        return (f"RTT: {self.ewma * 1000:.0f} ms "
+                f"(p50 {self.percentile(50) * 1000:.0f} / p99 {self.percentile(99) * 1000:.0f})")
@@ -0,0 +1,339 @@
+"""Load generator: scripted bot clients for measuring a match server.
+
+Each bot speaks the same protocol as a joining NetworkManager:
+
+    NAME -> (NAME, SETUP_REQ) -> SECRET_SET -> START -> GUESS/RESULT loop
+
+Bots are paired by the server in arrival order. Every bot makes a fixed
+number of guesses, waiting for each RESULT before the next GUESS. By
+default bots hand their secret to the server, which scores guesses
+itself; with --relay they keep it and answer their opponent's guesses,
+as older clients do, which adds a round trip to every guess. The report gives
+client message throughput, TCP connect and match setup times, and the
+p50/p99 latency from sending a GUESS to receiving its RESULT.
+
+By default a MatchServer is started in-process on loopback, so this runs
+anywhere (including CI):
+
+    python -m numbers_game.network.loadgen --clients 200 --guesses 20
+
+Pass --port to load an already running server instead.
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from numbers_game.core import DEFAULT_DIGIT_COUNT, GameEngine
+from .framing import FrameBuffer
+from .manager import MessageType
+from .bots import BOT_LIMIT
+from .protocol import CAP_SCORING, CAPABILITIES, decode_message, encode_message
+from .ratelimit import RateLimiter
+from .server import MatchServer
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the nearest-rank percentile of `values` (0.0 if empty).
+    
+    Args:
+        values: Samples, in any order.
+        pct: Percentile between 0 and 100.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[min(len(ordered), int(rank)) - 1]
+
+
+@dataclass
+class LoadReport:
+    """Results of one load run.
+    
+    Attributes:
+        clients: Bots started.
+        completed: Bots that finished their match.
+        duration: Wall-clock seconds from the first connect to the last close.
+        messages: Messages sent plus received by all bots.
+        connect_times: Seconds per bot for the TCP connect.
+        setup_times: Seconds per bot from connecting until START.
+        latencies: Seconds from each GUESS to its RESULT.
+        errors: Error descriptions from bots that failed.
+        server_stats: MatchServer.stats() when the server ran in-process.
+    """
+    clients: int
+    completed: int = 0
+    duration: float = 0.0
+    messages: int = 0
+    connect_times: List[float] = field(default_factory=list)
+    setup_times: List[float] = field(default_factory=list)
+    latencies: List[float] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    server_stats: Optional[Dict[str, int]] = None
+    
+    @property
+    def messages_per_sec(self) -> float:
+        """Client messages (sent + received) per second."""
+        return self.messages / self.duration if self.duration else 0.0
+        
+    def summary(self) -> Dict[str, float]:
+        """Return the headline numbers, times in milliseconds."""
+        return {
+            'clients': self.clients,
+            'completed': self.completed,
+            'errors': len(self.errors),
+            'duration_s': self.duration,
+            'messages': self.messages,
+            'messages_per_sec': self.messages_per_sec,
+            'connect_p50_ms': percentile(self.connect_times, 50) * 1000,
+            'connect_p99_ms': percentile(self.connect_times, 99) * 1000,
+            'setup_p50_ms': percentile(self.setup_times, 50) * 1000,
+            'setup_p99_ms': percentile(self.setup_times, 99) * 1000,
+            'guess_p50_ms': percentile(self.latencies, 50) * 1000,
+            'guess_p99_ms': percentile(self.latencies, 99) * 1000,
+        }
+        
+    def format(self) -> str:
+        """Return the report as human-readable lines."""
+        s = self.summary()
+        lines = [
+            f"Clients:          {s['clients']} ({s['completed']} completed, {s['errors']} errors)",
+            f"Duration:         {s['duration_s']:.2f}s",
+            f"Messages:         {s['messages']:,} ({s['messages_per_sec']:,.0f}/s)",
+            f"TCP connect:      p50 {s['connect_p50_ms']:.2f} ms, p99 {s['connect_p99_ms']:.2f} ms",
+            f"Setup to START:   p50 {s['setup_p50_ms']:.2f} ms, p99 {s['setup_p99_ms']:.2f} ms",
+            f"GUESS -> RESULT:  p50 {s['guess_p50_ms']:.2f} ms, p99 {s['guess_p99_ms']:.2f} ms "
+            f"({len(self.latencies):,} samples)",
+        ]
+        for error in self.errors[:5]:
+            lines.append(f"  error: {error}")
+        return "\n".join(lines)
+
+
+class Bot:
+    """One scripted client playing a single match.
+    
+    Attributes:
+        name: Name sent in NAME.
+        sent: Messages sent.
+        received: Messages received.
+        connect_time: Seconds the TCP connect took.
+        setup_time: Seconds from connecting until START.
+        latencies: Seconds from each GUESS to its RESULT.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        guesses: int,
+        binary: bool = True,
+        timeout: float = 10.0,
+        scoring: bool = True
+    ) -> None:
+        """Create an unconnected bot.
+        
+        Args:
+            name: Name to play under.
+            guesses: Number of guesses to make (and to answer).
+            binary: Negotiate framing and the binary codec like a current client.
+            timeout: Longest to wait for any single message.
+            scoring: Give the server our secret if it offers to score guesses.
+        """
+        self.name = name
+        self.guesses = guesses
+        self.binary = binary
+        self.timeout = timeout
+        self.scoring = scoring
+        self.sent = 0
+        self.received = 0
+        self.connect_time = 0.0
+        self.setup_time = 0.0
+        self.latencies: List[float] = []
+        self._buffer = FrameBuffer()
+        self._pending: List[Dict[str, Any]] = []
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        
+    def _send(self, msg_type: str, data: Any = None) -> None:
+        """Queue one message on the connection."""
+        if msg_type == MessageType.NAME.value:
+            packet = encode_message(msg_type, data, caps=CAPABILITIES if self.binary else None)
+        else:
+            packet = encode_message(msg_type, data, framed=self.binary, binary=self.binary)
+        self._writer.write(packet)
+        self.sent += 1
+        
+    async def _recv(self) -> Dict[str, Any]:
+        """Return the next message, reading from the socket as needed."""
+        while not self._pending:
+            data = await asyncio.wait_for(self._reader.read(65536), self.timeout)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self._buffer.feed(data)
+            self._pending.extend(decode_message(p) for p in self._buffer.messages())
+        self.received += 1
+        return self._pending.pop(0)
+        
+    async def play(self, host: str, port: int) -> None:
+        """Connect, play one match, and disconnect.
+        
+        Raises:
+            ConnectionError: If the server closes the connection or the opponent leaves.
+            asyncio.TimeoutError: If a message does not arrive in time.
+        """
+        start = time.perf_counter()
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), self.timeout
+        )
+        self.connect_time = time.perf_counter() - start
+        try:
+            await self._run(start)
+        finally:
+            self._writer.close()
+            
+    async def _run(self, start: float) -> None:
+        """Play the match once connected."""
+        self._send(MessageType.NAME.value, self.name)
+        secret: Optional[GameEngine] = None
+        guesses: List[str] = []
+        sent_at = 0.0
+        results = answered = 0
+        server_scores = False
+        
+        while results < self.guesses or answered < self.guesses:
+            msg = await self._recv()
+            msg_type, data = msg.get('type'), msg.get('data')
+            if msg_type == MessageType.GUESS.value:
+                count, place = secret.compare(int(data))
+                self._send(MessageType.RESULT.value, {'guess': data, 'count': count, 'place': place})
+                answered += 1
+            elif msg_type == MessageType.OPPONENT_RESULT.value:
+                answered += 1
+            elif msg_type == MessageType.RESULT.value:
+                self.latencies.append(time.perf_counter() - sent_at)
+                results += 1
+                if results < self.guesses:
+                    sent_at = time.perf_counter()
+                    self._send(MessageType.GUESS.value, guesses[results])
+            elif msg_type == MessageType.SETUP_REQ.value:
+                secret = GameEngine(int(data))
+                # Pick every guess up front so the timed loop only does I/O
+                guesses = [str(secret.generate_number()) for _ in range(self.guesses)]
+                self._send(MessageType.SECRET_SET.value, str(secret.num) if server_scores else True)
+            elif msg_type == MessageType.NAME.value:
+                server_scores = self.scoring and CAP_SCORING in (msg.get('caps') or ())
+            elif msg_type == MessageType.START.value:
+                self.setup_time = time.perf_counter() - start
+                if self.guesses:
+                    sent_at = time.perf_counter()
+                    self._send(MessageType.GUESS.value, guesses[0])
+            elif msg_type == MessageType.DISCONNECT.value:
+                raise ConnectionError(f"disconnected: {data}")
+
+
+async def run_load(
+    host: str,
+    port: int,
+    clients: int,
+    guesses: int = 20,
+    binary: bool = True,
+    timeout: float = 10.0,
+    scoring: bool = True
+) -> LoadReport:
+    """Run `clients` bots at once against a server.
+    
+    Args:
+        host: Server address.
+        port: Server port.
+        clients: Number of bots (rounded up to an even number).
+        guesses: Guesses each bot makes.
+        binary: Use framing and the binary codec (False = legacy JSON).
+        timeout: Longest any bot waits for one message.
+        scoring: Let the server score guesses (False = bots answer them).
+        
+    Returns:
+        The collected LoadReport.
+    """
+    clients += clients % 2
+    bots = [Bot(f'bot{i}', guesses, binary, timeout, scoring) for i in range(clients)]
+    report = LoadReport(clients)
+    
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(bot.play(host, port) for bot in bots), return_exceptions=True)
+    report.duration = time.perf_counter() - start
+    
+    for bot, outcome in zip(bots, outcomes):
+        report.messages += bot.sent + bot.received
+        report.latencies.extend(bot.latencies)
+        if isinstance(outcome, BaseException):
+            report.errors.append(f"{bot.name}: {type(outcome).__name__}: {outcome}")
+            continue
+        report.completed += 1
+        report.connect_times.append(bot.connect_time)
+        report.setup_times.append(bot.setup_time)
+    return report
+
+
+async def run_local(
+    clients: int,
+    guesses: int = 20,
+    digit_count: int = DEFAULT_DIGIT_COUNT,
+    binary: bool = True,
+    timeout: float = 10.0,
+    scoring: bool = True
+) -> LoadReport:
+    """Start a MatchServer on loopback, load it, and stop it.
+    
+    Args:
+        clients: Number of bots.
+        guesses: Guesses each bot makes.
+        digit_count: Digits used by the server.
+        binary: Use framing and the binary codec.
+        timeout: Longest any bot waits for one message.
+        scoring: Let the server score guesses (False = bots answer them).
+        
+    Returns:
+        The LoadReport, including the server's counters.
+    """
+    # Bots guess far faster than people; measure the server, not its limiter
+    server = MatchServer('127.0.0.1', 0, digit_count, rate_limiter=lambda: RateLimiter({}, BOT_LIMIT))
+    host, port = await server.start()
+    try:
+        report = await run_load(host, port, clients, guesses, binary, timeout, scoring)
+    finally:
+        await server.stop()
+    report.server_stats = server.stats()
+    return report
+
+
+def main() -> None:
+    """Run the load generator from the command line."""
+    parser = argparse.ArgumentParser(description="Numbers Game network load generator")
+    parser.add_argument('--clients', type=int, default=100, help="bots to run at once")
+    parser.add_argument('--guesses', type=int, default=20, help="guesses per bot")
+    parser.add_argument('--digits', type=int, default=DEFAULT_DIGIT_COUNT, choices=[4, 5, 6])
+    parser.add_argument('--legacy', action='store_true', help="use the legacy JSON protocol")
+    parser.add_argument('--relay', action='store_true',
+                        help="bots answer each other's guesses instead of the server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="load a running server instead of starting one")
+    parser.add_argument('--timeout', type=float, default=10.0)
+    args = parser.parse_args()
+    
+    binary = not args.legacy
+    if args.port is None:
+        report = asyncio.run(run_local(
+            args.clients, args.guesses, args.digits, binary, args.timeout, not args.relay
+        ))
+    else:
+        report = asyncio.run(run_load(
+            args.host, args.port, args.clients, args.guesses, binary, args.timeout, not args.relay
+        ))
+    print(report.format())
+
+
+if __name__ == '__main__':
+    main()
@@ -2,121 +2,325 @@
 
 Handles socket connections, message passing, and threading for non-blocking I/O.
 Uses a Host/Client model where one player hosts and the other joins via IP.
+I/O runs either on background threads or, in pump mode, on the caller's
+thread through repeated calls to `pump()` (e.g. from a Tk timer).
 """
 
+import collections
+import errno
+import itertools
+import selectors
 import socket
 import threading
-import json
-from typing import Callable, Optional, Tuple, Any
-from dataclasses import dataclass
-from enum import Enum
+import time
+from typing import Callable, Deque, Dict, Optional, Set, Tuple, Any
+from dataclasses import asdict, dataclass
 
+from .discovery import DISCOVERY_PORT, DiscoveryResponder, HostBrowser, browse_hosts, local_ip
+from .framing import HEADER, LEGACY_SEPARATOR, FrameBuffer, FrameError
+from .heartbeat import RttStats
+from .messages import MessageType
+from .metrics import RECEIVED, SENT, NetworkMetrics
+from .outbox import Outbox, OutboxFull, POLICY_BLOCK
+from .ratelimit import ALLOW, DISCONNECT, RateLimiter, RateLimitExceeded
+from .protocol import (
+    CAP_BINARY, CAP_FRAMING, CAP_HEARTBEAT, CAP_RESUME, CAPABILITIES, PEER_CAPABILITIES,
+    decode_message, encode_message
+)
+from .session import ReplayLog, new_token
+from .transport import LoopbackTransport
 
-class MessageType(Enum):
-    """Types of network messages."""
-    NAME = "NAME"
-    SETUP_REQ = "SETUP_REQ"
-    SECRET_SET = "SECRET_SET"
-    START = "START"
-    GUESS = "GUESS"
-    RESULT = "RESULT"
-    DISCONNECT = "DISCONNECT"
+# Connection control messages: never counted, logged or passed to callbacks
+_CONTROL_TYPES = frozenset(t.value for t in (
+    MessageType.PING, MessageType.PONG, MessageType.ACK,
+    MessageType.RESUME, MessageType.RESUMED,
+))
+
+# connect_ex() results meaning a non-blocking connect is under way
+_CONNECT_PENDING = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, 'WSAEWOULDBLOCK', -1)}
+
+
+@dataclass
+class PumpStats:
+    """Counters for pump-mode delivery.
+    
+    Queue wait is the time between a message being read off the socket
+    and its callback being invoked.
+    """
+    pumps: int = 0
+    messages: int = 0
+    last_batch: int = 0
+    max_batch: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    
+    @property
+    def avg_batch(self) -> float:
+        """Average number of callbacks per pump."""
+        return self.messages / self.pumps if self.pumps else 0.0
+        
+    @property
+    def avg_wait(self) -> float:
+        """Average queue wait per message in seconds."""
+        return self.total_wait / self.messages if self.messages else 0.0
+        
+    def record_wait(self, wait: float) -> None:
+        """Record how long one message waited before delivery."""
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        
+    def record_pump(self, delivered: int) -> None:
+        """Record one pump call that delivered `delivered` callbacks."""
+        self.pumps += 1
+        self.messages += delivered
+        self.last_batch = delivered
+        self.max_batch = max(self.max_batch, delivered)
 
 
 @dataclass
 class NetworkCallbacks:
-    """Callbacks for network events."""
+    """Callbacks for network events.
+    
+    on_reconnecting and on_resumed are optional; they report a dropped
+    connection being re-established (see NetworkManager.resuming).
+    """
     on_message: Callable[[str, Any], None]
     on_connected: Callable[[str], None]
     on_disconnected: Callable[[str], None]
+    on_reconnecting: Optional[Callable[[str], None]] = None
+    on_resumed: Optional[Callable[[str], None]] = None
 
 
 class NetworkManager:
     """Handles network connections for online multiplayer.
     
     Supports both hosting and joining games over TCP sockets.
-    All callbacks are invoked from background threads - GUI code must
-    use thread-safe mechanisms (e.g., tkinter's after()) to update UI.
+    In threaded mode (the default) all callbacks are invoked from
+    background threads - GUI code must use thread-safe mechanisms (e.g.,
+    tkinter's after()) to update UI. With ``threaded=False`` no threads
+    are started: sockets are non-blocking and the owner must call
+    `pump()` regularly, and callbacks run inside `pump()` on its thread.
+    
+    When the peer supports heartbeats, a PING is sent every
+    HEARTBEAT_INTERVAL seconds to measure round-trip time (see `rtt`),
+    and the connection is dropped if nothing arrives for
+    DEAD_PEER_TIMEOUT seconds.
+    
+    `send()` never writes to the socket itself: packets go into a bounded
+    `outbox` and a writer (a thread, or `pump()` in pump mode) sends
+    whatever has queued up in one syscall. When the outbox is full the
+    send policy decides: block (for at most SEND_BLOCK_TIMEOUT, then the
+    peer is considered stalled), drop the oldest message, or disconnect.
+    Pump mode runs on the caller's (e.g. the UI) thread and never blocks:
+    there the block policy treats a peer that has filled the outbox as
+    stalled straight away.
+    
+    If both sides support it, a dropped connection does not end the
+    session: the host listens again, the joiner reconnects with backoff,
+    and unacknowledged messages are replayed (see session.py). Meanwhile
+    `resuming` is True and send() keeps queueing messages for replay;
+    on_disconnected fires only if RESUME_TIMEOUT passes without success.
+    
+    Incoming messages pass through `rate_limiter` (token buckets per
+    message type) before any handler runs; excess messages are dropped,
+    and a peer that keeps flooding is disconnected without resume. Frames
+    larger than MAX_MESSAGE_SIZE are rejected by the receive buffer.
+    
+    Instead of TCP, `connect_transport()` attaches an in-process
+    transport such as one end of `LoopbackTransport.pair()`; messages and
+    callbacks behave the same, without sockets, heartbeats or resume.
+    
+    `metrics` counts messages and bytes per type in each direction,
+    decode errors, reconnects and message handler latency; its snapshots
+    also include the RTT, outbox and rate limiter statistics.
     """
     
     DEFAULT_PORT = 5555
-    MSG_SEPARATOR = "|||"
-    BUFFER_SIZE = 4096
+    DISCOVERY_PORT = DISCOVERY_PORT
+    MSG_SEPARATOR = "|||"  # Legacy framing, used until the peer advertises CAP_FRAMING
+    BUFFER_SIZE = 65536
+    MAX_MESSAGE_SIZE = 16 * 1024
+    HEARTBEAT_INTERVAL = 1.0
+    DEAD_PEER_TIMEOUT = 5.0
+    SEND_BLOCK_TIMEOUT = 5.0
+    FLUSH_TIMEOUT = 1.0
+    RESUME_TIMEOUT = 30.0
+    RECONNECT_DELAY = 0.05
+    RECONNECT_MAX_DELAY = 2.0
+    REPLAY_LOG_SIZE = 512
     
-    def __init__(self, callbacks: NetworkCallbacks) -> None:
+    def __init__(
+        self,
+        callbacks: NetworkCallbacks,
+        threaded: bool = True,
+        send_queue_size: int = 256,
+        send_policy: str = POLICY_BLOCK,
+        resume: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[NetworkMetrics] = None
+    ) -> None:
         """Initialize the network manager.
         
         Args:
             callbacks: NetworkCallbacks with on_message, on_connected, on_disconnected
+            threaded: Run I/O on background threads; if False, use pump()
+            send_queue_size: Most messages queued for sending
+            send_policy: What send() does when the queue is full (see outbox.POLICIES)
+            resume: Offer session resume after a dropped connection
+            rate_limiter: Flood protection for incoming messages
+                (a RateLimiter with default limits if None)
+            metrics: Where to record traffic statistics (a new
+                NetworkMetrics if None)
         """
         self.callbacks = callbacks
+        self.threaded = threaded
         self.sock: Optional[socket.socket] = None
         self.server_sock: Optional[socket.socket] = None
         self.is_host = False
         self.connected = False
         self.running = False
+        self.port = self.DEFAULT_PORT
+        self.transport: Optional[LoopbackTransport] = None
         self._recv_thread: Optional[threading.Thread] = None
         self._accept_thread: Optional[threading.Thread] = None
+        self.peer_caps: Set[str] = set()
+        self._framed = False
+        self._binary = False
+        self._state_lock = threading.Lock()
+        
+        # Heartbeat state
+        self.rtt = RttStats()
+        self.last_received = 0.0
+        self._stop = threading.Event()
+        self._ping_seq = itertools.count(1)
+        self._pings_in_flight: Dict[int, float] = {}
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        
+        # Pump mode state
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._recv_buffer: Optional[FrameBuffer] = None
+        self._inbox: Deque[Tuple[Callable[..., None], tuple, float]] = collections.deque()
+        self._in_io = False
+        self._delivering = False  # a pumped callback is running
+        self._next_ping = 0.0
+        self.pump_stats = PumpStats()
+        
+        # Outbound queue
+        self.outbox = Outbox(send_queue_size, send_policy)
+        self._out_partial = b''
+        self._want_write = False
+        
+        # Session resume state
+        self.resume_enabled = resume
+        self.resuming = False
+        self.session_token: Optional[str] = None
+        self.replay_log = ReplayLog(self.REPLAY_LOG_SIZE)
+        self.received_count = 0
+        self.resumes = 0
+        self.last_resume_time: Optional[float] = None
+        self._acked_count = 0
+        self._seq_lock = threading.Lock()
+        self._peer_addr: Optional[Tuple[str, int]] = None
+        self._drop_reason = ""
+        self._drop_time = 0.0
+        self._resume_deadline = 0.0
+        self._reconnect_delay = 0.0
+        self._next_reconnect = 0.0
+        self._connecting: Optional[socket.socket] = None
+        self._reconnect_thread: Optional[threading.Thread] = None
+        
+        # Flood protection
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        
+        # Instrumentation
+        self.metrics = metrics if metrics is not None else NetworkMetrics()
+        self.metrics.add_source('rtt', self.rtt.snapshot)
+        self.metrics.add_source('outbox', lambda: self.outbox.stats())
+        self.metrics.add_source('rate_limiter', self.rate_limiter.stats)
+        if not threaded:
+            self.metrics.add_source('pump', lambda: asdict(self.pump_stats))
+            
+        # LAN discovery
+        self.responder: Optional[DiscoveryResponder] = None
+        self.browser: Optional[HostBrowser] = None
         
-    def host_game(self, port: int = DEFAULT_PORT) -> Tuple[bool, str]:
+    @property
+    def online(self) -> bool:
+        """Whether the session is alive: connected, or reconnecting."""
+        return self.connected or self.resuming
+        
+    def host_game(self, port: int = DEFAULT_PORT, name: Optional[str] = None) -> Tuple[bool, str]:
         """Start hosting a game server.
         
+        Until a player joins, the game is advertised on the LAN so that
+        joiners can find it without typing an address.
+        
         Args:
             port: Port to listen on
+            name: Name to advertise (defaults to the computer's name)
             
         Returns:
             Tuple of (success, message/IP)
         """
         try:
-            self.server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_sock.bind(('', port))
-            self.server_sock.listen(1)
-            self.server_sock.settimeout(0.5)  # Non-blocking accept
-            
-            self.running = True
-            self.is_host = True
-            
-            # Start accept thread
-            self._accept_thread = threading.Thread(
-                target=self._accept_loop,
-                daemon=True
-            )
-            self._accept_thread.start()
-            
-            # Get local IP for display
-            local_ip = self._get_local_ip()
-            return True, local_ip
-            
+            self._open_server_socket(port)
         except OSError as e:
             return False, f"Failed to start server: {e}"
             
-    def join_game(self, host_ip: str, port: int = DEFAULT_PORT) -> Tuple[bool, str]:
+        self.running = True
+        self.is_host = True
+        self._reset_connection_state()
+        self.session_token = new_token() if self.resume_enabled else None
+        self._start_accepting()
+        self._start_advertising(name or socket.gethostname())
+        
+        # Get local IP for display
+        local_ip = self._get_local_ip()
+        return True, local_ip
+        
+    def join_game(self, host_ip: Optional[str] = None, port: int = DEFAULT_PORT) -> Tuple[bool, str]:
         """Join a hosted game.
         
         Args:
-            host_ip: IP address of the host
+            host_ip: IP address of the host; None joins the first game
+                found on the LAN (see browse_hosts)
             port: Port to connect to
             
         Returns:
             Tuple of (success, message)
         """
+        if host_ip is None:
+            hosts = self.browse_hosts()
+            if not hosts:
+                return False, "No games found on the LAN"
+            host_ip, port = hosts[0].address, hosts[0].port
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.settimeout(10.0)  # Connection timeout
             self.sock.connect((host_ip, port))
             self.sock.settimeout(None)  # Switch to blocking for recv
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             
+            self._peer_addr = (host_ip, port)
             self.connected = True
             self.running = True
             self.is_host = False
+            self._reset_connection_state()
             
-            # Notify connection
-            self.callbacks.on_connected("Connected to host")
-            
-            # Start receive thread
-            self._start_receive_thread()
-            
+            if self.threaded:
+                # Notify connection
+                self.callbacks.on_connected("Connected to host")
+                
+                # Start receive and heartbeat threads
+                self._start_receive_thread(self.sock)
+            else:
+                self._selector = selectors.DefaultSelector()
+                self._attach_pumped(self.sock)
+                self._post(self.callbacks.on_connected, "Connected to host")
+                
             return True, "Connected successfully"
             
         except socket.timeout:
@@ -129,135 +333,923 @@ class NetworkManager:
     def send(self, msg_type: str, data: Any = None) -> bool:
         """Send a message to the other player.
         
+        While the session is resuming the message is kept and delivered
+        once the connection is back.
+        
         Args:
             msg_type: Type of message (from MessageType enum)
             data: Optional data payload
             
         Returns:
-            True if sent successfully
+            True if sent (or queued for replay) successfully
         """
-        if not self.connected or not self.sock:
-            return False
+        if msg_type in _CONTROL_TYPES or not self.resume_enabled or self.transport is not None:
+            if not self.connected or (self.sock is None and self.transport is None):
+                return False
+            return self._enqueue(msg_type, data)
+        with self._seq_lock:
+            if not self.online:
+                return False
+            self.replay_log.append(msg_type, data)
+            if not self.connected:
+                return True
+            return self._enqueue(msg_type, data)
             
+    def _enqueue(self, msg_type: str, data: Any) -> bool:
+        """Encode a message and hand it to the writer."""
         try:
-            packet = json.dumps({
-                'type': msg_type,
-                'data': data
-            }) + self.MSG_SEPARATOR
-            self.sock.sendall(packet.encode('utf-8'))
-            return True
-        except OSError as e:
-            print(f"Send error: {e}")
-            self._handle_disconnect("Send failed")
+            # NAME advertises our capabilities; frames are used once the peer has done so
+            caps, session = None, None
+            if msg_type == MessageType.NAME.value:
+                caps = PEER_CAPABILITIES if self.resume_enabled else CAPABILITIES
+                session = self.session_token if self.is_host else None
+            packet = encode_message(
+                msg_type, data, framed=self._framed, binary=self._binary, caps=caps, session=session
+            )
+            if self.transport is not None:
+                return self._send_transport(msg_type, packet)
+            if not self.threaded and self.outbox.full:
+                # Nobody else drains the outbox in pump mode; make what room
+                # the socket allows, but never wait on the caller's thread
+                self._flush_pending()
+            timeout = self.SEND_BLOCK_TIMEOUT if self.threaded else 0
+            if not self.outbox.put(packet, timeout=timeout):
+                if self.connected:
+                    self._handle_disconnect("Peer stopped reading")
+                return False
+        except OutboxFull:
+            self._handle_disconnect("Send queue full")
+            return False
+        # Payload bytes, like the receive side (framing overhead excluded)
+        self.metrics.record(SENT, msg_type, len(packet) - (HEADER.size if self._framed else len(LEGACY_SEPARATOR)))
+        if not self.threaded:
+            self._flush_pending()
+        return True
+        
+    def _send_transport(self, msg_type: str, packet: bytes) -> bool:
+        """Hand one framed packet's payload to the attached transport."""
+        payload = memoryview(packet)[HEADER.size:]
+        if not self.transport.send(payload):
+            self._handle_disconnect("Connection lost")
             return False
+        self.metrics.record(SENT, msg_type, len(payload))
+        return True
+        
+    def connect_transport(self, transport: LoopbackTransport, host: bool = False) -> Tuple[bool, str]:
+        """Connect over an in-process transport instead of TCP.
+        
+        Both ends are this implementation, so framing and the binary codec
+        are used from the first message. There are no heartbeats and no
+        session resume; closing either end disconnects both.
+        
+        Args:
+            transport: One end of a connected transport (e.g. LoopbackTransport.pair())
+            host: Play the host's role in the game protocol
             
+        Returns:
+            Tuple of (success, description)
+        """
+        self.is_host = host
+        self._reset_connection_state()
+        self.peer_caps = set(CAPABILITIES)
+        self._framed = self._binary = True
+        self.session_token = None
+        self.transport = transport
+        self.running = True
+        self.connected = True
+        self._post(self.callbacks.on_connected, "Player joined (loopback)" if host else "Connected (loopback)")
+        if self.threaded:
+            self._recv_thread = threading.Thread(
+                target=self._transport_loop,
+                args=(transport,),
+                daemon=True
+            )
+            self._recv_thread.start()
+        return True, "loopback"
+        
     def disconnect(self) -> None:
         """Close connection and cleanup."""
-        was_connected = self.connected
+        was_online = self.online
         self.connected = False
+        self.resuming = False
         self.running = False
+        self._stop.set()
         
+        # Let the writer send what is already queued, briefly
+        self.outbox.close()
+        writer = self._writer_thread
+        if writer and writer.is_alive() and writer is not threading.current_thread():
+            writer.join(self.FLUSH_TIMEOUT)
+            
         # Close client socket
-        if self.sock:
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        for sock in (self.sock, self._connecting):
+            if sock:
+                self._close_socket(sock)
+        self.sock = self._connecting = None
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+            
+        # Close server socket, waking the accept loop first
+        self._close_server_socket()
+        
+        if was_online:
+            self.callbacks.on_disconnected("Connection closed")
+            
+    # ========================
+    # PUMP MODE
+    # ========================
+    
+    def pump(self, timeout: float = 0.0) -> int:
+        """Perform pending network I/O and deliver callbacks (pump mode only).
+        
+        Accepts a joiner, reads everything available, flushes queued
+        output, sends heartbeats, and then invokes the callbacks for what
+        arrived, all on the calling thread. A callback may itself re-enter
+        the event loop (e.g. a modal dialog) and thus call pump() again;
+        the nested call still does I/O, so heartbeats keep being answered,
+        but delivers nothing: callbacks wait, in order, until the one that
+        is running returns.
+        
+        Args:
+            timeout: Seconds to wait for I/O if nothing is ready.
+            
+        Returns:
+            Number of callbacks delivered.
+        """
+        if self.transport is not None and not self._in_io:
+            self._in_io = True
             try:
-                self.sock.close()
-            except OSError:
-                pass
-            self.sock = None
+                self._pump_transport(timeout)
+            finally:
+                self._in_io = False
+        elif self._selector is not None and not self._in_io:
+            self._in_io = True
+            try:
+                self._pump_io(timeout)
+            finally:
+                self._in_io = False
+        return self._drain_inbox()
+        
+    def _pump_transport(self, timeout: float) -> None:
+        """Process everything waiting on the attached transport."""
+        transport = self.transport
+        for payload in transport.poll(timeout):
+            try:
+                self._process_message(payload)
+            except FrameError as e:
+                self._count_frame_error(e)
+                self._handle_disconnect(f"Protocol error: {e}")
+                return
+            if self.transport is not transport:
+                return
+        if transport.closed:
+            self._handle_disconnect("Connection lost")
+            
+    def _pump_io(self, timeout: float) -> None:
+        """Run one round of non-blocking I/O."""
+        if self._selector.get_map():
+            ready = self._selector.select(timeout)
+        else:
+            ready = []
+        for key, mask in ready:
+            if key.data == 'accept':
+                if key.fileobj is self.server_sock:
+                    self._pump_accept()
+            elif key.data == 'discovery':
+                if self.responder is not None:
+                    self.responder.handle()
+            elif key.data == 'connect':
+                if key.fileobj is self._connecting:
+                    self._pump_connected(key.fileobj)
+            elif key.fileobj is self.sock:
+                if mask & selectors.EVENT_READ:
+                    self._pump_read()
+                if mask & selectors.EVENT_WRITE and self.sock is not None:
+                    self._flush_pending()
+            if self._selector is None:
+                return
+        now = time.monotonic()
+        if self.resuming:
+            if now >= self._resume_deadline:
+                self._handle_disconnect(self._drop_reason)
+            elif self._peer_addr and self.sock is None and self._connecting is None \
+                    and now >= self._next_reconnect:
+                self._pump_reconnect()
+        elif self.connected and now >= self._next_ping:
+            self._next_ping = now + self.HEARTBEAT_INTERVAL
+            self._heartbeat_step()
             
-        # Close server socket
-        if self.server_sock:
+    def _pump_accept(self) -> None:
+        """Accept the joiner in pump mode."""
+        try:
+            conn, addr = self.server_sock.accept()
+        except (BlockingIOError, OSError):
+            return
+        if self.resuming:
+            self._adopt_resume_socket(conn)
+            return
+        self._close_server_socket()
+        self.sock = conn
+        self.connected = True
+        self._attach_pumped(conn)
+        self._post(self.callbacks.on_connected, f"Player joined from {addr[0]}")
+        
+    def _pump_reconnect(self) -> None:
+        """Start a non-blocking reconnect to the host."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        if sock.connect_ex(self._peer_addr) not in _CONNECT_PENDING:
+            sock.close()
+            self._backoff()
+            return
+        self._connecting = sock
+        self._selector.register(sock, selectors.EVENT_WRITE, 'connect')
+        
+    def _pump_connected(self, sock: socket.socket) -> None:
+        """Finish a non-blocking reconnect once the socket is writable."""
+        self._selector.unregister(sock)
+        self._connecting = None
+        if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+            sock.close()
+            self._backoff()
+            return
+        self._adopt_resume_socket(sock)
+        
+    def _attach_pumped(self, sock: socket.socket) -> None:
+        """Prepare a connected socket for pump mode."""
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._recv_buffer = FrameBuffer(self.BUFFER_SIZE, self.MAX_MESSAGE_SIZE)
+        self._selector.register(sock, selectors.EVENT_READ, 'conn')
+        self.last_received = time.monotonic()
+        self._next_ping = self.last_received + self.HEARTBEAT_INTERVAL
+        
+    def _pump_read(self) -> None:
+        """Read everything available without blocking."""
+        buffer, sock = self._recv_buffer, self.sock
+        while sock is not None and sock is self.sock:
             try:
-                self.server_sock.close()
+                if not buffer.recv_into(sock, self.BUFFER_SIZE):
+                    self._handle_disconnect("Connection lost", sock)
+                    return
+                for payload in buffer.messages():
+                    self._process_message(payload)
+            except (BlockingIOError, InterruptedError):
+                return
+            except FrameError as e:
+                self._count_frame_error(e)
+                self._handle_disconnect(f"Protocol error: {e}", sock)
+                return
             except OSError:
-                pass
-            self.server_sock = None
+                self._handle_disconnect("Connection lost", sock)
+                return
+                
+    def _reset_connection_state(self) -> None:
+        """Start a new connection with an empty, open outbox and full rate buckets."""
+        self._stop = threading.Event()
+        self.rate_limiter.reset()
+        self.outbox = Outbox(self.outbox.limit, self.outbox.policy, self.outbox.rate_window)
+        self._out_partial = b''
+        self._want_write = False
+        
+    def _flush_pending(self) -> None:
+        """Write queued output without blocking (pump mode).
+        
+        Whatever the socket does not accept is kept and EVENT_WRITE is
+        requested so the next pump() continues once it is writable.
+        """
+        sock = self.sock
+        while sock is not None:
+            if not self._out_partial:
+                self._out_partial = self.outbox.take(self.BUFFER_SIZE)
+                if not self._out_partial:
+                    break
+            try:
+                sent = sock.send(self._out_partial)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError:
+                self._handle_disconnect("Send failed", sock)
+                return
+            self._out_partial = self._out_partial[sent:]
+            if self._out_partial:
+                break
+        want_write = bool(self._out_partial)
+        if want_write != self._want_write and self._selector is not None and sock is not None:
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if want_write else 0)
+            self._selector.modify(sock, events, 'conn')
+            self._want_write = want_write
             
-        if was_connected:
-            self.callbacks.on_disconnected("Connection closed")
+    def _post(self, callback: Callable[..., None], *args: Any) -> None:
+        """Deliver a callback now (threaded) or on the next pump (pump mode)."""
+        if self.threaded:
+            callback(*args)
+        else:
+            self._inbox.append((callback, args, time.perf_counter()))
             
+    def _drain_inbox(self) -> int:
+        """Invoke queued callbacks in arrival order (not from inside one)."""
+        if self._delivering:
+            return 0
+        delivered = 0
+        now = time.perf_counter()
+        self._delivering = True
+        try:
+            while self._inbox:
+                callback, args, queued_at = self._inbox.popleft()
+                self.pump_stats.record_wait(now - queued_at)
+                delivered += 1
+                callback(*args)
+        finally:
+            self._delivering = False
+            self.pump_stats.record_pump(delivered)
+        return delivered
+        
     def _get_local_ip(self) -> str:
         """Get the local IP address for LAN connections."""
+        return local_ip()
+        
+    def browse_hosts(self, timeout: float = 0.3, refresh: bool = False) -> list:
+        """List games advertised on the LAN (answers are cached briefly).
+        
+        Args:
+            timeout: Seconds to wait for answers when probing
+            refresh: Probe even if cached answers are still fresh
+            
+        Returns:
+            List of discovery.HostInfo
+        """
+        if self.browser is not None:
+            return self.browser.browse(timeout, refresh)
+        return browse_hosts(timeout, refresh)
+        
+    # ========================
+    # LISTENING (HOST)
+    # ========================
+    
+    def _open_server_socket(self, port: int) -> None:
+        """Bind and listen on `port` (0 picks a free port)."""
+        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_sock.bind(('', port))
+            server_sock.listen(1)
+            server_sock.setblocking(False)
+        except OSError:
+            server_sock.close()
+            raise
+        self.server_sock = server_sock
+        self.port = server_sock.getsockname()[1]
+        
+    def _start_accepting(self) -> None:
+        """Wait for a joiner on a thread or, in pump mode, in pump()."""
+        if self.threaded:
+            # Accept waits on a selector; writing to the wake socket interrupts it
+            self._wake_r, self._wake_w = socket.socketpair()
+            self._accept_thread = threading.Thread(
+                target=self._accept_loop,
+                daemon=True
+            )
+            self._accept_thread.start()
+        else:
+            if self._selector is None:
+                self._selector = selectors.DefaultSelector()
+            self._selector.register(self.server_sock, selectors.EVENT_READ, 'accept')
+            
+    def _start_advertising(self, name: str) -> None:
+        """Answer discovery probes while waiting for a joiner."""
         try:
-            # Connect to an external address to determine local IP
-            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-                s.connect(("8.8.8.8", 80))
-                return s.getsockname()[0]
+            self.responder = DiscoveryResponder(self.port, name, self.DISCOVERY_PORT)
         except OSError:
-            return socket.gethostbyname(socket.gethostname())
+            # Discovery is a convenience; joining by address still works
+            self.responder = None
+            return
+        if self.threaded:
+            self.responder.start()
+        else:
+            self._selector.register(self.responder.sock, selectors.EVENT_READ, 'discovery')
+            
+    def _stop_advertising(self) -> None:
+        """Stop answering discovery probes."""
+        responder, self.responder = self.responder, None
+        if responder is None:
+            return
+        if self._selector is not None:
+            try:
+                self._selector.unregister(responder.sock)
+            except (KeyError, ValueError):
+                pass
+        responder.close()
+        
+    def _close_server_socket(self) -> None:
+        """Stop listening (and advertising), waking the accept loop first."""
+        self._stop_advertising()
+        self._wake_accept()
+        server_sock, self.server_sock = self.server_sock, None
+        if server_sock is None:
+            return
+        if self._selector is not None:
+            try:
+                self._selector.unregister(server_sock)
+            except (KeyError, ValueError):
+                pass
+        try:
+            server_sock.close()
+        except OSError:
+            pass
             
     def _accept_loop(self) -> None:
-        """Accept incoming connection (host only)."""
-        while self.running and not self.connected:
+        """Accept incoming connection (host only).
+        
+        Blocks on a selector until the listening socket is readable or
+        disconnect() writes to the wake socket, so a joiner is picked up
+        immediately without polling. While resuming it keeps accepting
+        until a RESUME handshake succeeds or the resume window closes.
+        """
+        server_sock, wake_r, wake_w = self.server_sock, self._wake_r, self._wake_w
+        if server_sock is None or wake_r is None:
+            return
+        with selectors.DefaultSelector() as sel:
             try:
-                conn, addr = self.server_sock.accept()
+                sel.register(server_sock, selectors.EVENT_READ)
+                sel.register(wake_r, selectors.EVENT_READ)
+            except (OSError, ValueError):
+                # disconnect() closed the server socket before we got here
+                self._close_wake_sockets(wake_r, wake_w)
+                return
+            while self.running and not self.connected:
+                timeout = None
+                if self.resuming:
+                    timeout = max(0.0, self._resume_deadline - time.monotonic())
+                try:
+                    events = sel.select(timeout)
+                    if any(key.fileobj is wake_r for key, _ in events):
+                        break
+                    if not events:
+                        # Resume window closed without a successful handshake
+                        self._handle_disconnect(self._drop_reason)
+                        break
+                    conn, addr = server_sock.accept()
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    break
+                    
+                conn.setblocking(True)
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if self.resuming:
+                    self._adopt_resume_socket(conn)
+                    continue
                 self.sock = conn
                 self.connected = True
                 
                 # Close server socket - only one connection needed
-                if self.server_sock:
-                    self.server_sock.close()
-                    self.server_sock = None
+                if self.server_sock is server_sock:
+                    self._close_server_socket()
                     
                 self.callbacks.on_connected(f"Player joined from {addr[0]}")
                 
-                # Start receive thread
-                self._start_receive_thread()
+                # Start receive and heartbeat threads
+                self._start_receive_thread(conn)
                 break
-                
-            except socket.timeout:
-                continue
+        if self.server_sock is server_sock and not self.resuming:
+            self._close_server_socket()
+        self._close_wake_sockets(wake_r, wake_w)
+        
+    def _wake_accept(self) -> None:
+        """Interrupt a blocked accept loop."""
+        if self._wake_w is not None:
+            try:
+                self._wake_w.send(b'\0')
             except OSError:
-                break
+                pass
                 
-    def _start_receive_thread(self) -> None:
-        """Start the receive thread."""
+    def _close_wake_sockets(self, wake_r: socket.socket, wake_w: socket.socket) -> None:
+        """Close an accept loop's wake socket pair."""
+        for sock in (wake_r, wake_w):
+            sock.close()
+        if self._wake_r is wake_r:
+            self._wake_r = self._wake_w = None
+            
+    @staticmethod
+    def _close_socket(sock: socket.socket) -> None:
+        """Shut down and close a socket, unblocking any thread in recv()."""
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            sock.close()
+        except OSError:
+            pass
+            
+    # ========================
+    # THREADED I/O
+    # ========================
+    
+    def _start_receive_thread(self, sock: socket.socket) -> None:
+        """Start the receive, writer and heartbeat threads for `sock`."""
+        self.last_received = time.monotonic()
         self._recv_thread = threading.Thread(
             target=self._receive_loop,
+            args=(sock,),
             daemon=True
         )
         self._recv_thread.start()
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop,
+            args=(sock, self.outbox),
+            daemon=True
+        )
+        self._writer_thread.start()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop,
+            args=(self._stop,),
+            daemon=True
+        )
+        self._heartbeat_thread.start()
+        
+    def _writer_loop(self, sock: socket.socket, outbox: Outbox) -> None:
+        """Send queued messages, coalescing whatever piled up into one write."""
+        while True:
+            data = outbox.take(self.BUFFER_SIZE, wait=True)
+            if data is None:
+                break
+            try:
+                sock.sendall(data)
+            except OSError:
+                self._handle_disconnect("Send failed", sock)
+                break
+                
+    def _heartbeat_loop(self, stop: threading.Event) -> None:
+        """Send PINGs and drop the connection if the peer goes silent."""
+        while not stop.wait(self.HEARTBEAT_INTERVAL):
+            if self.connected and not self._heartbeat_step():
+                break
+                
+    def _heartbeat_step(self) -> bool:
+        """Acknowledge received messages and send one PING.
+        
+        Returns:
+            False if the peer was declared dead.
+        """
+        if self.session_token and CAP_RESUME in self.peer_caps:
+            received = self.received_count
+            if received != self._acked_count:
+                self._acked_count = received
+                self.send(MessageType.ACK.value, received)
+        if CAP_HEARTBEAT not in self.peer_caps:
+            return True
+        if time.monotonic() - self.last_received > self.DEAD_PEER_TIMEOUT:
+            self._handle_disconnect("Peer not responding")
+            return False
+        seq = next(self._ping_seq)
+        self._pings_in_flight[seq] = time.perf_counter()
+        # Forget pings that were never answered
+        for old in [s for s in list(self._pings_in_flight) if s < seq - 16]:
+            self._pings_in_flight.pop(old, None)
+        self.send(MessageType.PING.value, seq)
+        return True
         
-    def _receive_loop(self) -> None:
+    def _receive_loop(self, sock: socket.socket) -> None:
         """Receive and process incoming messages."""
-        buffer = ""
+        buffer = FrameBuffer(self.BUFFER_SIZE, self.MAX_MESSAGE_SIZE)
+        reason = "Connection lost"
         
-        while self.running and self.connected and self.sock:
+        while self.running and sock is self.sock:
             try:
-                data = self.sock.recv(self.BUFFER_SIZE)
-                if not data:
+                if not buffer.recv_into(sock, self.BUFFER_SIZE):
                     # Connection closed by peer
                     break
                     
-                buffer += data.decode('utf-8')
-                
                 # Process complete messages
-                while self.MSG_SEPARATOR in buffer:
-                    msg_str, buffer = buffer.split(self.MSG_SEPARATOR, 1)
-                    if msg_str:
-                        self._process_message(msg_str)
-                        
+                for payload in buffer.messages():
+                    self._process_message(payload)
+                    
             except socket.timeout:
+                if self.resuming and time.monotonic() >= self._resume_deadline:
+                    break
                 continue
+            except FrameError as e:
+                self._count_frame_error(e)
+                reason = f"Protocol error: {e}"
+                break
             except OSError:
                 break
                 
         # Connection ended
-        self._handle_disconnect("Connection lost")
+        self._handle_disconnect(reason, sock)
         
-    def _process_message(self, msg_str: str) -> None:
+    def _transport_loop(self, transport: LoopbackTransport) -> None:
+        """Receive thread for an in-process transport."""
+        reason = "Connection lost"
+        while transport is self.transport:
+            payload = transport.recv()
+            if payload is None:
+                break
+            try:
+                self._process_message(payload)
+            except FrameError as e:
+                self._count_frame_error(e)
+                reason = f"Protocol error: {e}"
+                break
+        if transport is self.transport:
+            self._handle_disconnect(reason)
+            
+    # ========================
+    # MESSAGES
+    # ========================
+    
+    def _process_message(self, payload: memoryview) -> None:
         """Parse and dispatch a received message."""
         try:
-            msg = json.loads(msg_str)
-            msg_type = msg.get('type', '')
-            data = msg.get('data')
+            msg = decode_message(payload)
+        except ValueError:
+            self.metrics.record_decode_error(payload)
+            return
+        msg_type = msg.get('type', '')
+        data = msg.get('data')
+        self.last_received = time.monotonic()
+        self.metrics.record(RECEIVED, str(msg_type), len(payload))
+        
+        verdict = self.rate_limiter.check(str(msg_type), self.last_received)
+        if verdict != ALLOW:
+            if msg_type not in _CONTROL_TYPES:
+                # Keep counting so resume sequence numbers stay aligned
+                self.received_count += 1
+            if verdict == DISCONNECT:
+                # An abusive peer does not get to resume the session
+                self.session_token = None
+                raise RateLimitExceeded(f"Peer flooded {msg_type} messages")
+            return
+            
+        # Heartbeats and session control are handled here and never reach the callbacks
+        if msg_type in _CONTROL_TYPES:
+            self._process_control(msg_type, data)
+            return
+        if self.resuming:
+            # Only a rejected resume is expected before the handshake completes
+            if msg_type == MessageType.DISCONNECT.value:
+                self._abandon_session(str(data))
+            return
+            
+        if msg_type == MessageType.NAME.value and isinstance(msg.get('caps'), list):
+            self.peer_caps = set(msg['caps'])
+            self._framed = CAP_FRAMING in self.peer_caps
+            self._binary = self._framed and CAP_BINARY in self.peer_caps
+            if not self.is_host and isinstance(msg.get('session'), str):
+                self.session_token = msg['session']
+        self.received_count += 1
+        self._post(self._deliver_message, msg_type, data)
+        
+    def _deliver_message(self, msg_type: str, data: Any) -> None:
+        """Run the on_message callback, timing it for the handler latency histogram."""
+        start = time.perf_counter()
+        try:
             self.callbacks.on_message(msg_type, data)
-        except json.JSONDecodeError:
-            print(f"Invalid message received: {msg_str[:50]}")
+        finally:
+            self.metrics.record_handler(msg_type, time.perf_counter() - start)
+            
+    def _count_frame_error(self, error: FrameError) -> None:
+        """Count a rejected frame (rate-limit disconnects are counted by the limiter)."""
+        if not isinstance(error, RateLimitExceeded):
+            self.rate_limiter.frame_errors += 1
             
-    def _handle_disconnect(self, reason: str) -> None:
-        """Handle disconnection cleanup."""
-        if self.connected:
+    def _process_control(self, msg_type: str, data: Any) -> None:
+        """Handle a connection control message."""
+        if msg_type == MessageType.PING.value:
+            self.send(MessageType.PONG.value, data)
+        elif msg_type == MessageType.PONG.value:
+            sent = self._pings_in_flight.pop(data, None)
+            if sent is not None:
+                self.rtt.add(time.perf_counter() - sent)
+        elif msg_type == MessageType.ACK.value:
+            if isinstance(data, int):
+                self.replay_log.ack(data)
+        elif msg_type == MessageType.RESUME.value:
+            self._on_resume_request(data)
+        elif msg_type == MessageType.RESUMED.value:
+            self._on_resume_accepted(data)
+            
+    # ========================
+    # SESSION RESUME
+    # ========================
+    
+    def _can_resume(self) -> bool:
+        """Whether a dropped connection should be resumed rather than closed."""
+        if not (self.resume_enabled and self.running and self.session_token):
+            return False
+        if CAP_RESUME not in self.peer_caps:
+            return False
+        return not self.resuming or time.monotonic() < self._resume_deadline
+        
+    def _handle_disconnect(self, reason: str, sock: Optional[socket.socket] = None) -> None:
+        """Handle a lost connection: start resuming it, or clean up.
+        
+        Args:
+            reason: Why the connection ended
+            sock: The connection that failed; ignored if already replaced
+        """
+        with self._state_lock:
+            if sock is not None and sock is not self.sock:
+                return
+            if not self.online:
+                return
+            resume = self._can_resume()
+            first_drop = not self.resuming
             self.connected = False
-            self.running = False
-            self.callbacks.on_disconnected(reason)
+            self.resuming = resume
+            if not resume:
+                self.running = False
+            dead, self.sock = self.sock, None
+            transport, self.transport = self.transport, None
+        self._stop.set()
+        if transport is not None:
+            transport.close()
+        if resume:
+            # A fresh event, so disconnect() can still interrupt reconnecting
+            self._stop = threading.Event()
+        self.outbox.close()
+        if dead is not None:
+            if self._selector is not None:
+                try:
+                    self._selector.unregister(dead)
+                except (KeyError, ValueError):
+                    pass
+            self._close_socket(dead)
+            
+        if not resume:
+            self.metrics.count('disconnects')
+            if self._selector is not None:
+                self._selector.close()
+                self._selector = None
+            if self._connecting is not None:
+                self._connecting.close()
+                self._connecting = None
+            self._close_server_socket()
+            self._post(self.callbacks.on_disconnected, self._drop_reason if not first_drop else reason)
+            return
+            
+        if first_drop:
+            self.metrics.count('reconnects')
+            self._drop_reason = reason
+            self._drop_time = time.monotonic()
+            self._resume_deadline = self._drop_time + self.RESUME_TIMEOUT
+            self._reconnect_delay = self.RECONNECT_DELAY
+            self._next_reconnect = self._drop_time
+            if self.callbacks.on_reconnecting:
+                self._post(self.callbacks.on_reconnecting, reason)
+        else:
+            # A handshake attempt failed; don't retry in a tight loop
+            self._backoff()
+        self._schedule_reconnect()
+        
+    def _abandon_session(self, reason: str) -> None:
+        """Give up on resuming and report the disconnect."""
+        self._resume_deadline = 0.0
+        self._drop_reason = reason
+        self._handle_disconnect(reason)
+        
+    def _schedule_reconnect(self) -> None:
+        """Listen again (host) or start reconnecting (joiner)."""
+        if self.is_host:
+            if self.server_sock is None:
+                try:
+                    self._open_server_socket(self.port)
+                except OSError:
+                    self._abandon_session(self._drop_reason)
+                    return
+                self._start_accepting()
+        elif self.threaded:
+            with self._state_lock:
+                if self._reconnect_thread is None:
+                    self._reconnect_thread = threading.Thread(
+                        target=self._reconnect_loop,
+                        daemon=True
+                    )
+                    self._reconnect_thread.start()
+        # Pump-mode joiners reconnect from pump()
+        
+    def _backoff(self) -> None:
+        """Schedule the next reconnect attempt with exponential backoff."""
+        self._next_reconnect = time.monotonic() + self._reconnect_delay
+        self._reconnect_delay = min(self._reconnect_delay * 2, self.RECONNECT_MAX_DELAY)
+        
+    def _reconnect_loop(self) -> None:
+        """Reconnect to the host with backoff until resumed or out of time.
+        
+        Runs for the whole resume: after handing a connection to the
+        handshake it waits, and tries again if that connection fails.
+        """
+        while True:
+            stop = self._stop
+            with self._state_lock:
+                if not (self.resuming and self.running):
+                    self._reconnect_thread = None
+                    return
+                handshaking = self.sock is not None
+            remaining = self._resume_deadline - time.monotonic()
+            if remaining <= 0:
+                self._handle_disconnect(self._drop_reason)
+                continue
+            if handshaking:
+                # Woken when the handshake connection fails
+                stop.wait(min(0.1, remaining))
+                continue
+            delay = self._next_reconnect - time.monotonic()
+            if delay > 0:
+                stop.wait(min(delay, remaining))
+                continue
+            try:
+                sock = socket.create_connection(self._peer_addr, timeout=min(1.0, remaining))
+            except OSError:
+                self._backoff()
+                continue
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._adopt_resume_socket(sock)
+            
+    def _adopt_resume_socket(self, sock: socket.socket) -> None:
+        """Use a new connection for the RESUME handshake."""
+        with self._state_lock:
+            if not (self.resuming and self.running):
+                sock.close()
+                return
+            old, self.sock = self.sock, sock
+        if old is not None:
+            if self._selector is not None:
+                try:
+                    self._selector.unregister(old)
+                except (KeyError, ValueError):
+                    pass
+            self._close_socket(old)
+        self._stop.set()
+        self.outbox.close()
+        self._reset_connection_state()
+        if self.threaded:
+            # Bounded waits so the handshake cannot outlive the resume window
+            sock.settimeout(1.0)
+            self._start_receive_thread(sock)
+        else:
+            self._attach_pumped(sock)
+        if not self.is_host:
+            self._enqueue(MessageType.RESUME.value, {
+                'token': self.session_token,
+                'received': self.received_count,
+                'first': self.replay_log.first_seq,
+            })
+            
+    def _on_resume_request(self, data: Any) -> None:
+        """Host: validate a RESUME and complete the handshake."""
+        sock = self.sock
+        if not (self.is_host and self.resuming and isinstance(data, dict)
+                and data.get('token') == self.session_token):
+            # Not our joiner; keep listening for the real one
+            self._handle_disconnect("Invalid resume request", sock)
+            return
+        peer_received, peer_first = data.get('received'), data.get('first')
+        if not (isinstance(peer_received, int) and isinstance(peer_first, int)
+                and self.replay_log.covers(peer_received)
+                and peer_first - 1 <= self.received_count):
+            self._enqueue(MessageType.DISCONNECT.value, "Session expired")
+            self._abandon_session("Session expired")
+            return
+        self._finish_resume(peer_received)
+        
+    def _on_resume_accepted(self, data: Any) -> None:
+        """Joiner: the host accepted RESUME; replay what it missed."""
+        if self.is_host or not self.resuming or not isinstance(data, dict):
+            return
+        peer_received = data.get('received')
+        if not (isinstance(peer_received, int) and self.replay_log.covers(peer_received)):
+            self._enqueue(MessageType.DISCONNECT.value, "Session expired")
+            self._abandon_session("Session expired")
+            return
+        self._finish_resume(peer_received)
+        
+    def _finish_resume(self, peer_received: int) -> None:
+        """Replay unacknowledged messages and mark the session connected."""
+        with self._seq_lock:
+            if self.is_host:
+                self._enqueue(MessageType.RESUMED.value, {'received': self.received_count})
+            for msg_type, data in self.replay_log.since(peer_received):
+                self._enqueue(msg_type, data)
+            with self._state_lock:
+                self.connected = True
+                self.resuming = False
+        self.replay_log.ack(peer_received)
+        if self.threaded and self.sock is not None:
+            self.sock.settimeout(None)
+        if self.is_host:
+            self._close_server_socket()
+        now = time.monotonic()
+        self.last_received = now
+        self._next_ping = now + self.HEARTBEAT_INTERVAL
+        self.resumes += 1
+        self.metrics.count('resumes')
+        self.last_resume_time = now - self._drop_time
+        if self.callbacks.on_resumed:
+            self._post(self.callbacks.on_resumed, f"Reconnected after {self.last_resume_time:.1f}s")
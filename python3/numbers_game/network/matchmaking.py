@@ -0,0 +1,252 @@
+"""Skill-based matchmaking queue for the match server.
+
+Waiting players are kept in one list per digit count, sorted by rating,
+so a newcomer's closest-rated opponents are its neighbours and are found
+with a binary search. Inserting into or removing from a list shifts the
+entries after it, which is O(n), but cheap at realistic queue lengths.
+Ratings must be finite, or the lists could not stay sorted.
+
+Two players may be paired when their rating gap is within the larger of
+their tolerances; a tolerance starts narrow and widens the longer a
+player waits, so nobody waits forever just because no one of exactly
+their skill is online. A periodic `sweep()` re-checks neighbours whose
+tolerances have widened since they were queued.
+"""
+
+import bisect
+import itertools
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from numbers_game.core.ratings import DEFAULT_RATING
+
+# Ratings a client may ask to be queued at
+MIN_RATING = 0.0
+MAX_RATING = 4000.0
+
+
+@dataclass
+class QueueEntry:
+    """A player waiting for a match.
+    
+    Attributes:
+        player: The caller's handle for the player (e.g. a PlayerConnection).
+        digit_count: Difficulty the player asked for.
+        rating: The player's skill rating.
+        enqueued_at: time.monotonic() when the player joined the queue.
+        seq: Arrival order, which breaks rating ties.
+    """
+    player: Any
+    digit_count: int
+    rating: float
+    enqueued_at: float
+    seq: int = 0
+    
+    @property
+    def key(self) -> Tuple[float, int]:
+        """Sort key within the digit-count queue."""
+        return (self.rating, self.seq)
+
+
+@dataclass
+class MatchmakingStats:
+    """Queue length and time-to-match figures.
+    
+    Attributes:
+        queued: Players waiting, by digit count.
+        matched: Pairs made since start.
+        wait_p50: Median seconds from enqueue to match (recent matches).
+        wait_p99: 99th percentile seconds from enqueue to match.
+        wait_max: Longest recent time to match.
+        longest_waiting: Seconds the longest-waiting player has waited so far.
+    """
+    queued: Dict[int, int] = field(default_factory=dict)
+    matched: int = 0
+    wait_p50: float = 0.0
+    wait_p99: float = 0.0
+    wait_max: float = 0.0
+    longest_waiting: float = 0.0
+    
+    @property
+    def queue_length(self) -> int:
+        """Total players waiting."""
+        return sum(self.queued.values())
+
+
+class Matchmaker:
+    """Pairs waiting players of similar rating, per digit count.
+    
+    Not thread-safe; the match server calls it from its event loop.
+    
+    Attributes:
+        base_tolerance: Rating gap accepted for a player who just joined.
+        widen_per_sec: How much the tolerance grows per second of waiting.
+        max_tolerance: Largest tolerance (None = unlimited).
+    """
+    
+    def __init__(
+        self,
+        base_tolerance: float = 100.0,
+        widen_per_sec: float = 50.0,
+        max_tolerance: Optional[float] = None,
+        history: int = 1024
+    ) -> None:
+        """Create an empty matchmaker.
+        
+        Args:
+            base_tolerance: Rating gap accepted immediately.
+            widen_per_sec: Tolerance growth per second waited.
+            max_tolerance: Cap on the tolerance (None = unlimited).
+            history: Number of recent times-to-match kept for percentiles.
+        """
+        self.base_tolerance = base_tolerance
+        self.widen_per_sec = widen_per_sec
+        self.max_tolerance = max_tolerance
+        self._queues: Dict[int, List[Tuple[Tuple[float, int], QueueEntry]]] = {}
+        self._entries: Dict[int, QueueEntry] = {}  # id(player) -> entry
+        self._seq = itertools.count()
+        self._waits: Deque[float] = deque(maxlen=history)
+        self.matched = 0
+        
+    def __len__(self) -> int:
+        return len(self._entries)
+        
+    def __contains__(self, player: Any) -> bool:
+        return id(player) in self._entries
+        
+    def tolerance(self, entry: QueueEntry, now: float) -> float:
+        """Return the rating gap `entry` accepts after waiting until `now`."""
+        tol = self.base_tolerance + self.widen_per_sec * max(0.0, now - entry.enqueued_at)
+        return tol if self.max_tolerance is None else min(tol, self.max_tolerance)
+        
+    def _compatible(self, a: QueueEntry, b: QueueEntry, now: float) -> bool:
+        """Whether a and b are close enough in rating to play."""
+        return abs(a.rating - b.rating) <= max(self.tolerance(a, now), self.tolerance(b, now))
+        
+    def enqueue(
+        self,
+        player: Any,
+        digit_count: int,
+        rating: float = DEFAULT_RATING,
+        now: Optional[float] = None
+    ) -> Optional[Tuple[Any, Any]]:
+        """Add a player, pairing them at once if a suitable opponent waits.
+        
+        A player already queued is re-queued with the new settings.
+        
+        Args:
+            player: Handle for the player.
+            digit_count: Requested difficulty.
+            rating: Skill rating.
+            now: Current time.monotonic() (for tests).
+            
+        Returns:
+            (opponent, player) if matched, otherwise None and the player waits.
+            
+        Raises:
+            ValueError: If the rating is not a finite number.
+        """
+        rating = float(rating)
+        if not math.isfinite(rating):
+            raise ValueError(f"Rating must be finite, got {rating}")
+        now = time.monotonic() if now is None else now
+        self.remove(player)
+        entry = QueueEntry(player, digit_count, rating, now, next(self._seq))
+        queue = self._queues.setdefault(digit_count, [])
+        
+        # The closest ratings are the neighbours at the insertion point
+        index = bisect.bisect_left(queue, (entry.key,))
+        best: Optional[int] = None
+        for i in (index - 1, index):
+            if 0 <= i < len(queue) and self._compatible(entry, queue[i][1], now):
+                if best is None or abs(queue[i][1].rating - entry.rating) < abs(queue[best][1].rating - entry.rating):
+                    best = i
+        if best is not None:
+            opponent = queue.pop(best)[1]
+            del self._entries[id(opponent.player)]
+            self._record_match(opponent, entry, now)
+            return opponent.player, player
+            
+        queue.insert(index, (entry.key, entry))
+        self._entries[id(player)] = entry
+        return None
+        
+    def waiting(self) -> List[Any]:
+        """Return every waiting player, in no particular order."""
+        return [entry.player for entry in self._entries.values()]
+        
+    def remove(self, player: Any) -> bool:
+        """Take a player out of the queue (e.g. on disconnect).
+        
+        Returns:
+            True if the player was waiting.
+        """
+        entry = self._entries.pop(id(player), None)
+        if entry is None:
+            return False
+        queue = self._queues[entry.digit_count]
+        index = bisect.bisect_left(queue, (entry.key,))
+        if index < len(queue) and queue[index][1] is entry:
+            del queue[index]
+        return True
+        
+    def sweep(self, now: Optional[float] = None) -> List[Tuple[Any, Any]]:
+        """Pair neighbours whose tolerances have widened enough.
+        
+        Args:
+            now: Current time.monotonic() (for tests).
+            
+        Returns:
+            Newly matched (player, player) pairs, in queue order.
+        """
+        now = time.monotonic() if now is None else now
+        pairs = []
+        for queue in self._queues.values():
+            kept = []
+            i = 0
+            while i < len(queue):
+                if i + 1 < len(queue) and self._compatible(queue[i][1], queue[i + 1][1], now):
+                    a, b = queue[i][1], queue[i + 1][1]
+                    del self._entries[id(a.player)]
+                    del self._entries[id(b.player)]
+                    self._record_match(a, b, now)
+                    pairs.append((a.player, b.player))
+                    i += 2
+                else:
+                    kept.append(queue[i])
+                    i += 1
+            queue[:] = kept
+        return pairs
+        
+    def _record_match(self, a: QueueEntry, b: QueueEntry, now: float) -> None:
+        """Count a pairing and both players' time in the queue."""
+        self._waits.append(now - a.enqueued_at)
+        self._waits.append(now - b.enqueued_at)
+        self.matched += 1
+        
+    def queue_length(self, digit_count: Optional[int] = None) -> int:
+        """Return the number of waiting players (for one digit count, or all)."""
+        if digit_count is None:
+            return len(self._entries)
+        return len(self._queues.get(digit_count, ()))
+        
+    def stats(self, now: Optional[float] = None) -> MatchmakingStats:
+        """Return queue lengths and time-to-match percentiles."""
+        now = time.monotonic() if now is None else now
+        waits = sorted(self._waits)
+        
+        def pct(p: float) -> float:
+            return waits[min(len(waits) - 1, int(len(waits) * p))] if waits else 0.0
+            
+        oldest = min((e.enqueued_at for e in self._entries.values()), default=now)
+        return MatchmakingStats(
+            queued={digits: len(q) for digits, q in self._queues.items() if q},
+            matched=self.matched,
+            wait_p50=pct(0.50),
+            wait_p99=pct(0.99),
+            wait_max=waits[-1] if waits else 0.0,
+            longest_waiting=now - oldest,
+        )
@@ -0,0 +1,30 @@
+"""Message types of the online multiplayer protocol."""
+
+from enum import Enum
+
+
+class MessageType(Enum):
+    """Types of network messages."""
+    NAME = "NAME"
+    SETUP_REQ = "SETUP_REQ"
+    SECRET_SET = "SECRET_SET"
+    START = "START"
+    GUESS = "GUESS"
+    RESULT = "RESULT"
+    DISCONNECT = "DISCONNECT"
+    PING = "PING"
+    PONG = "PONG"
+    ACK = "ACK"
+    RESUME = "RESUME"
+    RESUMED = "RESUMED"
+    SPECTATE = "SPECTATE"
+    MATCH_EVENT = "MATCH_EVENT"
+    OPPONENT_RESULT = "OPPONENT_RESULT"
+    ERROR = "ERROR"
+
+
+# Key under which per-type counters and limits lump together every type
+# that is not a MessageType, so a peer inventing types cannot grow them
+OTHER_TYPES = '*'
+
+KNOWN_TYPES = frozenset(t.value for t in MessageType)
@@ -0,0 +1,194 @@
+"""Counters and latency histograms for the network layer.
+
+NetworkMetrics is cheap enough to leave on: recording a message is a
+dict lookup and two integer additions under a lock, and a handler timing
+is one bisect into fixed histogram buckets. `snapshot()` returns plain
+data, and `start_dump()` appends a snapshot as one JSON line to a file
+every few seconds. Message types that are not MessageTypes are counted
+together under OTHER_TYPES, so made-up types cannot grow the tables.
+"""
+
+import bisect
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .messages import KNOWN_TYPES, OTHER_TYPES
+
+SENT = 'sent'
+RECEIVED = 'received'
+
+# Histogram bucket upper bounds in seconds: 10 µs doubling up to ~10 s
+_BOUNDS: List[float] = [1e-5 * 2 ** i for i in range(21)]
+
+
+class LatencyHistogram:
+    """Fixed, logarithmic buckets of durations. Not thread-safe on its own.
+    
+    Attributes:
+        count: Samples recorded.
+        total: Sum of all samples in seconds.
+        max: Largest sample in seconds.
+    """
+    
+    __slots__ = ('buckets', 'count', 'total', 'max')
+    
+    def __init__(self) -> None:
+        """Create an empty histogram."""
+        self.buckets = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        
+    def record(self, seconds: float) -> None:
+        """Add one sample."""
+        self.buckets[bisect.bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+            
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile (0.0 if empty)."""
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return _BOUNDS[i] if i < len(_BOUNDS) else self.max
+        return self.max
+        
+    def snapshot(self) -> Dict[str, float]:
+        """Return count, mean, p50, p99 and max, times in milliseconds."""
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+
+class NetworkMetrics:
+    """Message, byte, error and latency counters for one NetworkManager.
+    
+    Thread-safe. Other components can contribute gauges to snapshots with
+    `add_source()` (e.g. the outbox or RTT statistics).
+    
+    Attributes:
+        decode_errors: Payloads that could not be decoded.
+        last_decode_error: Start of the most recent undecodable payload.
+        reconnects: Dropped connections that started a session resume.
+        resumes: Resumes that succeeded.
+        disconnects: Connections lost for good (not counting local disconnect()).
+    """
+    
+    def __init__(self) -> None:
+        """Create zeroed counters."""
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        # direction -> msg_type -> [count, bytes]
+        self._traffic: Dict[str, Dict[str, List[int]]] = {SENT: {}, RECEIVED: {}}
+        self._handlers: Dict[str, LatencyHistogram] = {}
+        self._sources: Dict[str, Callable[[], Any]] = {}
+        self.decode_errors = 0
+        self.last_decode_error = b''
+        self.reconnects = 0
+        self.resumes = 0
+        self.disconnects = 0
+        self._dump_stop: Optional[threading.Event] = None
+        self._dump_thread: Optional[threading.Thread] = None
+        
+    def record(self, direction: str, msg_type: str, size: int) -> None:
+        """Count one message with a payload of `size` bytes sent or received."""
+        if msg_type not in KNOWN_TYPES:
+            msg_type = OTHER_TYPES
+        with self._lock:
+            entry = self._traffic[direction].get(msg_type)
+            if entry is None:
+                entry = self._traffic[direction][msg_type] = [0, 0]
+            entry[0] += 1
+            entry[1] += size
+            
+    def record_decode_error(self, payload: bytes) -> None:
+        """Count a payload that failed to decode."""
+        with self._lock:
+            self.decode_errors += 1
+            self.last_decode_error = bytes(payload[:50])
+            
+    def record_handler(self, msg_type: str, seconds: float) -> None:
+        """Record how long the message callback for `msg_type` took."""
+        if msg_type not in KNOWN_TYPES:
+            msg_type = OTHER_TYPES
+        with self._lock:
+            histogram = self._handlers.get(msg_type)
+            if histogram is None:
+                histogram = self._handlers[msg_type] = LatencyHistogram()
+            histogram.record(seconds)
+            
+    def count(self, event: str) -> None:
+        """Increment one of the event counters: reconnects, resumes or disconnects."""
+        with self._lock:
+            setattr(self, event, getattr(self, event) + 1)
+            
+    def add_source(self, name: str, provider: Callable[[], Any]) -> None:
+        """Include `provider()` under `name` in every snapshot."""
+        self._sources[name] = provider
+        
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every counter as JSON-serialisable data."""
+        with self._lock:
+            snap = {
+                'time': time.time(),
+                'uptime': time.monotonic() - self._started,
+                'sent': {t: {'count': c, 'bytes': b} for t, (c, b) in self._traffic[SENT].items()},
+                'received': {t: {'count': c, 'bytes': b} for t, (c, b) in self._traffic[RECEIVED].items()},
+                'decode_errors': self.decode_errors,
+                'reconnects': self.reconnects,
+                'resumes': self.resumes,
+                'disconnects': self.disconnects,
+                'handler_latency': {t: h.snapshot() for t, h in self._handlers.items()},
+            }
+        for name, provider in self._sources.items():
+            snap[name] = provider()
+        return snap
+        
+    def totals(self, direction: str) -> Dict[str, int]:
+        """Return total messages and bytes in one direction."""
+        with self._lock:
+            entries = self._traffic[direction].values()
+            return {
+                'count': sum(c for c, _ in entries),
+                'bytes': sum(b for _, b in entries),
+            }
+            
+    def dump(self, path: str) -> None:
+        """Append one snapshot to `path` as a JSON line."""
+        line = json.dumps(self.snapshot(), default=str)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            
+    def start_dump(self, path: str, interval: float = 10.0) -> None:
+        """Append a snapshot to `path` every `interval` seconds on a daemon thread."""
+        self.stop_dump()
+        stop = self._dump_stop = threading.Event()
+        
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    self.dump(path)
+                except OSError:
+                    pass
+                    
+        self._dump_thread = threading.Thread(target=run, daemon=True)
+        self._dump_thread.start()
+        
+    def stop_dump(self) -> None:
+        """Stop periodic dumping, if running."""
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
+            self._dump_thread = None
@@ -0,0 +1,174 @@
+"""Bounded outbound message queue with backpressure policies."""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+# What to do when a message is queued while the outbox is full
+POLICY_BLOCK = 'block'              # wait for the writer to make room
+POLICY_DROP_OLDEST = 'drop-oldest'  # discard the oldest queued message
+POLICY_DISCONNECT = 'disconnect'    # give up on the peer
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DISCONNECT)
+
+
+class OutboxFull(Exception):
+    """Raised by put() when the outbox is full under the disconnect policy."""
+
+
+class Outbox:
+    """Queue of encoded packets waiting to be written to a socket.
+
+    Producers `put()` packets from any thread; the writer `take()`s
+    everything queued at once and writes it with one syscall, so a burst
+    of small messages becomes a single send. Thread-safe.
+
+    Attributes:
+        limit: Most packets queued before the full policy applies.
+        policy: One of POLICIES.
+        high_water: Deepest the queue has been.
+        dropped: Packets discarded under the drop-oldest policy.
+    """
+
+    def __init__(self, limit: int = 256, policy: str = POLICY_BLOCK,
+                 rate_window: float = 1.0) -> None:
+        """Create an empty outbox.
+
+        Args:
+            limit: Maximum number of queued packets.
+            policy: Full-queue policy, one of POLICIES.
+            rate_window: Seconds over which bytes_per_sec is measured.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown outbox policy: {policy!r}")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self.policy = policy
+        self.rate_window = rate_window
+        self._packets: Deque[bytes] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.high_water = 0
+        self.dropped = 0
+        self.queued = 0
+        self.sent_messages = 0
+        self.sent_bytes = 0
+        self.writes = 0
+        self._recent: Deque[Tuple[float, int]] = deque()
+
+    def put(self, packet: bytes, timeout: Optional[float] = None) -> bool:
+        """Queue one packet, applying the policy if the outbox is full.
+
+        Args:
+            packet: Encoded message bytes.
+            timeout: Longest to wait under the block policy (None = forever).
+
+        Returns:
+            True if queued, False if the outbox was closed (or the block
+            policy timed out).
+
+        Raises:
+            OutboxFull: If full under the disconnect policy.
+        """
+        with self._cond:
+            if len(self._packets) >= self.limit and not self._closed:
+                if self.policy == POLICY_DISCONNECT:
+                    raise OutboxFull(f"{len(self._packets)} messages waiting")
+                if self.policy == POLICY_DROP_OLDEST:
+                    self._packets.popleft()
+                    self.dropped += 1
+                elif not self._cond.wait_for(
+                        lambda: len(self._packets) < self.limit or self._closed, timeout):
+                    return False
+            if self._closed:
+                return False
+            self._packets.append(packet)
+            self.queued += 1
+            if len(self._packets) > self.high_water:
+                self.high_water = len(self._packets)
+            self._cond.notify_all()
+            return True
+
+    @property
+    def full(self) -> bool:
+        """Whether the next put() will hit the full policy."""
+        return len(self._packets) >= self.limit
+
+    @property
+    def depth(self) -> int:
+        """Number of packets waiting."""
+        return len(self._packets)
+
+    def take(self, max_bytes: int = 65536, wait: bool = False) -> Optional[bytes]:
+        """Remove queued packets and return them joined into one buffer.
+
+        Packets are taken whole until max_bytes would be exceeded (at
+        least one is always taken).
+
+        Args:
+            max_bytes: Soft cap on the size of the returned buffer.
+            wait: Block until something is queued or the outbox is closed.
+
+        Returns:
+            The coalesced bytes, b'' if nothing was queued, or None once
+            the outbox is closed and empty.
+        """
+        with self._cond:
+            if wait:
+                self._cond.wait_for(lambda: self._packets or self._closed)
+            if not self._packets:
+                return None if self._closed else b''
+            batch = [self._packets.popleft()]
+            size = len(batch[0])
+            while self._packets and size + len(self._packets[0]) <= max_bytes:
+                packet = self._packets.popleft()
+                batch.append(packet)
+                size += len(packet)
+            self._cond.notify_all()
+        self._record_write(len(batch), size)
+        return batch[0] if len(batch) == 1 else b''.join(batch)
+
+    def _record_write(self, messages: int, size: int) -> None:
+        """Count one coalesced write."""
+        now = time.monotonic()
+        with self._cond:
+            self.sent_messages += messages
+            self.sent_bytes += size
+            self.writes += 1
+            self._recent.append((now, size))
+            self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        """Forget writes older than the rate window (lock held)."""
+        cutoff = now - self.rate_window
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+    @property
+    def bytes_per_sec(self) -> float:
+        """Bytes handed to the socket per second over the rate window."""
+        with self._cond:
+            self._prune(time.monotonic())
+            return sum(size for _, size in self._recent) / self.rate_window
+
+    def close(self) -> None:
+        """Stop accepting packets and wake any waiting producer or writer."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue and throughput counters."""
+        rate = self.bytes_per_sec
+        with self._cond:
+            return {
+                'depth': len(self._packets),
+                'high_water': self.high_water,
+                'queued': self.queued,
+                'dropped': self.dropped,
+                'sent_messages': self.sent_messages,
+                'sent_bytes': self.sent_bytes,
+                'writes': self.writes,
+                'bytes_per_sec': rate,
+            }
@@ -0,0 +1,95 @@
+"""Message encoding shared by NetworkManager and the match server.
+
+Every message is a JSON envelope ``{"type": ..., "data": ...}``. Peers
+advertise optional protocol features in a "caps" list attached to their
+NAME message; older peers ignore the extra key and never advertise any,
+so each side only uses what the other has announced.
+"""
+
+import json
+from typing import Any, Iterable, Optional
+
+from . import codec
+from .framing import LEGACY_SEPARATOR, encode_frame
+
+# Capability: understands length-prefixed frames
+CAP_FRAMING = 'frame'
+
+# Capability: understands the binary codec (only used inside frames)
+CAP_BINARY = 'bin'
+
+# Capability: answers PING with PONG (enables RTT and dead-peer detection)
+CAP_HEARTBEAT = 'ping'
+
+# Capability: can resume a dropped session (peer-to-peer only; see session.py)
+CAP_RESUME = 'resume'
+
+# Capability: scores guesses itself (match server only); clients send it
+# their secret in SECRET_SET instead of answering GUESS with RESULT
+CAP_SCORING = 'score'
+
+# Capabilities of the transport, shared by NetworkManager and the match server
+CAPABILITIES = (CAP_FRAMING, CAP_BINARY, CAP_HEARTBEAT)
+
+# Capabilities NetworkManager advertises to a directly connected peer
+PEER_CAPABILITIES = CAPABILITIES + (CAP_RESUME,)
+
+# Capabilities the match server advertises to its players
+SERVER_CAPABILITIES = CAPABILITIES + (CAP_SCORING,)
+
+
+def encode_message(
+    msg_type: str,
+    data: Any = None,
+    framed: bool = False,
+    binary: bool = False,
+    caps: Optional[Iterable[str]] = None,
+    session: Optional[str] = None
+) -> bytes:
+    """Encode a message for the wire.
+    
+    Args:
+        msg_type: Type of message (from MessageType enum).
+        data: Optional data payload.
+        framed: Use a length prefix instead of the legacy separator.
+        binary: Use the binary codec when the message fits it (framed only).
+        caps: Capabilities to advertise (sent with NAME, always as JSON).
+        session: Session token issued by the host (sent with NAME).
+        
+    Returns:
+        Bytes ready to write to the socket.
+    """
+    if framed and binary and caps is None and session is None:
+        payload = codec.encode(msg_type, data)
+        if payload is not None:
+            return encode_frame(payload)
+    envelope = {'type': msg_type, 'data': data}
+    if caps is not None:
+        envelope['caps'] = list(caps)
+    if session is not None:
+        envelope['session'] = session
+    payload = json.dumps(envelope).encode('utf-8')
+    if framed:
+        return encode_frame(payload)
+    return payload + LEGACY_SEPARATOR
+
+
+def decode_message(payload: memoryview) -> dict:
+    """Decode one message payload.
+    
+    Args:
+        payload: Bytes of one message, without framing.
+        
+    Returns:
+        The message envelope.
+        
+    Raises:
+        ValueError: If the payload is not a valid message.
+    """
+    if codec.is_binary_payload(payload):
+        msg_type, data = codec.decode(payload)
+        return {'type': msg_type, 'data': data}
+    msg = json.loads(bytes(payload))
+    if not isinstance(msg, dict):
+        raise ValueError("Message is not an object")
+    return msg
@@ -0,0 +1,153 @@
+"""Flood protection for incoming messages.
+
+Every connection gets a RateLimiter holding one token bucket per message
+type; types the protocol does not define share a single bucket. A
+message that finds its bucket empty is dropped before it reaches any
+handler, so a peer spamming GUESS cannot make the receiver compute and
+send a RESULT for each one. Drops are themselves metered: a peer that
+keeps flooding after being limited is disconnected.
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+from .framing import FrameError
+from .messages import KNOWN_TYPES, OTHER_TYPES, MessageType
+
+# Verdicts returned by RateLimiter.check()
+ALLOW = 'allow'
+DROP = 'drop'
+DISCONNECT = 'disconnect'
+
+# (messages per second, burst) by message type. Bursts leave room for
+# the replay that follows a session resume.
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    MessageType.GUESS.value: (10.0, 64),
+    MessageType.RESULT.value: (10.0, 64),
+    MessageType.OPPONENT_RESULT.value: (10.0, 64),
+    MessageType.NAME.value: (2.0, 16),
+    MessageType.SETUP_REQ.value: (2.0, 16),
+    MessageType.SECRET_SET.value: (2.0, 16),
+    MessageType.START.value: (2.0, 16),
+    MessageType.PING.value: (10.0, 32),
+    MessageType.PONG.value: (10.0, 32),
+    MessageType.ACK.value: (10.0, 32),
+}
+DEFAULT_LIMIT: Tuple[float, float] = (20.0, 64)
+
+
+class RateLimitExceeded(FrameError):
+    """Raised when a peer keeps flooding after being limited.
+    
+    A FrameError, so receive loops close the connection exactly as they
+    do for a malformed stream.
+    """
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average, and up to `burst` at once."""
+    
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+    
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        """Create a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+        
+    def take(self, now: float, cost: float = 1.0) -> bool:
+        """Spend `cost` tokens if available.
+        
+        Returns:
+            True if the event is allowed.
+        """
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+
+class RateLimiter:
+    """Per-message-type token buckets for one connection.
+    
+    Attributes:
+        allowed: Messages let through.
+        limited: Messages dropped because their bucket was empty.
+        limited_by_type: Dropped messages by type (OTHER_TYPES for types
+            that are neither MessageTypes nor in `limits`).
+        disconnects: Times a peer was judged abusive.
+        frame_errors: Oversized or malformed frames (counted by the owner).
+    """
+    
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        default: Tuple[float, float] = DEFAULT_LIMIT,
+        abuse_rate: float = 5.0,
+        abuse_burst: float = 100
+    ) -> None:
+        """Create a limiter with full buckets.
+        
+        Args:
+            limits: (rate, burst) per message type; DEFAULT_LIMITS if None.
+            default: (rate, burst) for types not in `limits`. Each
+                MessageType gets its own bucket; all other types share one.
+            abuse_rate: Drops per second tolerated indefinitely.
+            abuse_burst: Drops tolerated at once before disconnecting.
+        """
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.default = default
+        self.abuse_rate = abuse_rate
+        self.abuse_burst = abuse_burst
+        self.allowed = 0
+        self.limited = 0
+        self.limited_by_type: Dict[str, int] = {}
+        self.disconnects = 0
+        self.frame_errors = 0
+        self.reset()
+        
+    def reset(self) -> None:
+        """Refill every bucket, e.g. for a new connection (counters are kept)."""
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._abuse = TokenBucket(self.abuse_rate, self.abuse_burst, time.monotonic())
+        
+    def check(self, msg_type: str, now: Optional[float] = None) -> str:
+        """Account for one incoming message.
+        
+        Args:
+            msg_type: Type of the message.
+            now: Current time.monotonic() (for tests).
+            
+        Returns:
+            ALLOW to handle the message, DROP to ignore it, or DISCONNECT
+            if the peer should be cut off.
+        """
+        now = time.monotonic() if now is None else now
+        if msg_type not in self.limits and msg_type not in KNOWN_TYPES:
+            msg_type = OTHER_TYPES
+        bucket = self._buckets.get(msg_type)
+        if bucket is None:
+            rate, burst = self.limits.get(msg_type, self.default)
+            bucket = self._buckets[msg_type] = TokenBucket(rate, burst, now)
+        if bucket.take(now):
+            self.allowed += 1
+            return ALLOW
+        self.limited += 1
+        self.limited_by_type[msg_type] = self.limited_by_type.get(msg_type, 0) + 1
+        if self._abuse.take(now):
+            return DROP
+        self.disconnects += 1
+        return DISCONNECT
+        
+    def stats(self) -> Dict[str, object]:
+        """Return the counters."""
+        return {
+            'allowed': self.allowed,
+            'limited': self.limited,
+            'limited_by_type': dict(self.limited_by_type),
+            'disconnects': self.disconnects,
+            'frame_errors': self.frame_errors,
+        }
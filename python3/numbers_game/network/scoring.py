@@ -0,0 +1,85 @@
+"""Reusable GameEngines for scoring guesses on the match server.
+
+When clients hand the server their secrets, each secret lives in a
+GameEngine held by the server for the length of a match. A new
+GameEngine draws a random secret of its own, only for it to be
+overwritten, so finished matches return their engines to an EnginePool
+and new matches take them from there. With thousands of matches running
+the pool settles at about one engine per playing client.
+"""
+
+from typing import Dict, List, Optional
+
+from numbers_game.core import GameEngine
+
+
+class EnginePool:
+    """Free lists of GameEngines, one per digit count. Not thread-safe.
+    
+    Attributes:
+        max_idle: Idle engines kept per digit count; extras are discarded.
+        created: Engines constructed.
+        reused: Acquisitions served from the free list.
+        rejected: Secrets refused as invalid.
+        in_use: Engines acquired and not yet released.
+    """
+    
+    def __init__(self, max_idle: int = 4096) -> None:
+        """Create an empty pool.
+        
+        Args:
+            max_idle: Idle engines kept per digit count.
+        """
+        self.max_idle = max_idle
+        self._idle: Dict[int, List[GameEngine]] = {}
+        self.created = 0
+        self.reused = 0
+        self.rejected = 0
+        self.in_use = 0
+        
+    def acquire(self, digit_count: int, secret: str) -> Optional[GameEngine]:
+        """Return an engine holding `secret`.
+        
+        Args:
+            digit_count: Digits in the match's numbers.
+            secret: The player's secret, as sent.
+            
+        Returns:
+            The engine, or None if the secret breaks the game rules.
+        """
+        idle = self._idle.get(digit_count)
+        if idle:
+            engine = idle.pop()
+            reused = True
+        else:
+            engine = GameEngine(digit_count)
+            self.created += 1
+            reused = False
+        valid, _ = engine.check_input(secret)
+        if not valid:
+            self.rejected += 1
+            self._idle.setdefault(digit_count, []).append(engine)
+            return None
+        if reused:
+            self.reused += 1
+        engine.num = int(secret)
+        engine.hints_used = 0
+        self.in_use += 1
+        return engine
+        
+    def release(self, engine: GameEngine) -> None:
+        """Return an engine once its match is over."""
+        self.in_use -= 1
+        idle = self._idle.setdefault(engine.digit_count, [])
+        if len(idle) < self.max_idle:
+            idle.append(engine)
+            
+    def stats(self) -> Dict[str, int]:
+        """Return the counters."""
+        return {
+            'in_use': self.in_use,
+            'idle': sum(len(idle) for idle in self._idle.values()),
+            'created': self.created,
+            'reused': self.reused,
+            'rejected': self.rejected,
+        }
@@ -0,0 +1,610 @@
+"""Asyncio game server for running many online matches in one process.
+
+Unlike NetworkManager, where one player hosts and the other joins, the
+server is a neutral host: players connect with the regular "join" flow,
+are paired in arrival order, and the server relays messages within each
+match. The server takes over the host's role in the protocol, so a
+match looks like this to both clients:
+
+    client -> server   NAME <name>
+    server -> client   NAME <opponent name>, then SETUP_REQ <digit count>
+    client -> server   SECRET_SET <secret>   (the opponent is sent true)
+    server -> client   START <digit count>   (once both are ready)
+    client -> server   GUESS <number>
+    server -> client   RESULT to the guesser, OPPONENT_RESULT to the opponent
+                       (ERROR <reason> to the guesser if the guess is invalid)
+    DISCONNECT         sent to the remaining player, who is then closed
+    PING               answered with PONG by the server itself
+
+The server is authoritative for scoring: it advertises CAP_SCORING, and
+clients that see it send their secret in SECRET_SET. Secrets are kept in
+GameEngines from an EnginePool and never leave the server; a GUESS is
+answered straight away instead of waiting on a round trip to the other
+client. Older clients send SECRET_SET true, and guesses at their secret
+are relayed to them to answer with RESULT as before.
+
+A connection that sends SPECTATE (with a match id, or null for the most
+recent match) instead of NAME becomes a spectator. It gets a SPECTATE
+reply describing the match, the events so far, then a MATCH_EVENT for
+every START, GUESS, RESULT and END. Only those events are shared, never
+anything a player sent during setup. Each event is encoded once and the same
+frame is written to every spectator; a spectator whose unsent backlog
+passes `spectator_buffer_limit` is disconnected rather than slowing the
+match down.
+
+With a Matchmaker, players are not paired on arrival but queued once
+their NAME arrives, by digit count and rating, and paired with someone of
+similar skill. A client chooses its queue by sending SETUP_REQ with
+``{"digit_count": 5, "rating": 1620}`` (before or after NAME); clients
+that don't are queued at the server's digit count and the default rating.
+A rating that is not a number from MIN_RATING to MAX_RATING is answered
+with ERROR and the request is ignored.
+
+Every connection's incoming messages pass through its own RateLimiter
+(DEFAULT_LIMITS unless the server is given a factory for others): a message over its
+type's limit is ignored, and a client that keeps flooding is closed, so
+a burst of GUESSes cannot make the server score each one.
+
+Run standalone with ``python -m numbers_game.network.server``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from numbers_game.core import DEFAULT_DIGIT_COUNT, GameEngine
+from .framing import FrameBuffer, FrameError
+from .manager import MessageType, NetworkManager
+from .matchmaking import DEFAULT_RATING, MAX_RATING, MIN_RATING, Matchmaker, MatchmakingStats
+from .protocol import CAP_BINARY, CAP_FRAMING, SERVER_CAPABILITIES, decode_message, encode_message
+from .ratelimit import ALLOW, DISCONNECT, RateLimiter, RateLimitExceeded
+from .scoring import EnginePool
+
+# Match events kept for replay to spectators who join late; older ones
+# are dropped so a match that never ends cannot grow without bound
+MATCH_HISTORY = 1024
+
+
+class PlayerConnection:
+    """Server-side state for one connected player."""
+    
+    __slots__ = ('conn_id', 'writer', 'peer', 'name', 'ready', 'match', 'framed', 'binary',
+                 'digit_count', 'rating', 'spectating', 'engine', 'limiter')
+                 
+    def __init__(
+        self,
+        conn_id: int,
+        writer: asyncio.StreamWriter,
+        limiter: Optional[RateLimiter] = None
+    ) -> None:
+        """Wrap an accepted connection."""
+        self.conn_id = conn_id
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername')
+        self.name: Optional[str] = None
+        self.ready = False
+        self.match: Optional['Match'] = None
+        self.framed = False
+        self.binary = False
+        self.digit_count: Optional[int] = None
+        self.rating = DEFAULT_RATING
+        self.spectating: Optional['Match'] = None
+        self.engine: Optional[GameEngine] = None  # holds this player's secret
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        
+    def send(self, msg_type: str, data: Any = None) -> None:
+        """Queue a message for this player."""
+        if not self.writer.is_closing():
+            caps = SERVER_CAPABILITIES if msg_type == MessageType.NAME.value else None
+            self.writer.write(encode_message(
+                msg_type, data, framed=self.framed, binary=self.binary, caps=caps
+            ))
+
+
+@dataclass
+class Match:
+    """Server-side state for one match between two players."""
+    match_id: int
+    players: Tuple[PlayerConnection, PlayerConnection]
+    digit_count: int
+    phase: str = 'naming'  # naming -> setup -> playing -> finished
+    created_at: float = field(default_factory=time.monotonic)
+    spectators: List[PlayerConnection] = field(default_factory=list)
+    # Encoded MATCH_EVENT frames, the newest MATCH_HISTORY of them
+    history: Deque[bytes] = field(default_factory=lambda: deque(maxlen=MATCH_HISTORY))
+    
+    def opponent(self, player: PlayerConnection) -> PlayerConnection:
+        """Return the other player in the match."""
+        return self.players[1] if player is self.players[0] else self.players[0]
+        
+    def describe(self) -> Dict[str, Any]:
+        """Public summary sent to a new spectator."""
+        return {
+            'match': self.match_id,
+            'players': [p.name for p in self.players],
+            'digit_count': self.digit_count,
+            'phase': self.phase,
+        }
+
+
+class MatchServer:
+    """Accepts many players and runs their matches on one event loop.
+    
+    Attributes:
+        SPECTATOR_SNDBUF: Kernel send buffer for spectator sockets, kept
+            small so a stalled viewer shows up in the transport's buffer.
+        matches: Active matches by id.
+        digit_count: Number of digits used for every match (the default
+            queue when matchmaking).
+        matchmaker: Skill-based queue, or None to pair in arrival order.
+        spectator_buffer_limit: Unsent bytes at which a spectator is dropped.
+        engines: Pool of engines holding players' secrets.
+        rate_limiter: Makes the RateLimiter for each new connection.
+    """
+    
+    SPECTATOR_SNDBUF = 64 * 1024
+    
+    def __init__(
+        self,
+        host: str = '',
+        port: int = NetworkManager.DEFAULT_PORT,
+        digit_count: int = DEFAULT_DIGIT_COUNT,
+        matchmaker: Optional[Matchmaker] = None,
+        sweep_interval: float = 0.25,
+        spectator_buffer_limit: int = 256 * 1024,
+        engines: Optional[EnginePool] = None,
+        rate_limiter: Callable[[], RateLimiter] = RateLimiter
+    ) -> None:
+        """Configure the server; call start() to begin listening.
+        
+        Args:
+            host: Interface to bind ('' for all).
+            port: Port to listen on (0 picks a free port).
+            digit_count: Number of digits used for every match.
+            matchmaker: Pair players by skill instead of arrival order.
+            sweep_interval: Seconds between re-checks of the matchmaking
+                queue as tolerances widen.
+            spectator_buffer_limit: Unsent bytes at which a slow spectator
+                is disconnected.
+            engines: Pool for players' secrets (a new one if None).
+            rate_limiter: Makes the RateLimiter for each new connection
+                (DEFAULT_LIMITS by default).
+        """
+        self.host = host
+        self.port = port
+        self.digit_count = digit_count
+        self.matches: Dict[int, Match] = {}
+        self.matchmaker = matchmaker
+        self.sweep_interval = sweep_interval
+        self.spectator_buffer_limit = spectator_buffer_limit
+        self.engines = engines if engines is not None else EnginePool()
+        self.rate_limiter = rate_limiter
+        self._sweeper: Optional[asyncio.Task] = None
+        self._waiting: Optional[PlayerConnection] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+        
+        # Counters
+        self.connections_total = 0
+        self.matches_started = 0
+        self.matches_finished = 0
+        self.messages_relayed = 0
+        self.guesses_scored = 0
+        self.events_broadcast = 0
+        self.spectators_total = 0
+        self.spectators_dropped = 0
+        self.sweep_errors = 0
+        self.messages_limited = 0
+        self.flooders_closed = 0
+        
+    async def start(self) -> Tuple[str, int]:
+        """Start listening.
+        
+        Returns:
+            The (host, port) actually bound.
+        """
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, backlog=1024
+        )
+        sockname = self._server.sockets[0].getsockname()
+        self.port = sockname[1]
+        if self.matchmaker is not None:
+            self._sweeper = asyncio.ensure_future(self._sweep_loop())
+        return sockname[0], sockname[1]
+        
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+        
+    async def stop(self) -> None:
+        """Stop listening and close every player connection."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for match in list(self.matches.values()):
+            for player in match.players + tuple(match.spectators):
+                player.writer.close()
+        if self._waiting is not None:
+            self._waiting.writer.close()
+            self._waiting = None
+        if self.matchmaker is not None:
+            for player in self.matchmaker.waiting():
+                player.writer.close()
+        # Let handlers see EOF and clean up rather than be cancelled mid-read
+        if self._handlers:
+            await asyncio.wait(set(self._handlers), timeout=1.0)
+            
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the server counters."""
+        return {
+            'active_matches': len(self.matches),
+            'waiting_players': (len(self.matchmaker) if self.matchmaker is not None
+                                else 1 if self._waiting is not None else 0),
+            'connections_total': self.connections_total,
+            'matches_started': self.matches_started,
+            'matches_finished': self.matches_finished,
+            'messages_relayed': self.messages_relayed,
+            'guesses_scored': self.guesses_scored,
+            'engines_in_use': self.engines.in_use,
+            'spectators': sum(len(m.spectators) for m in self.matches.values()),
+            'spectators_total': self.spectators_total,
+            'spectators_dropped': self.spectators_dropped,
+            'events_broadcast': self.events_broadcast,
+            'messages_limited': self.messages_limited,
+            'flooders_closed': self.flooders_closed,
+        }
+        
+    def matchmaking_stats(self) -> Optional[MatchmakingStats]:
+        """Return queue length and time-to-match figures, or None without a matchmaker."""
+        return self.matchmaker.stats() if self.matchmaker is not None else None
+        
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one player connection until it closes."""
+        player = PlayerConnection(next(self._ids), writer, self.rate_limiter())
+        self.connections_total += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        if self.matchmaker is None:
+            self._pair(player)
+            
+        buffer = FrameBuffer(NetworkManager.BUFFER_SIZE, NetworkManager.MAX_MESSAGE_SIZE)
+        try:
+            while True:
+                data = await reader.read(NetworkManager.BUFFER_SIZE)
+                if not data:
+                    break
+                buffer.feed(data)
+                for payload in buffer.messages():
+                    self._process_message(player, payload)
+                await writer.drain()
+        except (ConnectionError, OSError, FrameError):
+            pass
+        finally:
+            self._drop(player)
+            writer.close()
+            self._handlers.discard(task)
+            
+    def _pair(self, player: PlayerConnection) -> None:
+        """Pair a new player with the waiting one, or make them wait."""
+        waiting = self._waiting
+        if waiting is None or waiting.writer.is_closing():
+            self._waiting = player
+            return
+        self._waiting = None
+        self._start_match(waiting, player, self.digit_count)
+        
+    def _start_match(self, a: PlayerConnection, b: PlayerConnection, digit_count: int) -> None:
+        """Create a match for two players and introduce them."""
+        match = Match(next(self._ids), (a, b), digit_count)
+        a.match = b.match = match
+        self.matches[match.match_id] = match
+        self.matches_started += 1
+        # Names sent before pairing are delivered now
+        for p in match.players:
+            if p.name is not None:
+                match.opponent(p).send(MessageType.NAME.value, p.name)
+        self._maybe_setup(match)
+        
+    def _process_message(self, player: PlayerConnection, payload: memoryview) -> None:
+        """Parse and handle one message from a player.
+        
+        Raises:
+            RateLimitExceeded: If the player keeps flooding after being limited.
+        """
+        try:
+            msg = decode_message(payload)
+        except ValueError:
+            return
+        msg_type = msg.get('type', '')
+        data = msg.get('data')
+        
+        verdict = player.limiter.check(str(msg_type))
+        if verdict != ALLOW:
+            self.messages_limited += 1
+            if verdict == DISCONNECT:
+                self.flooders_closed += 1
+                raise RateLimitExceeded(f"Player flooded {msg_type} messages")
+            return
+        
+        match = player.match
+        if msg_type == MessageType.PING.value:
+            player.send(MessageType.PONG.value, data)
+        elif player.spectating is not None:
+            return
+        elif msg_type == MessageType.SPECTATE.value:
+            self._spectate(player, data)
+        elif msg_type == MessageType.NAME.value:
+            player.name = str(data)
+            if isinstance(msg.get('caps'), list):
+                player.framed = CAP_FRAMING in msg['caps']
+                player.binary = player.framed and CAP_BINARY in msg['caps']
+            if match is not None:
+                match.opponent(player).send(msg_type, player.name)
+                self._maybe_setup(match)
+            elif self.matchmaker is not None:
+                self._enqueue(player)
+        elif match is None:
+            if msg_type == MessageType.SETUP_REQ.value and self.matchmaker is not None:
+                if self._set_preferences(player, data) and player.name is not None:
+                    self._enqueue(player)
+            return
+        elif msg_type == MessageType.SECRET_SET.value and match.phase == 'setup':
+            if isinstance(data, str):
+                if player.engine is not None:
+                    self.engines.release(player.engine)
+                player.engine = self.engines.acquire(match.digit_count, data)
+                if player.engine is None:
+                    # Not a valid secret; ask again
+                    player.send(MessageType.SETUP_REQ.value, match.digit_count)
+                    return
+                data = True
+            player.ready = True
+            self._relay(match, player, msg_type, data)
+            if all(p.ready for p in match.players):
+                match.phase = 'playing'
+                for p in match.players:
+                    p.send(MessageType.START.value, match.digit_count)
+                self._broadcast(match, MessageType.START.value, None, match.describe())
+        elif msg_type == MessageType.GUESS.value and match.phase == 'playing':
+            if match.opponent(player).engine is not None:
+                self._score(match, player, data)
+            else:
+                self._relay(match, player, msg_type, data)
+                self._broadcast(match, msg_type, player.name, data)
+        elif msg_type == MessageType.RESULT.value and match.phase == 'playing':
+            # Only clients that kept their secret answer guesses themselves
+            if player.engine is None:
+                self._relay(match, player, msg_type, data)
+                self._broadcast(match, msg_type, player.name, data)
+        elif msg_type == MessageType.DISCONNECT.value:
+            player.writer.close()
+            
+    def _set_preferences(self, player: PlayerConnection, data: Any) -> bool:
+        """Read a client's SETUP_REQ: a digit count, or {digit_count, rating}.
+        
+        Returns:
+            False if the request was rejected (and answered with ERROR).
+        """
+        if not isinstance(data, dict):
+            data = {'digit_count': data}
+        try:
+            digit_count = int(data.get('digit_count', self.digit_count))
+            rating = float(data.get('rating', DEFAULT_RATING))
+        except (TypeError, ValueError, OverflowError):
+            player.send(MessageType.ERROR.value, "Invalid matchmaking preferences")
+            return False
+        if not (math.isfinite(rating) and MIN_RATING <= rating <= MAX_RATING):
+            player.send(MessageType.ERROR.value,
+                        f"Rating must be a number from {MIN_RATING:.0f} to {MAX_RATING:.0f}")
+            return False
+        if digit_count in (4, 5, 6):
+            player.digit_count = digit_count
+        player.rating = rating
+        return True
+        
+    def _enqueue(self, player: PlayerConnection) -> None:
+        """Queue a named player for matchmaking, starting a match if paired."""
+        digit_count = player.digit_count or self.digit_count
+        pair = self.matchmaker.enqueue(player, digit_count, player.rating)
+        if pair is not None:
+            self._start_match(pair[0], pair[1], digit_count)
+            
+    async def _sweep_loop(self) -> None:
+        """Pair queued players as their tolerances widen."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            # One bad sweep or match must not stop matchmaking for everyone
+            try:
+                pairs = self.matchmaker.sweep()
+            except Exception:
+                self.sweep_errors += 1
+                continue
+            for a, b in pairs:
+                try:
+                    self._start_match(a, b, a.digit_count or self.digit_count)
+                except Exception:
+                    self.sweep_errors += 1
+                
+    def _spectate(self, player: PlayerConnection, data: Any) -> None:
+        """Turn a fresh connection into a spectator of the requested match."""
+        if player.name is not None or (player.match is not None and player.match.phase != 'naming'):
+            return
+        self._unpair(player)
+        if data is None:
+            # The newest match that has real players in it
+            named = [m for m in self.matches.values() if m.phase != 'naming']
+            match = max(named, key=lambda m: m.match_id) if named else None
+        else:
+            try:
+                match = self.matches.get(int(data))
+            except (TypeError, ValueError):
+                match = None
+        if match is None:
+            player.framed = True
+            player.send(MessageType.DISCONNECT.value, "No such match")
+            player.writer.close()
+            return
+            
+        player.spectating = match
+        player.framed = True
+        player.binary = False
+        match.spectators.append(player)
+        self.spectators_total += 1
+        sock = player.writer.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.SPECTATOR_SNDBUF)
+            except OSError:
+                pass
+        player.send(MessageType.SPECTATE.value, match.describe())
+        if match.history:
+            player.writer.write(b''.join(match.history))
+            
+    def _unpair(self, player: PlayerConnection) -> None:
+        """Undo pairing for a connection that turned out to be a spectator.
+        
+        Only called before the connection sent NAME, so its opponent has
+        not been told about it and is simply paired again.
+        """
+        if self._waiting is player:
+            self._waiting = None
+        if self.matchmaker is not None:
+            self.matchmaker.remove(player)
+        match = player.match
+        if match is None:
+            return
+        del self.matches[match.match_id]
+        self.matches_started -= 1
+        opponent = match.opponent(player)
+        player.match = opponent.match = None
+        if self.matchmaker is None:
+            self._pair(opponent)
+        elif opponent.name is not None:
+            self._enqueue(opponent)
+            
+    def _broadcast(self, match: Match, event: str, player_name: Optional[str], data: Any) -> None:
+        """Encode one match event and write the same frame to every spectator."""
+        frame = encode_message(MessageType.MATCH_EVENT.value, {
+            'match': match.match_id,
+            'event': event,
+            'player': player_name,
+            'data': data,
+        }, framed=True)
+        match.history.append(frame)
+        self.events_broadcast += 1
+        if not match.spectators:
+            return
+        slow = []
+        for spectator in match.spectators:
+            transport = spectator.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > self.spectator_buffer_limit:
+                slow.append(spectator)
+            else:
+                transport.write(frame)
+        for spectator in slow:
+            # abort() discards the backlog instead of trying to flush it
+            match.spectators.remove(spectator)
+            self.spectators_dropped += 1
+            spectator.writer.transport.abort()
+            
+    def _score(self, match: Match, guesser: PlayerConnection, guess: Any) -> None:
+        """Answer a guess from the opponent's secret, without asking the opponent."""
+        target = match.opponent(guesser)
+        guess = str(guess)
+        try:
+            valid, error = target.engine.check_input(guess)
+            if valid:
+                count, place = target.engine.compare(int(guess))
+        except ValueError:
+            valid, error = False, "Not a number"
+        if not valid:
+            guesser.send(MessageType.ERROR.value, f"Invalid guess {guess[:16]!r}: {error}")
+            return
+        result = {'guess': guess, 'count': count, 'place': place}
+        guesser.send(MessageType.RESULT.value, result)
+        target.send(MessageType.OPPONENT_RESULT.value, result)
+        self.guesses_scored += 1
+        self._broadcast(match, MessageType.GUESS.value, guesser.name, guess)
+        self._broadcast(match, MessageType.RESULT.value, target.name, result)
+        
+    def _relay(self, match: Match, sender: PlayerConnection, msg_type: str, data: Any) -> None:
+        """Forward a message to the sender's opponent."""
+        match.opponent(sender).send(msg_type, data)
+        self.messages_relayed += 1
+        
+    def _maybe_setup(self, match: Match) -> None:
+        """Ask both players for secrets once both names are known."""
+        if match.phase == 'naming' and all(p.name is not None for p in match.players):
+            match.phase = 'setup'
+            for p in match.players:
+                p.send(MessageType.SETUP_REQ.value, match.digit_count)
+                
+    def _drop(self, player: PlayerConnection) -> None:
+        """Remove a player and end their match."""
+        if player.spectating is not None:
+            if player in player.spectating.spectators:
+                player.spectating.spectators.remove(player)
+            return
+        if self._waiting is player:
+            self._waiting = None
+        if self.matchmaker is not None:
+            self.matchmaker.remove(player)
+        match = player.match
+        if match is None or match.match_id not in self.matches:
+            return
+        del self.matches[match.match_id]
+        match.phase = 'finished'
+        self.matches_finished += 1
+        for p in match.players:
+            if p.engine is not None:
+                self.engines.release(p.engine)
+                p.engine = None
+        opponent = match.opponent(player)
+        opponent.send(MessageType.DISCONNECT.value, "Opponent left")
+        opponent.writer.close()
+        self._broadcast(match, 'END', player.name, "Player left")
+        for spectator in match.spectators:
+            spectator.writer.close()
+
+
+def main() -> None:
+    """Run the match server from the command line."""
+    parser = argparse.ArgumentParser(description="Numbers Game match server")
+    parser.add_argument('--host', default='')
+    parser.add_argument('--port', type=int, default=NetworkManager.DEFAULT_PORT)
+    parser.add_argument('--digits', type=int, default=DEFAULT_DIGIT_COUNT, choices=[4, 5, 6])
+    parser.add_argument('--matchmaking', action='store_true',
+                        help="pair players by digit count and rating instead of arrival order")
+    args = parser.parse_args()
+    
+    matchmaker = Matchmaker() if args.matchmaking else None
+    server = MatchServer(args.host, args.port, args.digits, matchmaker)
+    
+    async def run() -> None:
+        host, port = await server.start()
+        print(f"Match server listening on {host or '0.0.0.0'}:{port}")
+        await server.serve_forever()
+        
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
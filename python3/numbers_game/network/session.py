@@ -0,0 +1,80 @@
+"""Session resume support: tokens and the replay log.
+
+A session outlives its TCP connection. The host issues a token with its
+NAME message. Both sides count the application messages (everything but
+connection control such as PING/ACK/RESUME) they send and receive; since
+TCP delivers in order, the n-th message sent is the n-th received, so no
+sequence number is needed on the wire. Each side keeps what it sent in a
+bounded ReplayLog, trimmed by the peer's cumulative ACKs. After a drop
+the joiner reconnects and sends RESUME with the token and its received
+count; the host answers RESUMED with its own, and each side replays only
+the messages the other has not seen.
+"""
+
+import secrets
+import threading
+from collections import deque
+from typing import Any, Deque, List, Tuple
+
+
+def new_token() -> str:
+    """Return a fresh, unguessable session token."""
+    return secrets.token_hex(8)
+
+
+class ReplayLog:
+    """Bounded log of sent application messages, numbered from 1.
+    
+    Thread-safe. When more than `capacity` messages are unacknowledged
+    the oldest are dropped, and a peer that missed them can no longer
+    be resumed (see `covers`).
+    
+    Attributes:
+        capacity: Most messages kept.
+        next_seq: Sequence number the next appended message gets.
+    """
+    
+    def __init__(self, capacity: int = 512) -> None:
+        """Create an empty log.
+        
+        Args:
+            capacity: Most unacknowledged messages kept.
+        """
+        self.capacity = capacity
+        self.next_seq = 1
+        self._entries: Deque[Tuple[int, str, Any]] = deque()
+        self._lock = threading.Lock()
+        
+    def __len__(self) -> int:
+        return len(self._entries)
+        
+    def append(self, msg_type: str, data: Any) -> int:
+        """Record a sent message and return its sequence number."""
+        with self._lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            self._entries.append((seq, msg_type, data))
+            if len(self._entries) > self.capacity:
+                self._entries.popleft()
+            return seq
+            
+    def ack(self, received: int) -> None:
+        """Forget messages the peer has confirmed (cumulative)."""
+        with self._lock:
+            while self._entries and self._entries[0][0] <= received:
+                self._entries.popleft()
+                
+    @property
+    def first_seq(self) -> int:
+        """Oldest sequence number still available for replay."""
+        with self._lock:
+            return self._entries[0][0] if self._entries else self.next_seq
+            
+    def covers(self, received: int) -> bool:
+        """Whether everything after `received` can still be replayed."""
+        return self.first_seq - 1 <= received < self.next_seq
+        
+    def since(self, received: int) -> List[Tuple[str, Any]]:
+        """Return (msg_type, data) of every message after `received`."""
+        with self._lock:
+            return [(t, d) for seq, t, d in self._entries if seq > received]
@@ -0,0 +1,74 @@
+"""Drive a pump-mode NetworkManager from the Tk event loop.
+
+Network I/O runs on the GUI thread in short non-blocking slices scheduled
+with ``after()``, so callbacks can touch widgets directly and no
+per-message closures are queued across threads.
+"""
+
+from typing import Any, Optional
+
+from .manager import NetworkManager
+
+
+class TkNetworkPump:
+    """Periodically pumps a NetworkManager from a Tk widget's event loop.
+
+    The poll interval adapts: it drops to `busy_ms` while traffic is
+    flowing and backs off to `idle_ms` when the connection is quiet, so an
+    idle game costs a handful of wakeups per second.
+
+    Attributes:
+        manager: The pump-mode NetworkManager being driven.
+    """
+
+    def __init__(self, widget: Any, manager: NetworkManager,
+                 busy_ms: int = 1, idle_ms: int = 20) -> None:
+        """Create a pump; call start() to begin polling.
+
+        Args:
+            widget: Any Tk widget, used for after()/after_cancel()
+            manager: NetworkManager created with threaded=False
+            busy_ms: Poll interval right after traffic was seen
+            idle_ms: Poll interval when nothing arrived
+        """
+        if manager.threaded:
+            raise ValueError("TkNetworkPump needs a NetworkManager with threaded=False")
+        self.widget = widget
+        self.manager = manager
+        self.busy_ms = busy_ms
+        self.idle_ms = idle_ms
+        self._after_id: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a poll is scheduled."""
+        return self._after_id is not None
+
+    def start(self) -> None:
+        """Begin polling (no-op if already running)."""
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.idle_ms, self._tick)
+
+    def stop(self) -> None:
+        """Cancel the scheduled poll."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self) -> None:
+        """Schedule the next poll, then pump once.
+
+        The next poll is scheduled before pumping: a callback that opens a
+        modal dialog runs a nested event loop, which must keep pumping or
+        heartbeats stop for as long as the dialog is open, and a callback
+        that raises must not end the polling.
+        """
+        self._after_id = self.widget.after(self.idle_ms, self._tick)
+        delivered = self.manager.pump()
+        if self._after_id is None:
+            return  # stopped by a callback
+        if not self.manager.running and not self.manager.connected:
+            self.stop()
+        elif delivered:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = self.widget.after(self.busy_ms, self._tick)
@@ -0,0 +1,102 @@
+"""In-memory transport for connecting NetworkManagers without sockets.
+
+NetworkManager normally talks TCP. Given a transport instead (see
+`NetworkManager.connect_transport`), it hands each encoded message to
+`send()` and takes incoming payloads from `recv()` (on a receive thread
+in threaded mode) or `poll()` (from `pump()`). Everything above the
+bytes - decoding, rate limits, metrics and callbacks - is shared with
+the TCP path, so a loopback pair behaves like a real connection minus
+the socket stack, heartbeats and session resume.
+"""
+
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Tuple, Union
+
+Payload = Union[bytes, memoryview]
+
+
+class LoopbackTransport:
+    """One end of an in-memory connection. Thread-safe.
+    
+    Each end owns a queue of payloads sent by its peer. Closing either
+    end closes both; like TCP, payloads already sent are still delivered
+    before the peer sees the close.
+    
+    Attributes:
+        peer: The other end.
+        sent: Payloads sent from this end.
+    """
+    
+    def __init__(self) -> None:
+        """Create an unconnected end; use `pair()` to get a connected pair."""
+        self.peer: Optional['LoopbackTransport'] = None
+        self.sent = 0
+        self._queue: Deque[Payload] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        
+    @classmethod
+    def pair(cls) -> Tuple['LoopbackTransport', 'LoopbackTransport']:
+        """Return two ends connected to each other."""
+        a, b = cls(), cls()
+        a.peer, b.peer = b, a
+        return a, b
+        
+    def send(self, payload: Payload) -> bool:
+        """Queue one message payload for the peer.
+        
+        Returns:
+            False if the connection is closed.
+        """
+        peer = self.peer
+        if peer is None or self._closed:
+            return False
+        with peer._cond:
+            if peer._closed:
+                return False
+            peer._queue.append(payload)
+            peer._cond.notify()
+        self.sent += 1
+        return True
+        
+    def recv(self, timeout: Optional[float] = None) -> Optional[Payload]:
+        """Wait for the next payload.
+        
+        Args:
+            timeout: Longest to wait (None = until something arrives).
+            
+        Returns:
+            The payload, b'' on timeout, or None once closed and drained.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self._closed, timeout)
+            if self._queue:
+                return self._queue.popleft()
+            return None if self._closed else b''
+            
+    def poll(self, timeout: float = 0.0) -> List[Payload]:
+        """Take every queued payload, waiting up to `timeout` if there are none."""
+        with self._cond:
+            if not self._queue and timeout > 0:
+                self._cond.wait_for(lambda: self._queue or self._closed, timeout)
+            items = list(self._queue)
+            self._queue.clear()
+            return items
+            
+    @property
+    def closed(self) -> bool:
+        """Whether the connection is closed and every payload has been received."""
+        return self._closed and not self._queue
+        
+    def close(self) -> None:
+        """Close both ends."""
+        for end in (self, self.peer):
+            if end is None:
+                continue
+            with end._cond:
+                end._closed = True
+                if end is self:
+                    # Our own unread payloads are discarded, as a closed socket would
+                    end._queue.clear()
+                end._cond.notify_all()
@@ -0,0 +1,2 @@
+# Bulk game simulations
+from .solver import play_game, simulate_range
@@ -0,0 +1,423 @@
+"""Coordinator and workers for simulations spread over many processes.
+
+A Coordinator owns a range of game seeds and splits it into chunks.
+Workers, on this machine or others, connect over TCP, lease a chunk,
+play its games (see solver.py) and report a histogram of tries every
+`report_every` games. Each report covers the seeds from where the lease
+stood up to a new position, so the coordinator merges every game once.
+When a worker's connection drops, or its lease goes `lease_timeout`
+seconds without a report (a hung or unreachable node), the seeds it had
+not reported go back in the queue for another worker. Seeds alone decide
+a game's outcome, so the final histogram does not depend on how many
+workers took part or which of them failed.
+
+The wire format is one JSON object per line, one request at a time per
+connection:
+
+    {"op": "lease", "worker": "host-1234"}
+        -> {"lease": 7, "start": 1000, "stop": 1500, "digit_count": 4}
+        or {"wait": 0.2} (everything is leased; ask again)
+        or {"done": true}
+    {"op": "report", "lease": 7, "stop": 1050, "histogram": {"5": 21, ...}}
+        -> {"ok": true}, or {"ok": false} if the lease was taken back
+
+Run a coordinator, then workers anywhere that can reach it:
+
+    python -m numbers_game.sim.distributed coordinate --games 100000 --host 0.0.0.0
+    python -m numbers_game.sim.distributed work --connect coordinator-host:5557
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from numbers_game.core import DEFAULT_DIGIT_COUNT
+from numbers_game.core.leaderboard_service import parse_address
+from .solver import Histogram, merge_histograms, simulate_range
+
+DEFAULT_PORT = 5557
+
+# Longest request line accepted from a worker
+MAX_REQUEST_SIZE = 1 << 16
+
+
+@dataclass
+class _Lease:
+    """A chunk of seeds handed to one worker.
+    
+    Attributes:
+        lease_id: Identifies the lease in reports.
+        worker: Name the worker gave.
+        conn: Connection the lease was handed out on.
+        next: First seed not reported yet.
+        stop: One past the last seed of the chunk.
+        deadline: time.monotonic() by which the next report is due.
+    """
+    lease_id: int
+    worker: str
+    conn: int
+    next: int
+    stop: int
+    deadline: float
+
+
+class Coordinator:
+    """Hands out seed ranges to workers and merges their histograms.
+    
+    Attributes:
+        games: Games to simulate.
+        digit_count: Digits per game.
+        histogram: Tries -> games, for the games reported so far.
+        games_done: Games reported so far.
+        leases: Leases handed out.
+        reassigned: Ranges put back after their worker disconnected.
+        expired: Ranges put back after their worker stopped reporting.
+        rejected: Reports refused because their lease was taken back.
+    """
+    
+    def __init__(
+        self,
+        games: int,
+        digit_count: int = DEFAULT_DIGIT_COUNT,
+        host: str = '127.0.0.1',
+        port: int = DEFAULT_PORT,
+        chunk_size: int = 500,
+        lease_timeout: float = 30.0,
+        first_seed: int = 0
+    ) -> None:
+        """Prepare the work; call start() to begin serving.
+        
+        Args:
+            games: Games to simulate (seeds first_seed..first_seed+games-1).
+            digit_count: Digits per game.
+            host: Interface to listen on ('0.0.0.0' for workers on other machines).
+            port: Port to listen on (0 picks a free port).
+            chunk_size: Seeds per lease.
+            lease_timeout: Seconds a lease may go without a report.
+            first_seed: First seed of the range.
+        """
+        self.games = games
+        self.digit_count = digit_count
+        self.host = host
+        self.port = port
+        self.lease_timeout = lease_timeout
+        self.histogram: Histogram = {}
+        self.games_done = 0
+        self.leases = 0
+        self.reassigned = 0
+        self.expired = 0
+        self.rejected = 0
+        self._pending: Deque[Tuple[int, int]] = deque(
+            (start, min(start + chunk_size, first_seed + games))
+            for start in range(first_seed, first_seed + games, chunk_size)
+        )
+        self._leases: Dict[int, _Lease] = {}
+        self._lease_ids = itertools.count(1)
+        self._conn_ids = itertools.count(1)
+        self._workers = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if not self._pending:
+            self._done.set()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        
+    def start(self) -> Tuple[str, int]:
+        """Start serving on a background thread.
+        
+        Returns:
+            The (host, port) actually bound.
+        """
+        coordinator = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                coordinator._serve_connection(self.rfile, self.wfile)
+                
+        server = socketserver.ThreadingTCPServer((self.host, self.port), Handler, bind_and_activate=False)
+        server.daemon_threads = True
+        server.allow_reuse_address = True
+        server.server_bind()
+        server.server_activate()
+        self._server = server
+        self.host, self.port = server.server_address[:2]
+        self._thread = threading.Thread(target=server.serve_forever, name='SimCoordinator', daemon=True)
+        self._thread.start()
+        return self.host, self.port
+        
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every game is reported; False on timeout."""
+        return self._done.wait(timeout)
+        
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+            
+    def stats(self) -> Dict[str, int]:
+        """Return the coordinator counters."""
+        with self._lock:
+            return {
+                'games': self.games,
+                'games_done': self.games_done,
+                'workers': self._workers,
+                'leases': self.leases,
+                'outstanding': len(self._leases),
+                'pending': len(self._pending),
+                'reassigned': self.reassigned,
+                'expired': self.expired,
+                'rejected': self.rejected,
+            }
+            
+    # ---- requests ----
+    
+    def _serve_connection(self, rfile, wfile) -> None:
+        """Answer one worker's requests until it disconnects."""
+        conn = next(self._conn_ids)
+        with self._lock:
+            self._workers += 1
+        try:
+            while True:
+                line = rfile.readline(MAX_REQUEST_SIZE + 1)
+                if not line or len(line) > MAX_REQUEST_SIZE:
+                    return
+                try:
+                    response = self._handle(conn, json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {'error': f"bad request: {e!r}"}
+                wfile.write(json.dumps(response, separators=(',', ':')).encode('utf-8') + b'\n')
+                wfile.flush()
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._workers -= 1
+                for lease in [held for held in self._leases.values() if held.conn == conn]:
+                    self._take_back(lease)
+                    self.reassigned += 1
+                    
+    def _handle(self, conn: int, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request."""
+        op = request['op']
+        with self._lock:
+            if op == 'lease':
+                return self._lease(conn, str(request.get('worker', conn)))
+            if op == 'report':
+                return {'ok': self._report(int(request['lease']), int(request['stop']), request['histogram'])}
+        raise ValueError(f"unknown operation {op!r}")
+        
+    def _lease(self, conn: int, worker: str) -> Dict[str, Any]:
+        """Hand out the next range; the lock is held."""
+        now = time.monotonic()
+        for lease in [held for held in self._leases.values() if held.deadline < now]:
+            self._take_back(lease)
+            self.expired += 1
+        if not self._pending:
+            if self._leases:
+                return {'wait': min(0.2, self.lease_timeout)}
+            return {'done': True}
+        start, stop = self._pending.popleft()
+        lease = _Lease(next(self._lease_ids), worker, conn, start, stop, now + self.lease_timeout)
+        self._leases[lease.lease_id] = lease
+        self.leases += 1
+        return {'lease': lease.lease_id, 'start': start, 'stop': stop, 'digit_count': self.digit_count}
+        
+    def _report(self, lease_id: int, stop: int, histogram: Dict[str, int]) -> bool:
+        """Merge a report for the seeds a lease has not reported yet; the lock is held."""
+        lease = self._leases.get(lease_id)
+        if lease is None:
+            self.rejected += 1
+            return False
+        if not lease.next < stop <= lease.stop or sum(histogram.values()) != stop - lease.next:
+            raise ValueError(f"report does not match lease {lease_id}")
+        merge_histograms(self.histogram, histogram)
+        self.games_done += stop - lease.next
+        lease.next = stop
+        lease.deadline = time.monotonic() + self.lease_timeout
+        if lease.next == lease.stop:
+            del self._leases[lease_id]
+            if not self._leases and not self._pending:
+                self._done.set()
+        return True
+        
+    def _take_back(self, lease: _Lease) -> None:
+        """Return a lease's unreported seeds to the front of the queue; the lock is held."""
+        del self._leases[lease.lease_id]
+        self._pending.appendleft((lease.next, lease.stop))
+
+
+def run_worker(
+    host: str = '127.0.0.1',
+    port: int = DEFAULT_PORT,
+    name: Optional[str] = None,
+    report_every: int = 50,
+    connect_timeout: float = 10.0
+) -> int:
+    """Simulate leased ranges for a coordinator until it has no more work.
+    
+    Args:
+        host: Coordinator address.
+        port: Coordinator port.
+        name: Name to report under (host name and process id by default).
+        report_every: Games per report; a failed worker loses at most this many.
+        connect_timeout: Seconds to keep trying to reach the coordinator.
+        
+    Returns:
+        Games this worker simulated and had accepted.
+    """
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection((host, port), connect_timeout)
+            break
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+    sock.settimeout(None)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    
+    accepted = 0
+    with sock, sock.makefile('rb') as rfile:
+        def call(request: Dict[str, Any]) -> Dict[str, Any]:
+            sock.sendall(json.dumps(request, separators=(',', ':')).encode('utf-8') + b'\n')
+            reply = rfile.readline()
+            if not reply:
+                raise ConnectionError("coordinator closed the connection")
+            return json.loads(reply)
+            
+        try:
+            while True:
+                reply = call({'op': 'lease', 'worker': name})
+                if reply.get('done'):
+                    return accepted
+                if 'wait' in reply:
+                    time.sleep(reply['wait'])
+                    continue
+                lease, digit_count = reply['lease'], reply['digit_count']
+                for start in range(reply['start'], reply['stop'], report_every):
+                    stop = min(start + report_every, reply['stop'])
+                    histogram = simulate_range(start, stop, digit_count)
+                    if not call({'op': 'report', 'lease': lease, 'stop': stop, 'histogram': histogram})['ok']:
+                        break  # the range was given to someone else
+                    accepted += stop - start
+        except (ConnectionError, BrokenPipeError):
+            # The coordinator finished or went away
+            return accepted
+
+
+def run_local(
+    games: int,
+    digit_count: int = DEFAULT_DIGIT_COUNT,
+    workers: int = 0,
+    chunk_size: int = 500,
+    report_every: int = 50
+) -> Histogram:
+    """Simulate games with a coordinator and worker processes on this machine.
+    
+    Args:
+        games: Games to simulate.
+        digit_count: Digits per game.
+        workers: Worker processes (one per CPU if 0).
+        chunk_size: Seeds per lease.
+        report_every: Games per worker report.
+        
+    Returns:
+        The tries histogram.
+        
+    Raises:
+        RuntimeError: If every worker process exited before the work was done.
+    """
+    coordinator = Coordinator(games, digit_count, port=0, chunk_size=chunk_size)
+    host, port = coordinator.start()
+    procs = [
+        multiprocessing.Process(target=run_worker, args=(host, port, None, report_every), daemon=True)
+        for _ in range(workers or os.cpu_count() or 1)
+    ]
+    try:
+        for p in procs:
+            p.start()
+        while not coordinator.wait(0.5):
+            if not any(p.is_alive() for p in procs):
+                raise RuntimeError("all simulation workers exited before finishing")
+    finally:
+        for p in procs:
+            p.join(timeout=5.0)
+        coordinator.stop()
+    return coordinator.histogram
+
+
+def format_histogram(histogram: Histogram) -> str:
+    """Format a tries histogram as a table with the mean."""
+    total = sum(histogram.values())
+    if not total:
+        return "No games played."
+    lines = [f"{'Tries':<7}{'Games':>10}{'Share':>9}"]
+    for tries in sorted(histogram):
+        lines.append(f"{tries:<7}{histogram[tries]:>10}{histogram[tries] / total:>9.1%}")
+    mean = sum(t * n for t, n in histogram.items()) / total
+    lines.append(f"{total} games, {mean:.3f} tries on average")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run a coordinator or a worker from the command line."""
+    parser = argparse.ArgumentParser(description="Distributed Numbers Game simulation")
+    commands = parser.add_subparsers(dest='command', required=True)
+    coordinate = commands.add_parser('coordinate', help="hand out seeds and collect results")
+    coordinate.add_argument('--games', type=int, default=10000)
+    coordinate.add_argument('--digits', type=int, default=DEFAULT_DIGIT_COUNT, choices=(4, 5, 6))
+    coordinate.add_argument('--host', default='127.0.0.1')
+    coordinate.add_argument('--port', type=int, default=DEFAULT_PORT)
+    coordinate.add_argument('--chunk', type=int, default=500, help="seeds per lease")
+    coordinate.add_argument('--lease-timeout', type=float, default=30.0)
+    coordinate.add_argument('--workers', type=int, default=0, help="local worker processes to start too")
+    work = commands.add_parser('work', help="simulate games for a coordinator")
+    work.add_argument('--connect', default=f'127.0.0.1:{DEFAULT_PORT}', help="coordinator host:port")
+    work.add_argument('--report-every', type=int, default=50)
+    args = parser.parse_args(argv)
+    
+    if args.command == 'work':
+        host, port = parse_address(args.connect)
+        print(f"Simulated {run_worker(host, port, report_every=args.report_every)} games")
+        return
+        
+    coordinator = Coordinator(
+        args.games, args.digits, args.host, args.port, args.chunk, args.lease_timeout
+    )
+    host, port = coordinator.start()
+    print(f"Coordinator for {args.games} games on {host}:{port}")
+    procs = [
+        multiprocessing.Process(target=run_worker, args=('127.0.0.1', port), daemon=True)
+        for _ in range(args.workers)
+    ]
+    for p in procs:
+        p.start()
+    start = time.perf_counter()
+    try:
+        coordinator.wait()
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - start
+    coordinator.stop()
+    print(format_histogram(coordinator.histogram))
+    stats = coordinator.stats()
+    print(f"{stats['games_done'] / elapsed:.0f} games/s, {stats['leases']} leases, "
+          f"{stats['reassigned'] + stats['expired']} reassigned")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Seeded self-play for bulk game simulations.
+
+Each game is identified by a seed alone: the seed picks the secret and
+drives the solver's choices, so a game plays out the same in any process
+on any machine. That is what lets a range of seeds be split up, handed
+out, and handed out again after a failure without changing the result.
+"""
+
+import itertools
+import random
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from numbers_game.core import DEFAULT_DIGIT_COUNT, GameEngine
+
+# Tries -> number of games that took that many
+Histogram = Dict[int, int]
+
+
+@lru_cache(maxsize=None)
+def all_secrets(digit_count: int) -> Tuple[str, ...]:
+    """Every valid secret: distinct digits, no leading zero."""
+    return tuple(
+        ''.join(p) for p in itertools.permutations('0123456789', digit_count) if p[0] != '0'
+    )
+
+
+def play_game(seed: int, digit_count: int = DEFAULT_DIGIT_COUNT) -> int:
+    """Play one game and return the tries the solver needed.
+    
+    The solver guesses a random number that is consistent with every
+    reply so far, which always finds the secret.
+    
+    Args:
+        seed: Selects the secret and the solver's guesses.
+        digit_count: Digits in the secret.
+        
+    Returns:
+        Number of guesses, including the winning one.
+    """
+    rng = random.Random(seed)
+    candidates = all_secrets(digit_count)
+    engine = GameEngine(digit_count)
+    engine.num = int(rng.choice(candidates))
+    tries = 0
+    while True:
+        guess = rng.choice(candidates)
+        tries += 1
+        reply = engine.compare(int(guess))
+        if reply[1] == digit_count:
+            return tries
+        # Digits are distinct, so the count is the size of the digit overlap
+        count, place = reply
+        overlap = set(guess).intersection
+        candidates = [
+            c for c in candidates
+            if len(overlap(c)) == count and sum(map(str.__eq__, c, guess)) == place
+        ]
+
+
+def simulate_range(start: int, stop: int, digit_count: int = DEFAULT_DIGIT_COUNT) -> Histogram:
+    """Play the games for seeds start..stop-1 and histogram their tries."""
+    return dict(Counter(play_game(seed, digit_count) for seed in range(start, stop)))
+
+
+def merge_histograms(total: Histogram, part: Histogram) -> None:
+    """Add one histogram into another, in place."""
+    for tries, games in part.items():
+        total[int(tries)] = total.get(int(tries), 0) + games
@@ -4,7 +4,10 @@ A number guessing game where players try to guess a randomly generated number
 with no duplicate digits and not starting with zero.
 """
 
+import argparse
+
 from numbers_game.core import GameEngine, DEFAULT_DIGIT_COUNT
+from numbers_game.core.high_scores import SCORES_FILE, rebuild_player_stats
 from numbers_game.utils import get_help_string
 
 
@@ -95,6 +98,18 @@ def play_game() -> None:
 
 def main() -> None:
     """Entry point for CLI."""
+    parser = argparse.ArgumentParser(description="Numbers Discovery Game")
+    parser.add_argument(
+        '--rebuild-stats', action='store_true',
+        help="Rebuild player statistics from the game history log and exit"
+    )
+    parser.add_argument('--scores', default=SCORES_FILE, help="Path to the high scores file")
+    args = parser.parse_args()
+    
+    if args.rebuild_stats:
+        count = rebuild_player_stats(args.scores)
+        print(f"Rebuilt statistics for {count} players")
+        return
     play_game()
 
 
@@ -60,6 +60,13 @@ class TestCheckInput:
         assert is_valid is False
         assert "numbers" in msg.lower()
         
+    def test_non_ascii_digits(self):
+        """Test rejection of Unicode digits that int() cannot parse."""
+        game = GameEngine()
+        is_valid, msg = game.check_input("1\u00b2345")
+        assert is_valid is False
+        assert "numbers" in msg.lower()
+        
     def test_leading_zero(self):
         """Test rejection of leading zero."""
         game = GameEngine()
@@ -0,0 +1,682 @@
+"""Unit tests for the high scores module."""
+
+import json
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numbers_game.core.high_scores import (
+    LeaderboardIndex, ScoreEntry, add_score, add_scores, display_leaderboard,
+    get_leaderboard_page, get_player_rank, load_scores, save_scores
+)
+from numbers_game.core.score_format import MAGIC, ScoreFormatError, decode_scores, encode_scores
+from numbers_game.core.score_writer import ScoreWriter
+from numbers_game.core.player_stats import SNAPSHOT_EVERY, PlayerStatsStore, stats_path
+from numbers_game.core.high_scores import rebuild_player_stats, record_loss, stop_using_service, use_service
+from numbers_game.core.high_scores import _retention_from_env
+from numbers_game.core.ratings import DRAW, LOSS, WIN, RatingStore, ratings_path
+from numbers_game.core.leaderboard_service import (
+    LeaderboardClient, LeaderboardFeed, LeaderboardService, LeaderboardServiceError, apply_delta
+)
+
+
+@pytest.fixture
+def scores_file(tmp_path):
+    """Path to a fresh scores file."""
+    return str(tmp_path / 'high_scores.dat')
+
+
+def _entry(name: str, score: int, tries: int = 5, difficulty: int = 4) -> dict:
+    """Build a score entry dict."""
+    return {
+        'player_name': name, 'tries': tries, 'hints_used': 0,
+        'score': score, 'difficulty': difficulty, 'date': '2024-01-01 12:00'
+    }
+
+
+class TestAddScores:
+    """Tests for bulk score ingestion."""
+    
+    def test_ranks_in_input_order(self, scores_file):
+        """Test ranks are returned per entry in input order."""
+        ranks = add_scores([_entry('a', 50), _entry('b', 90), _entry('c', 70)], scores_file)
+        assert ranks == [3, 1, 2]
+        
+    def test_trims_to_limit(self, scores_file):
+        """Test entries falling off the board get no rank."""
+        ranks = add_scores((_entry(f'p{i}', i) for i in range(25)), scores_file)
+        assert ranks[:15] == [None] * 15
+        assert ranks[24] == 1
+        board = load_scores(scores_file)['4']
+        assert [e['score'] for e in board] == list(range(24, 14, -1))
+        
+    def test_merges_with_existing_scores(self, scores_file):
+        """Test bulk import merges with scores already on disk."""
+        add_score('old', 5, 0, 80, 4, filepath=scores_file)
+        ranks = add_scores([_entry('new', 80), _entry('hard', 60, difficulty=6)], scores_file)
+        assert ranks == [1, 1]  # 'new' ties with 'old'
+        scores = load_scores(scores_file)
+        assert [e['player_name'] for e in scores['4']] == ['old', 'new']
+        assert scores['6'][0]['player_name'] == 'hard'
+        
+    def test_tries_break_ties(self, scores_file):
+        """Test fewer tries ranks higher for equal scores."""
+        ranks = add_scores([_entry('slow', 80, tries=9), _entry('fast', 80, tries=3)], scores_file)
+        assert ranks == [2, 1]
+        
+    def test_accepts_score_entries(self, scores_file):
+        """Test ScoreEntry objects are accepted."""
+        entry = ScoreEntry('dc', 4, 1, 90, 5, '2024-01-01 12:00')
+        assert add_scores([entry], scores_file) == [1]
+        assert load_scores(scores_file)['5'][0]['player_name'] == 'dc'
+        
+    def test_matches_repeated_add_score(self, tmp_path):
+        """Test bulk import produces the same board as one-by-one adds."""
+        single = str(tmp_path / 'single.json')
+        bulk = str(tmp_path / 'bulk.json')
+        entries = [_entry(f'p{i}', (i * 37) % 100, tries=i % 7) for i in range(30)]
+        for e in entries:
+            add_score(e['player_name'], e['tries'], 0, e['score'], 4, filepath=single)
+        add_scores(entries, bulk)
+        names = lambda path: [e['player_name'] for e in load_scores(path)['4']]
+        assert names(single) == names(bulk)
+        
+    def test_retention_from_env(self, monkeypatch):
+        """Test the default retention limit is read from the environment."""
+        monkeypatch.setenv('NUMBERS_GAME_MAX_SCORES', '50')
+        assert _retention_from_env() == 50
+        monkeypatch.setenv('NUMBERS_GAME_MAX_SCORES', 'lots')
+        assert _retention_from_env() == 10
+        monkeypatch.delenv('NUMBERS_GAME_MAX_SCORES')
+        assert _retention_from_env() == 10
+        
+    def test_no_temp_files_left(self, scores_file, tmp_path):
+        """Test the durable write leaves only the scores file and game history."""
+        add_scores([_entry('a', 10)], scores_file)
+        assert sorted(os.listdir(tmp_path)) == ['high_scores.dat', 'high_scores_stats.log']
+
+
+class TestScoreWriter:
+    """Tests for the background score writer."""
+    
+    def test_ranks_delivered(self, scores_file):
+        """Test each submitted score gets its rank back."""
+        ranks = {}
+        writer = ScoreWriter(scores_file)
+        writer.submit('a', 5, 0, 70, 4, on_rank=lambda r: ranks.__setitem__('a', r))
+        writer.submit('b', 5, 0, 90, 4, on_rank=lambda r: ranks.__setitem__('b', r))
+        writer.close()
+        assert ranks == {'a': 2, 'b': 1}
+        assert len(load_scores(scores_file)['4']) == 2
+        
+    def test_dispatch_used_for_callbacks(self, scores_file):
+        """Test rank callbacks go through the dispatcher."""
+        dispatched = []
+        writer = ScoreWriter(scores_file, dispatch=dispatched.append)
+        writer.submit('a', 5, 0, 70, 4, on_rank=lambda r: None)
+        writer.flush()
+        assert len(dispatched) == 1
+        writer.close()
+        
+    def test_close_flushes_and_rejects(self, scores_file):
+        """Test close writes pending scores and refuses new ones."""
+        writer = ScoreWriter(scores_file)
+        for i in range(20):
+            writer.submit(f'p{i}', 5, 0, i, 5)
+        writer.close()
+        assert len(load_scores(scores_file)['5']) == 10
+        assert writer.submit('late', 5, 0, 99, 5) is False
+        
+    def test_retention_limit(self, scores_file):
+        """Test the writer keeps as many scores as it is configured to."""
+        writer = ScoreWriter(scores_file, limit=15)
+        for i in range(20):
+            writer.submit(f'p{i}', 5, 0, i, 5)
+        writer.close()
+        assert len(load_scores(scores_file)['5']) == 15
+        
+    def test_metrics(self, scores_file):
+        """Test queue depth and latency metrics are reported."""
+        writer = ScoreWriter(scores_file)
+        writer.submit('a', 5, 0, 70, 4)
+        writer.flush()
+        stats = writer.stats()
+        assert stats['queue_depth'] == 0
+        assert stats['entries_written'] == 1
+        assert stats['batches_written'] >= 1
+        assert stats['max_write_latency'] >= stats['avg_write_latency'] > 0
+        writer.close()
+        
+    def test_losses_logged_for_stats(self, scores_file):
+        """Test a submitted loss counts in stats without touching the board."""
+        writer = ScoreWriter(scores_file)
+        writer.submit('a', 5, 0, 70, 4)
+        writer.submit_loss('a', 12, 3)
+        writer.close()
+        stats = PlayerStatsStore(stats_path(scores_file)).get('a')
+        assert (stats.games, stats.wins, stats.current_streak) == (2, 1, 0)
+        assert len(load_scores(scores_file)['4']) == 1
+        
+    def test_failed_batch_keeps_writer_alive(self, scores_file):
+        """Test a batch that raises reports None and later scores still save."""
+        ranks = []
+        writer = ScoreWriter(scores_file)
+        writer.submit('bad', 5, 0, 1, 300, on_rank=ranks.append)  # no such board width
+        writer.flush()
+        writer.submit('a', 5, 0, 70, 4, on_rank=ranks.append)
+        writer.close()
+        assert ranks == [None, 1]
+        assert writer.stats()['write_errors'] == 1
+        assert 'ScoreFormatError' in writer.last_error
+        assert not writer._thread.is_alive()
+        
+    def test_submit_racing_close(self, scores_file):
+        """Test scores accepted while closing are all written."""
+        for _ in range(20):
+            writer = ScoreWriter(scores_file, max_queue=4)
+            accepted = []
+            
+            def submitter():
+                while writer.submit('p', 5, 0, 50, 4):
+                    accepted.append(1)
+                    
+            thread = threading.Thread(target=submitter)
+            thread.start()
+            writer.close()
+            thread.join(5)
+            assert not thread.is_alive()
+            assert writer._queue.unfinished_tasks == 0
+            assert writer.entries_written == len(accepted)
+
+
+class TestLeaderboardIndex:
+    """Tests for paginated leaderboard queries and rank lookups."""
+    
+    @pytest.fixture
+    def big_board(self, scores_file):
+        """A 1000-entry board where p<i> has score 1000 - i."""
+        add_scores((_entry(f'p{i}', 1000 - i) for i in range(1000)), scores_file, limit=1000)
+        return scores_file
+        
+    def test_page_range(self, big_board):
+        """Test fetching ranks 500-520."""
+        page = get_leaderboard_page(4, start_rank=500, count=21, filepath=big_board)
+        assert [e['player_name'] for e in page] == [f'p{i}' for i in range(499, 520)]
+        
+    def test_page_past_end(self, big_board):
+        """Test a page past the end is empty."""
+        assert get_leaderboard_page(4, start_rank=1001, filepath=big_board) == []
+        
+    def test_player_rank(self, big_board):
+        """Test rank-of-player lookup."""
+        assert get_player_rank('p0', 4, big_board) == 1
+        assert get_player_rank('p737', 4, big_board) == 738
+        assert get_player_rank('nobody', 4, big_board) is None
+        
+    def test_index_refreshes_after_write(self, big_board):
+        """Test the cached index sees new scores."""
+        assert get_player_rank('late', 4, big_board) is None
+        add_score('late', 1, 0, 5000, 4, filepath=big_board, limit=2000)
+        assert get_player_rank('late', 4, big_board) == 1
+        
+    def test_player_rank_uses_best_entry(self):
+        """Test a player with several entries is ranked by the best one."""
+        index = LeaderboardIndex([_entry('a', 10), _entry('b', 50), _entry('a', 70)])
+        assert index.rank_of_player('a') == 1
+        assert index.rank_of_player('b') == 2
+        
+    def test_insert_keeps_order(self):
+        """Test incremental insertion keeps the index sorted."""
+        index = LeaderboardIndex([_entry('a', 10), _entry('b', 50)])
+        assert index.insert(_entry('c', 30)) == 2
+        assert index.insert(_entry('d', 50)) == 1
+        assert [e['player_name'] for e in index.page()] == ['b', 'd', 'c', 'a']
+        assert index.rank_of_score(40, 5) == 3
+        
+    def test_ties_share_a_rank(self, scores_file):
+        """Test every query numbers tied entries the same way."""
+        ranks = add_scores([_entry('a', 90), _entry('b', 80), _entry('c', 80), _entry('d', 70)], scores_file)
+        assert ranks == [1, 2, 2, 4]
+        assert add_score('e', 5, 0, 80, 4, filepath=scores_file) == 2
+        index = LeaderboardIndex(load_scores(scores_file)['4'])
+        assert [rank for rank, _ in index.iter_range()] == [1, 2, 2, 2, 5]
+        assert [rank for rank, _ in index.iter_range(3, 2)] == [2, 2]
+        assert index.rank_of_player('c') == 2
+        rows = display_leaderboard(4, scores_file, start_rank=3, count=2).split('\n📊')[0].splitlines()
+        assert 'ranks 2-2 of 5' in rows[1]
+        assert [row.split()[0] for row in rows[-2:]] == ['2', '2']
+        
+    def test_rank_of_score_that_missed_board(self, scores_file):
+        """Test add_score ranks a score that fell off a full board."""
+        add_scores([_entry(f'p{i}', 100 + i) for i in range(3)], scores_file, limit=3)
+        assert add_score('late', 5, 0, 50, 4, filepath=scores_file, limit=3) == 4
+        assert len(load_scores(scores_file)['4']) == 3
+        
+    def test_display_page(self, big_board):
+        """Test the text renderer shows only the requested page."""
+        text = display_leaderboard(4, big_board, start_rank=500, count=3)
+        assert 'ranks 500-502 of 1000' in text
+        rows = text.split('\n📊')[0].splitlines()[-3:]
+        assert [row.split()[:2] for row in rows] == [['500', 'p499'], ['501', 'p500'], ['502', 'p501']]
+
+
+class TestPlayerStats:
+    """Tests for incrementally maintained player statistics."""
+    
+    def test_add_score_updates_stats(self, scores_file):
+        """Test every add_score folds into the player's aggregates."""
+        add_score('amy', 4, 1, 90, 4, filepath=scores_file)
+        add_score('amy', 6, 0, 80, 5, filepath=scores_file)
+        stats = PlayerStatsStore(stats_path(scores_file)).get('amy')
+        assert (stats.games, stats.wins, stats.best_score, stats.current_streak) == (2, 2, 90, 2)
+        assert stats.avg_tries == 5.0
+        assert stats.avg_hints == 0.5
+        
+    def test_stats_include_entries_off_the_board(self, scores_file):
+        """Test bulk imports count games that did not make the leaderboard."""
+        add_scores((_entry('bob', i) for i in range(30)), scores_file)
+        assert PlayerStatsStore(stats_path(scores_file)).get('bob').games == 30
+        
+    def test_loss_resets_streak(self):
+        """Test a lost game ends the win streak."""
+        store = PlayerStatsStore()
+        store.record_game('cy', True, 5, 0, 80)
+        store.record_game('cy', False, 12, 2)
+        stats = store.get('cy')
+        assert (stats.games, stats.wins, stats.current_streak) == (2, 1, 0)
+        
+    def test_rebuild_from_history(self, scores_file):
+        """Test stats are rebuilt from every game, not just the kept scores."""
+        add_scores([_entry('a', i) for i in range(15)] + [_entry('b', 60)], scores_file)
+        record_loss('a', 9, 1, filepath=scores_file)
+        with open(stats_path(scores_file), 'w') as f:
+            f.write('{"offset": 0, "players": {"a": [1, 1, 1, 1, 1, 1]}}')
+        assert rebuild_player_stats(scores_file) == 2
+        stats = PlayerStatsStore(stats_path(scores_file)).get('a')
+        assert (stats.games, stats.wins, stats.best_score, stats.current_streak) == (16, 15, 14, 0)
+        
+    def test_corrupt_snapshot_replays_history(self, scores_file):
+        """Test a damaged snapshot is recovered from the history log on open."""
+        add_score('a', 5, 0, 50, 4, filepath=scores_file)
+        add_score('a', 5, 0, 60, 4, filepath=scores_file)
+        with open(stats_path(scores_file), 'w') as f:
+            f.write('{"offs')
+        assert PlayerStatsStore(stats_path(scores_file)).get('a').games == 2
+        
+    def test_losses_recorded(self, scores_file):
+        """Test games that were not won count as games and end the streak."""
+        add_score('ed', 5, 0, 80, 4, filepath=scores_file)
+        record_loss('ed', 11, 2, filepath=scores_file)
+        add_score('ed', 7, 0, 70, 4, filepath=scores_file)
+        stats = PlayerStatsStore(stats_path(scores_file)).get('ed')
+        assert (stats.games, stats.wins, stats.current_streak, stats.best_score) == (3, 2, 1, 80)
+        assert stats.avg_tries == 23 / 3
+        
+    def test_recording_appends_only(self, scores_file):
+        """Test adding scores appends to the history and leaves the snapshot alone."""
+        store = PlayerStatsStore(stats_path(scores_file))
+        for i in range(SNAPSHOT_EVERY):
+            store.record_game('f', True, 5, 0, i)
+        store.save()
+        with open(stats_path(scores_file), 'rb') as f:
+            snapshot = f.read()
+        log_size = os.path.getsize(store.history_filepath)
+        add_score('f', 5, 0, 99, 4, filepath=scores_file)
+        record_loss('f', 5, 0, filepath=scores_file)
+        with open(stats_path(scores_file), 'rb') as f:
+            assert f.read() == snapshot
+        assert os.path.getsize(store.history_filepath) > log_size
+        store.save()  # folds in the two games logged by others
+        assert store.get('f').games == SNAPSHOT_EVERY + 2
+        assert PlayerStatsStore(stats_path(scores_file)).get('f').games == SNAPSHOT_EVERY + 2
+        
+    def test_partial_log_line_skipped(self, scores_file):
+        """Test a line cut short by a crash neither counts nor swallows the next game."""
+        add_score('g', 5, 0, 50, 4, filepath=scores_file)
+        with open(PlayerStatsStore(stats_path(scores_file)).history_filepath, 'ab') as f:
+            f.write(b'["g",1,5')
+        assert PlayerStatsStore(stats_path(scores_file)).get('g').games == 1
+        add_score('g', 5, 0, 60, 4, filepath=scores_file)
+        assert PlayerStatsStore(stats_path(scores_file)).get('g').games == 2
+        
+    def test_badly_typed_log_line_skipped(self, scores_file):
+        """Test a well-formed line with wrong field types is skipped like a cut one."""
+        add_score('h', 5, 0, 50, 4, filepath=scores_file)
+        with open(PlayerStatsStore(stats_path(scores_file)).history_filepath, 'ab') as f:
+            f.write(b'["b",1,"x",0,"bad"]\n[7,1,5,0,50]\n["b",null,5,0,50]\n')
+        add_score('h', 5, 0, 60, 4, filepath=scores_file)
+        stats = PlayerStatsStore(stats_path(scores_file))
+        assert stats.players() == ['h']
+        assert stats.get('h').games == 2
+        
+    def test_display_writes_nothing(self, scores_file):
+        """Test showing the leaderboard leaves the snapshot to the write paths."""
+        add_score('ann', 5, 0, 50, 4, filepath=scores_file)
+        for _ in range(SNAPSHOT_EVERY):
+            record_loss('ann', 9, 0, filepath=scores_file)
+        assert 'ann' in display_leaderboard(4, scores_file)
+        assert not os.path.exists(stats_path(scores_file))
+        add_scores([_entry('bob', 60)], scores_file)
+        assert os.path.exists(stats_path(scores_file))
+        
+    def test_shown_beside_leaderboard(self, scores_file):
+        """Test the leaderboard text includes the page's player stats."""
+        add_score('dee', 4, 0, 90, 4, filepath=scores_file)
+        text = display_leaderboard(4, scores_file)
+        assert 'Player Stats' in text
+        assert text.splitlines()[-1].split()[:3] == ['dee', '1', '1']
+
+
+
+class TestRatingStore:
+    """Tests for incrementally maintained Elo ratings."""
+    
+    def test_win_moves_points(self):
+        """Test an even match moves half the K factor and is zero-sum."""
+        store = RatingStore()
+        a, b = store.record_match('amy', 'bob', WIN)
+        assert (a, b) == (1516.0, 1484.0)
+        store.record_match('amy', 'bob', DRAW)
+        # The favourite loses points for a draw
+        assert store.rating('amy') < 1516.0
+        assert store.rating('amy') + store.rating('bob') == pytest.approx(3000.0)
+        record = store.get('bob')
+        assert (record.games, record.wins, record.losses, record.draws) == (2, 0, 1, 1)
+        
+    def test_top_and_rank_stay_ordered(self):
+        """Test top-N and ranks follow every update without a rebuild."""
+        store = RatingStore()
+        store.record_match('a', 'b', WIN)
+        store.record_match('c', 'd', LOSS)
+        store.record_match('a', 'd', WIN)
+        names = [name for name, _ in store.top(4)]
+        ratings = [store.rating(n) for n in names]
+        assert names[:2] == ['a', 'd'] and ratings == sorted(ratings, reverse=True)
+        # b and c both lost once to an even opponent: a shared rank
+        assert [store.rank(n) for n in names] == [1, 2, 3, 3]
+        assert [name for name, _ in store.top(2, start_rank=3)] == ['b', 'c']
+        assert store.rank('nobody') is None
+        
+    def test_batched_persistence(self, scores_file):
+        """Test ratings are written every batch_size matches and on save()."""
+        path = ratings_path(scores_file)
+        store = RatingStore(path, batch_size=3)
+        store.record_match('a', 'b', WIN)
+        store.record_match('a', 'b', WIN)
+        assert not os.path.exists(path)
+        store.record_match('a', 'b', WIN)
+        assert len(RatingStore(path)) == 2 and store.unsaved == 0
+        store.record_match('b', 'a', WIN)
+        store.save()
+        reloaded = RatingStore(path)
+        assert reloaded.get('b').wins == 1
+        assert reloaded.rank('a') == 1
+        
+    def test_unreadable_file_starts_empty(self, scores_file):
+        """Test a ratings file that is not a JSON object of rows is ignored."""
+        path = ratings_path(scores_file)
+        for content in ('[1, 2]', '"x"', '3', '{"a": "high"}', '{"a": []}', '{"a'):
+            with open(path, 'w') as f:
+                f.write(content)
+            assert len(RatingStore(path)) == 0
+            
+    def test_rejects_bad_matches(self):
+        """Test self-play and out-of-range scores are refused."""
+        store = RatingStore()
+        with pytest.raises(ValueError):
+            store.record_match('a', 'a', WIN)
+        with pytest.raises(ValueError):
+            store.record_match('a', 'b', 2.0)
+        assert len(store) == 0
+
+
+class TestBinaryFormat:
+    """Tests for the compact binary scores file."""
+    
+    def test_round_trip(self, scores_file):
+        """Test saved scores load back unchanged."""
+        scores = {
+            '4': [_entry('ünï', 90), _entry('bob', 80)],
+            '5': [],
+            '6': [_entry('bob', 70, difficulty=6)],
+        }
+        save_scores(scores, scores_file)
+        with open(scores_file, 'rb') as f:
+            assert f.read(4) == MAGIC
+        assert load_scores(scores_file) == scores
+        
+    def test_names_are_interned(self):
+        """Test repeated player names are stored once."""
+        one = encode_scores({'4': [_entry('a-long-player-name', 1)]})
+        many = encode_scores({'4': [_entry('a-long-player-name', i) for i in range(100)]})
+        assert len(many) - len(one) == 99 * 24
+        
+    def test_migrates_legacy_json(self, scores_file):
+        """Test a legacy JSON file is read and converted on the next save."""
+        legacy = os.path.splitext(scores_file)[0] + '.json'
+        with open(legacy, 'w') as f:
+            json.dump({'4': [_entry('old', 60)], '5': [], '6': []}, f, indent=2)
+        assert load_scores(scores_file)['4'][0]['player_name'] == 'old'
+        assert add_score('new', 3, 0, 95, 4, filepath=scores_file) == 1
+        assert [e['player_name'] for e in load_scores(scores_file)['4']] == ['new', 'old']
+        
+    def test_reads_json_at_binary_path(self, scores_file):
+        """Test a JSON file at the scores path itself is still readable."""
+        with open(scores_file, 'w') as f:
+            json.dump({'4': [], '5': [_entry('js', 40, difficulty=5)], '6': []}, f)
+        assert load_scores(scores_file)['5'][0]['player_name'] == 'js'
+        
+    def test_corrupt_file_loads_empty(self, scores_file):
+        """Test a truncated binary file is treated as empty."""
+        save_scores({'4': [_entry('a', 1)] * 5}, scores_file)
+        with open(scores_file, 'r+b') as f:
+            f.truncate(40)
+        assert load_scores(scores_file) == {'4': [], '5': [], '6': []}
+        
+    @pytest.mark.parametrize('cut', [17, 19, 30, 43, -3])
+    def test_truncated_anywhere_is_format_error(self, cut):
+        """Test a buffer cut at any point raises ScoreFormatError only."""
+        data = encode_scores({'4': [_entry('ab', 1), dict(_entry('ab', 2), date='someday')]})
+        with pytest.raises(ScoreFormatError):
+            decode_scores(memoryview(data[:cut]))
+            
+    def test_corrupt_fields_are_format_errors(self, scores_file):
+        """Test bad name bytes or indexes raise ScoreFormatError and load as empty."""
+        data = bytearray(encode_scores({'4': [_entry('ab', 1)]}))
+        bad_utf8 = bytes(data[:18]) + b'\xff' + bytes(data[19:])
+        bad_index = bytes(data[:20]) + b'\x07' + bytes(data[21:])
+        for corrupt in (bad_utf8, bad_index):
+            with pytest.raises(ScoreFormatError):
+                decode_scores(memoryview(corrupt))
+            with open(scores_file, 'wb') as f:
+                f.write(corrupt)
+            assert load_scores(scores_file) == {'4': [], '5': [], '6': []}
+            
+    def test_add_score_recovers_from_corrupt_file(self, scores_file):
+        """Test a corrupt file does not break adding scores."""
+        with open(scores_file, 'wb') as f:
+            f.write(MAGIC + b'\x01\0\0\0\x03\0\0\0\x01\0\0\0\x04\0\xff\xfe')
+        assert add_score('a', 5, 0, 50, 4, filepath=scores_file) == 1
+        assert load_scores(scores_file)['4'][0]['player_name'] == 'a'
+        
+    def test_out_of_range_counters_saturate(self, scores_file):
+        """Test values wider than their fields are clamped, not an error."""
+        entry = dict(_entry('big', 2 ** 40, tries=70000), hints_used=-1)
+        save_scores({'4': [entry]}, scores_file)
+        loaded = load_scores(scores_file)['4'][0]
+        assert (loaded['tries'], loaded['hints_used'], loaded['score']) == (65535, 0, 2 ** 31 - 1)
+        
+    def test_unparsed_dates_kept_verbatim(self, scores_file):
+        """Test dates in other formats, or none, round-trip unchanged."""
+        dates = ['2024-01-01', '2024-01-01 12:00', 'yesterday', '', '1969-07-20 20:17']
+        scores = {'4': [dict(_entry('d', 10 - i), date=d) for i, d in enumerate(dates)], '5': [], '6': []}
+        save_scores(scores, scores_file)
+        assert load_scores(scores_file) == scores
+        added = add_scores([dict(_entry('e', 99), date='2024-01-01')], filepath=scores_file)
+        assert added == [1]
+        assert load_scores(scores_file)['4'][0]['date'] == '2024-01-01'
+
+
+class TestLeaderboardService:
+    """Tests for the shared local leaderboard service."""
+    
+    @pytest.fixture
+    def service(self, scores_file):
+        service = LeaderboardService(scores_file, port=0)
+        service.start()
+        yield service
+        service.stop()
+        
+    def test_batch_of_operations(self, service):
+        """Test adds and queries in one request, answered in order."""
+        client = LeaderboardClient(service.host, service.port)
+        results = client.request([
+            {'op': 'add', 'entries': [_entry('a', 50), _entry('b', 90)]},
+            {'op': 'page', 'difficulty': 4, 'start': 1, 'count': 5},
+            {'op': 'rank', 'difficulty': 4, 'player_name': 'a'},
+        ])
+        assert results[0] == [2, 1]
+        assert [e['player_name'] for e in results[1]] == ['b', 'a']
+        assert results[2] == 2
+        # Acknowledged scores are already on disk
+        assert len(load_scores(service.filepath)['4']) == 2
+        assert PlayerStatsStore(stats_path(service.filepath)).get('b').best_score == 90
+        client.close()
+        
+    def test_connection_reused_and_cache_hit(self, service):
+        """Test one connection serves every call and repeated reads hit the cache."""
+        client = LeaderboardClient(service.host, service.port)
+        client.add_scores([_entry('a', 50)])
+        for _ in range(5):
+            assert client.page(4)[0]['player_name'] == 'a'
+        assert client.connections == 1
+        stats = client.stats()
+        assert stats['cache_misses'] == 1 and stats['cache_hits'] == 4
+        client.close()
+        
+    def test_bad_request_changes_nothing(self, service):
+        """Test a malformed entry is rejected without touching the board."""
+        client = LeaderboardClient(service.host, service.port)
+        with pytest.raises(LeaderboardServiceError):
+            client.add_scores([_entry('a', 50), {'player_name': 'b'}])
+        with pytest.raises(LeaderboardServiceError):
+            client.request([{'op': 'nope'}])
+        assert client.page(4) == []
+        assert client.connections == 1
+        client.close()
+        
+    def test_bad_types_leave_store_usable(self, service):
+        """Test a badly typed entry records nothing and the store still opens."""
+        client = LeaderboardClient(service.host, service.port)
+        for bad in ({'tries': 'x'}, {'score': 'bad'}, {'player_name': 7}, {'hints_used': True}):
+            with pytest.raises(LeaderboardServiceError):
+                client.add_scores([_entry('a', 50), dict(_entry('b', 60), **bad)])
+        client.add_scores([_entry('c', 70)])
+        client.close()
+        stats = PlayerStatsStore(stats_path(service.filepath))
+        assert stats.players() == ['c']
+        assert 'c' in display_leaderboard(4, service.filepath)
+        
+    def test_high_scores_client_mode(self, service, scores_file):
+        """Test the high_scores functions go through the service after use_service."""
+        use_service(f'{service.host}:{service.port}', scores_file)
+        try:
+            assert add_score('a', 5, 0, 70, 4, filepath=scores_file) == 1
+            assert add_scores([_entry('b', 90)], scores_file) == [1]
+            assert get_player_rank('a', 4, scores_file) == 2
+            assert [e['player_name'] for e in get_leaderboard_page(4, 1, 10, scores_file)] == ['b', 'a']
+            assert service.adds == 2
+            # A score that ties the last place of a full board but misses it
+            # gets the rank it would have had, as without the service
+            service.limit = 2
+            assert add_score('c', 5, 0, 70, 4, filepath=scores_file) == 2
+        finally:
+            stop_using_service(scores_file)
+        assert [e['player_name'] for e in load_scores(scores_file)['4']] == ['b', 'a']
+        
+    def test_concurrent_clients_lose_nothing(self, scores_file):
+        """Test many clients adding at once keep every score and share writes."""
+        service = LeaderboardService(scores_file, port=0, limit=10000)
+        service.start()
+        
+        def add(i):
+            client = LeaderboardClient(service.host, service.port)
+            for j in range(25):
+                client.add_scores([_entry(f'p{i}', j, difficulty=5)])
+            client.close()
+            
+        threads = [threading.Thread(target=add, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        service.stop()
+        assert len(load_scores(scores_file)['5']) == 200
+        assert service.adds == 200
+        assert service.writes <= 200
+        
+    def test_delta_carries_only_changed_rows(self, service):
+        """Test a delta holds the new rows at their ranks and rebuilds the board."""
+        client = LeaderboardClient(service.host, service.port)
+        client.add_scores([_entry('a', 50), _entry('b', 90)])
+        board = client.page(4, 1, 100)
+        client.add_scores([_entry('c', 70), _entry('d', 10), _entry('e', 1, difficulty=5)])
+        
+        result = client.changes(4, since=1, epoch=service.epoch)
+        assert result['version'] == 2 and 'board' not in result
+        [delta] = result['deltas']
+        assert [(rank, e['player_name']) for rank, e in delta['inserts']] == [(2, 'c'), (4, 'd')]
+        apply_delta(board, delta)
+        assert board == client.page(4, 1, 100)
+        assert client.changes(5, since=0, epoch=service.epoch)['version'] == 1
+        client.close()
+        
+    def test_catch_up_or_full_reload(self, scores_file):
+        """Test a lagging client gets missed deltas, or the board once they are gone."""
+        service = LeaderboardService(scores_file, port=0, limit=3, history=2)
+        service.start()
+        client = LeaderboardClient(service.host, service.port)
+        for score in (10, 20, 30, 40):
+            client.add_scores([_entry(f'p{score}', score)])
+            
+        result = client.changes(4, since=2, epoch=service.epoch)
+        assert [d['version'] for d in result['deltas']] == [3, 4]
+        # Versions 1-2 are no longer kept, and a restarted service has a new epoch
+        assert 'board' in client.changes(4, since=1, epoch=service.epoch)
+        assert [e['score'] for e in client.changes(4, since=4, epoch='old')['board']] == [40, 30, 20]
+        assert client.changes(4, since=4, epoch=service.epoch)['deltas'] == []
+        client.close()
+        service.stop()
+        
+    def test_feed_receives_pushed_deltas(self, service):
+        """Test a feed loads the board, then follows new scores without polling."""
+        client = LeaderboardClient(service.host, service.port)
+        client.add_scores([_entry('a', 50)])
+        changes = []
+        feed = LeaderboardFeed(
+            service.host, service.port, difficulties=(4,),
+            on_change=lambda d, board, delta: changes.append(delta),
+        )
+        try:
+            assert feed.wait_synced(5)
+            assert feed.full_reloads == 1 and [e['player_name'] for e in feed.board(4)] == ['a']
+            client.add_scores([_entry('b', 90), _entry('c', 10, difficulty=5)])
+            client.add_scores([_entry('d', 60)])
+            deadline = time.monotonic() + 5
+            while feed.version(4) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert feed.board(4) == client.page(4, 1, 100)
+            assert feed.deltas_applied == 2 and len(changes) == 3
+            assert service.stats()['subscribers'] == 1
+        finally:
+            feed.close()
+            client.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
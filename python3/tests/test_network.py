@@ -0,0 +1,1204 @@
+"""Tests for the network layer."""
+
+import json
+import pytest
+import socket
+import sys
+import os
+import random
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numbers_game.network import NetworkManager, NetworkCallbacks
+from numbers_game.network import codec
+from numbers_game.network.discovery import DiscoveryResponder, HostBrowser, local_ip
+from numbers_game.network.dispatch import CallbackQueue
+from numbers_game.network.metrics import RECEIVED, SENT, LatencyHistogram, NetworkMetrics
+from numbers_game.network.outbox import Outbox, OutboxFull
+from numbers_game.network.messages import OTHER_TYPES
+from numbers_game.network.ratelimit import ALLOW, DISCONNECT, DROP, RateLimiter
+from numbers_game.network.session import ReplayLog
+from numbers_game.network.tk_pump import TkNetworkPump
+from numbers_game.network.transport import LoopbackTransport
+from numbers_game.network.bots import BotPlayer, all_numbers, play_loopback_match, DRAW, LOSS, WIN
+from numbers_game.network.heartbeat import RttStats
+from numbers_game.network.framing import FrameBuffer, FrameError, encode_frame
+from numbers_game.network.protocol import decode_message, encode_message
+
+
+class Recorder:
+    """Collects network callbacks and lets tests wait for them."""
+    
+    def __init__(self) -> None:
+        self.messages = []
+        self.events = []
+        self._cond = threading.Condition()
+        
+    def callbacks(self) -> NetworkCallbacks:
+        return NetworkCallbacks(
+            on_message=self._on_message,
+            on_connected=lambda msg: self._event(('connected', msg)),
+            on_disconnected=lambda msg: self._event(('disconnected', msg)),
+            on_reconnecting=lambda msg: self._event(('reconnecting', msg)),
+            on_resumed=lambda msg: self._event(('resumed', msg)),
+        )
+        
+    def _on_message(self, msg_type, data) -> None:
+        with self._cond:
+            self.messages.append((msg_type, data))
+            self._cond.notify_all()
+            
+    def _event(self, event) -> None:
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+            
+    def wait_for(self, predicate, timeout: float = 5.0) -> None:
+        with self._cond:
+            assert self._cond.wait_for(predicate, timeout), "timed out"
+            
+    def wait_messages(self, count: int) -> list:
+        self.wait_for(lambda: len(self.messages) >= count)
+        return self.messages
+
+
+def connect_pair(heartbeat: float = None):
+    """Host and join two NetworkManagers over loopback."""
+    host_rec, join_rec = Recorder(), Recorder()
+    host = NetworkManager(host_rec.callbacks())
+    join = NetworkManager(join_rec.callbacks())
+    if heartbeat:
+        host.HEARTBEAT_INTERVAL = join.HEARTBEAT_INTERVAL = heartbeat
+    assert host.host_game(port=0)[0]
+    assert join.join_game('127.0.0.1', host.port)[0]
+    host_rec.wait_for(lambda: host_rec.events)
+    return host, host_rec, join, join_rec
+
+
+class FaultyLink:
+    """Loopback TCP proxy that can sever every connection passing through it."""
+    
+    def __init__(self, target_port: int) -> None:
+        self.target_port = target_port
+        self.listener = socket.create_server(('127.0.0.1', 0))
+        self.port = self.listener.getsockname()[1]
+        self.accepting = True
+        self._conns = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            try:
+                if not self.accepting:
+                    raise OSError("link down")
+                upstream = socket.create_connection(('127.0.0.1', self.target_port))
+            except OSError:
+                client.close()
+                continue
+            with self._lock:
+                self._conns += [client, upstream]
+            for src, dst in ((client, upstream), (upstream, client)):
+                threading.Thread(target=self._pipe, args=(src, dst), daemon=True).start()
+                
+    @staticmethod
+    def _pipe(src: socket.socket, dst: socket.socket) -> None:
+        try:
+            while True:
+                data = src.recv(65536)
+                if not data:
+                    break
+                dst.sendall(data)
+        except OSError:
+            pass
+        for sock in (src, dst):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+                
+    def cut(self) -> None:
+        """Drop every connection, as a Wi-Fi outage would."""
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for sock in conns:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+            
+    def close(self) -> None:
+        self.listener.close()
+        self.cut()
+
+
+class TestFrameBuffer:
+    """Tests for the receive buffer and framing."""
+    
+    def test_frames_split_across_feeds(self):
+        """Test a frame delivered byte by byte is reassembled."""
+        buf = FrameBuffer(capacity=8)
+        data = encode_frame(b'hello') + encode_frame(b'world')
+        out = []
+        for i in range(len(data)):
+            buf.feed(data[i:i + 1])
+            out.extend(bytes(p) for p in buf.messages())
+        assert out == [b'hello', b'world']
+        
+    def test_legacy_and_framed_mixed(self):
+        """Test legacy separator messages and frames on one stream."""
+        buf = FrameBuffer()
+        buf.feed(b'{"a": 1}|||' + encode_frame(b'{"b": "|||"}') + b'{"c": 3}|||')
+        assert [bytes(p) for p in buf.messages()] == [b'{"a": 1}', b'{"b": "|||"}', b'{"c": 3}']
+        
+    def test_utf8_split_across_reads(self):
+        """Test a multi-byte character cut between reads survives."""
+        payload = json.dumps({'type': 'NAME', 'data': 'Zoë'}, ensure_ascii=False).encode('utf-8')
+        frame = encode_frame(payload)
+        cut = frame.index('ë'.encode('utf-8')) + 1
+        buf = FrameBuffer()
+        buf.feed(frame[:cut])
+        assert buf.messages() == []
+        buf.feed(frame[cut:])
+        assert json.loads(bytes(buf.messages()[0]))['data'] == 'Zoë'
+        
+    def test_oversized_frame_rejected(self):
+        """Test a frame larger than the maximum raises FrameError."""
+        buf = FrameBuffer(max_frame_size=16)
+        buf.feed(encode_frame(b'x' * 17))
+        with pytest.raises(FrameError):
+            buf.messages()
+            
+    def test_backlog_compacts_and_grows(self):
+        """Test many queued messages drain in order through a small buffer."""
+        buf = FrameBuffer(capacity=16)
+        out = []
+        for i in range(1000):
+            buf.feed(encode_frame(str(i).encode()))
+            if i % 7 == 0:
+                out.extend(int(bytes(p)) for p in buf.messages())
+        out.extend(int(bytes(p)) for p in buf.messages())
+        assert out == list(range(1000))
+        assert len(buf) == 0
+
+
+class TestCodec:
+    """Tests for the binary message codec."""
+    
+    @pytest.mark.parametrize('msg_type, data, size', [
+        ('GUESS', '98765', 5),
+        ('RESULT', {'guess': '98765', 'count': 4, 'place': 2}, 7),
+        ('SETUP_REQ', 6, 2),
+        ('START', 4, 2),
+        ('SECRET_SET', True, 2),
+        ('NAME', 'Zoë', 5),
+        ('DISCONNECT', None, 1),
+    ])
+    def test_round_trip(self, msg_type, data, size):
+        """Test each message type survives encode/decode at its fixed size."""
+        payload = codec.encode(msg_type, data)
+        assert len(payload) == size
+        assert codec.decode(memoryview(payload)) == (msg_type, data)
+        
+    @pytest.mark.parametrize('msg_type, data', [
+        ('CHAT', 'hi'),
+        ('GUESS', '01234'),
+        ('GUESS', 12345),
+        ('GUESS', '12\u00b34'),
+        ('RESULT', {'guess': '123', 'count': 1, 'place': 1, 'extra': 1}),
+        ('SECRET_SET', 12345),
+    ])
+    def test_json_fallback(self, msg_type, data):
+        """Test messages without an exact binary layout fall back to JSON."""
+        assert codec.encode(msg_type, data) is None
+        frame = encode_message(msg_type, data, framed=True, binary=True)
+        assert frame[4:5] == b'{'
+        assert decode_message(memoryview(frame)[4:]) == {'type': msg_type, 'data': data}
+        
+    def test_truncated_payload(self):
+        """Test a truncated payload raises ValueError."""
+        with pytest.raises(ValueError):
+            codec.decode(memoryview(codec.encode('RESULT', {'guess': '1234', 'count': 1, 'place': 0})[:4]))
+
+
+class TestNetworkManager:
+    """Tests for NetworkManager over loopback sockets."""
+    
+    def test_negotiates_framing(self):
+        """Test both sides switch to frames after exchanging NAME."""
+        host, host_rec, join, join_rec = connect_pair()
+        try:
+            host.send('NAME', 'h')
+            join.send('NAME', 'j')
+            host_rec.wait_messages(1)
+            join_rec.wait_messages(1)
+            assert host._framed and join._framed
+            assert host._binary and join._binary
+            join.send('GUESS', 'a|||b')
+            join.send('RESULT', {'guess': '12345', 'count': 3, 'place': 1})
+            assert host_rec.wait_messages(3)[1:] == [
+                ('GUESS', 'a|||b'),
+                ('RESULT', {'guess': '12345', 'count': 3, 'place': 1}),
+            ]
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    def test_legacy_peer_stays_legacy(self):
+        """Test a peer that advertises nothing keeps getting legacy messages."""
+        rec = Recorder()
+        host = NetworkManager(rec.callbacks())
+        host.host_game(port=0)
+        peer = socket.create_connection(('127.0.0.1', host.port))
+        try:
+            peer.sendall(b'{"type": "NAME", "data": "old"}|||')
+            rec.wait_messages(1)
+            assert not host._framed
+            host.send('START', 5)
+            data = b''
+            while not data.endswith(b'|||'):
+                data += peer.recv(4096)
+            assert json.loads(data[:-3]) == {'type': 'START', 'data': 5}
+        finally:
+            peer.close()
+            host.disconnect()
+    def test_accept_is_immediate(self):
+        """Test a joiner is noticed without a polling delay."""
+        rec = Recorder()
+        host = NetworkManager(rec.callbacks())
+        host.host_game(port=0)
+        try:
+            start = time.perf_counter()
+            peer = socket.create_connection(('127.0.0.1', host.port))
+            rec.wait_for(lambda: rec.events)
+            assert time.perf_counter() - start < 0.2
+            assert host.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+            peer.close()
+        finally:
+            host.disconnect()
+            
+    def test_disconnect_stops_accept_loop(self):
+        """Test disconnecting while waiting for a joiner ends the accept thread."""
+        host = NetworkManager(Recorder().callbacks())
+        host.host_game(port=0)
+        host.disconnect()
+        host._accept_thread.join(1.0)
+        assert not host._accept_thread.is_alive()
+        
+    def test_heartbeat_measures_rtt(self):
+        """Test PING/PONG produce RTT samples and never reach callbacks."""
+        host, host_rec, join, join_rec = connect_pair(heartbeat=0.02)
+        try:
+            host.send('NAME', 'h')
+            join.send('NAME', 'j')
+            deadline = time.time() + 5
+            while (host.rtt.count < 3 or join.rtt.count < 3) and time.time() < deadline:
+                time.sleep(0.01)
+            assert host.rtt.count >= 3 and join.rtt.count >= 3
+            assert 0 < host.rtt.ewma < 1
+            assert [t for t, _ in host_rec.messages] == ['NAME']
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    def test_dead_peer_detected(self):
+        """Test a peer that stops answering PINGs is disconnected."""
+        rec = Recorder()
+        host = NetworkManager(rec.callbacks())
+        host.HEARTBEAT_INTERVAL = 0.02
+        host.DEAD_PEER_TIMEOUT = 0.2
+        host.host_game(port=0)
+        peer = socket.create_connection(('127.0.0.1', host.port))
+        try:
+            peer.sendall(b'{"type": "NAME", "data": "mute", "caps": ["ping"]}|||')
+            rec.wait_for(lambda: ('disconnected', 'Peer not responding') in rec.events)
+        finally:
+            peer.close()
+            host.disconnect()
+
+
+class TestPumpMode:
+    """Tests for NetworkManager driven by pump() without threads."""
+    
+    @staticmethod
+    def pump_until(managers, predicate, timeout: float = 5.0) -> None:
+        deadline = time.time() + timeout
+        while not predicate():
+            assert time.time() < deadline, "timed out"
+            for manager in managers:
+                manager.pump(0.001)
+                
+    def test_host_and_join_without_threads(self):
+        """Test a pumped pair connects and exchanges messages on one thread."""
+        threads_before = threading.active_count()
+        host_rec, join_rec = Recorder(), Recorder()
+        host = NetworkManager(host_rec.callbacks(), threaded=False)
+        join = NetworkManager(join_rec.callbacks(), threaded=False)
+        try:
+            assert host.host_game(port=0)[0]
+            assert join.join_game('127.0.0.1', host.port)[0]
+            pair = (host, join)
+            self.pump_until(pair, lambda: host_rec.events and join_rec.events)
+            host.send('NAME', 'h')
+            join.send('NAME', 'j')
+            for i in range(50):
+                join.send('GUESS', str(10000 + i))
+            self.pump_until(pair, lambda: len(host_rec.messages) == 51 and join_rec.messages)
+            assert host_rec.messages[-1] == ('GUESS', '10049')
+            assert host._binary and join._binary
+            assert threading.active_count() == threads_before
+            assert host.pump_stats.messages >= 52
+            assert host.pump_stats.max_batch >= 1
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    def test_callbacks_deferred_until_pump(self):
+        """Test nothing is delivered outside pump() and nested pumps are safe."""
+        host_rec = Recorder()
+        join_rec = Recorder()
+        host = NetworkManager(host_rec.callbacks(), threaded=False)
+        join = NetworkManager(join_rec.callbacks(), threaded=False)
+        nested = []
+        depth = []
+        
+        def reentrant(msg_type, data):
+            # Like a modal dialog spinning the event loop inside a callback
+            nested.append(msg_type)
+            depth.append(msg_type)
+            host.pump()
+            host.pump()
+            assert depth == [msg_type], "delivered inside another callback"
+            depth.pop()
+            
+        host.callbacks.on_message = reentrant
+        try:
+            host.host_game(port=0)
+            join.join_game('127.0.0.1', host.port)
+            assert not join_rec.events
+            self.pump_until((host, join), lambda: host_rec.events)
+            join.send('NAME', 'j')
+            join.send('GUESS', '12345')
+            self.pump_until((host, join), lambda: len(nested) == 2)
+            assert nested == ['NAME', 'GUESS']
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    def test_peer_close_reported(self):
+        """Test a closed peer surfaces as a disconnect callback from pump()."""
+        rec = Recorder()
+        host = NetworkManager(rec.callbacks(), threaded=False)
+        host.host_game(port=0)
+        peer = socket.create_connection(('127.0.0.1', host.port))
+        self.pump_until((host,), lambda: rec.events)
+        peer.close()
+        self.pump_until((host,), lambda: len(rec.events) == 2)
+        assert rec.events[1] == ('disconnected', 'Connection lost')
+        assert not host.connected
+
+
+
+class FakeTk:
+    """Stands in for a Tk widget: after() callbacks run from run_pending().
+    
+    Like Tk, an exception from a callback is reported and the loop goes on.
+    """
+    
+    def __init__(self) -> None:
+        self.pending = {}
+        self.errors = []
+        self._ids = iter(range(1 << 30))
+        
+    def after(self, ms, callback) -> str:
+        after_id = f'after#{next(self._ids)}'
+        self.pending[after_id] = callback
+        return after_id
+        
+    def after_cancel(self, after_id) -> None:
+        self.pending.pop(after_id, None)
+        
+    def run_pending(self) -> None:
+        """One turn of the event loop."""
+        for after_id in list(self.pending):
+            callback = self.pending.pop(after_id, None)
+            if callback is not None:
+                try:
+                    callback()
+                except Exception as e:
+                    self.errors.append(e)
+                    
+    def run_for(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.run_pending()
+            time.sleep(0.002)
+            
+    def run_until(self, predicate, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            assert time.monotonic() < deadline, "timed out"
+            self.run_pending()
+            time.sleep(0.002)
+
+
+class TestTkNetworkPump:
+    """Tests for pumping NetworkManagers from a (fake) Tk event loop."""
+    
+    @pytest.fixture
+    def pumped_pair(self):
+        """Host and joiner pumped from one FakeTk, with fast heartbeats."""
+        tk = FakeTk()
+        host_rec, join_rec = Recorder(), Recorder()
+        host = NetworkManager(host_rec.callbacks(), threaded=False)
+        join = NetworkManager(join_rec.callbacks(), threaded=False)
+        for manager in (host, join):
+            manager.HEARTBEAT_INTERVAL = 0.05
+            manager.DEAD_PEER_TIMEOUT = 0.4
+        pumps = [TkNetworkPump(tk, host), TkNetworkPump(tk, join)]
+        host.host_game(port=0)
+        join.join_game('127.0.0.1', host.port)
+        for pump in pumps:
+            pump.start()
+        tk.run_until(lambda: host_rec.events and join_rec.events)
+        yield tk, host, host_rec, join, join_rec, pumps
+        for pump in pumps:
+            pump.stop()
+        join.disconnect()
+        host.disconnect()
+        
+    def test_modal_dialog_keeps_connection_alive(self, pumped_pair):
+        """Test a callback that blocks in a nested event loop keeps heartbeats going."""
+        tk, host, host_rec, join, join_rec, pumps = pumped_pair
+        seen_during_modal = []
+        
+        def modal(msg_type, data):
+            host_rec.messages.append((msg_type, data))
+            if msg_type == 'NAME':
+                # e.g. Messagebox or the secret-number prompt: Tk runs a
+                # nested loop until the dialog closes
+                join.send('GUESS', '12345')
+                tk.run_for(1.0)
+                seen_during_modal.extend(host_rec.messages)
+                
+        host.callbacks.on_message = modal
+        host.send('NAME', 'h')  # advertises heartbeats to the joiner
+        tk.run_until(lambda: join_rec.messages)
+        rtt_before = join.rtt.count
+        join.send('NAME', 'j')
+        tk.run_until(lambda: len(host_rec.messages) == 2)
+        
+        # Twice the dead-peer timeout passed inside the callback
+        assert seen_during_modal == [('NAME', 'j')]
+        assert host_rec.messages == [('NAME', 'j'), ('GUESS', '12345')]
+        assert host.connected and join.connected
+        assert not [e for e in host_rec.events + join_rec.events if e[0] == 'disconnected']
+        assert join.rtt.count > rtt_before
+        assert all(pump.running for pump in pumps)
+        
+    def test_raising_callback_keeps_pumping(self, pumped_pair):
+        """Test an exception in a callback does not stop the pump."""
+        tk, host, host_rec, join, join_rec, pumps = pumped_pair
+        
+        def flaky(msg_type, data):
+            if data == 'boom':
+                raise RuntimeError(data)
+            host_rec.messages.append((msg_type, data))
+            
+        host.callbacks.on_message = flaky
+        join.send('NAME', 'boom')
+        tk.run_until(lambda: tk.errors)
+        join.send('NAME', 'j')
+        tk.run_until(lambda: host_rec.messages)
+        assert host_rec.messages == [('NAME', 'j')]
+        assert isinstance(tk.errors[0], RuntimeError)
+        assert pumps[0].running
+        
+    def test_stop_from_callback(self, pumped_pair):
+        """Test a callback can stop the pump that delivered it."""
+        tk, host, host_rec, join, join_rec, pumps = pumped_pair
+        host.callbacks.on_message = lambda msg_type, data: pumps[0].stop()
+        join.send('NAME', 'j')
+        tk.run_until(lambda: not pumps[0].running)
+        tk.run_for(0.05)
+        assert not pumps[0].running
+
+
+class TestCallbackQueue:
+    """Tests for batched callback delivery."""
+    
+    def test_burst_scheduled_once(self):
+        """Test a burst from several threads needs one schedule per batch."""
+        scheduled = []
+        queue = CallbackQueue(scheduled.append, max_batch=64)
+        seen = []
+        workers = [
+            threading.Thread(target=lambda n=n: [queue.post(seen.append, (n, i)) for i in range(50)])
+            for n in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert len(scheduled) == 1
+        assert queue.high_water == 200
+        while scheduled:
+            assert scheduled.pop(0)() <= 64
+        assert len(seen) == 200
+        for n in range(4):
+            assert [i for m, i in seen if m == n] == list(range(50))
+        stats = queue.stats()
+        assert stats['batches'] == 4 and stats['largest_batch'] == 64
+        assert stats['depth'] == 0
+        
+    def test_wrap_threaded_manager(self):
+        """Test wrapped callbacks from a threaded manager arrive via drain()."""
+        scheduled = []
+        queue = CallbackQueue(scheduled.append)
+        rec = Recorder()
+        host = NetworkManager(queue.wrap(rec.callbacks()))
+        host.host_game(port=0)
+        peer = socket.create_connection(('127.0.0.1', host.port))
+        try:
+            peer.sendall(b'{"type": "NAME", "data": "a"}|||{"type": "GUESS", "data": "1"}|||')
+            deadline = time.time() + 5
+            while queue.depth < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            assert not rec.events and not rec.messages
+            scheduled.pop(0)()
+            assert rec.events == [('connected', 'Player joined from 127.0.0.1')]
+            assert rec.messages == [('NAME', 'a'), ('GUESS', '1')]
+        finally:
+            peer.close()
+            host.disconnect()
+
+
+    def test_wrap_forwards_resume_callbacks(self):
+        """Test wrapped reconnecting/resumed calls are queued, and unset ones stay unset."""
+        scheduled = []
+        queue = CallbackQueue(scheduled.append)
+        rec = Recorder()
+        wrapped = queue.wrap(rec.callbacks())
+        wrapped.on_reconnecting('Connection lost')
+        wrapped.on_resumed('Connection restored')
+        assert not rec.events
+        scheduled.pop(0)()
+        assert rec.events == [('reconnecting', 'Connection lost'), ('resumed', 'Connection restored')]
+        
+        bare = queue.wrap(NetworkCallbacks(lambda t, d: None, lambda m: None, lambda r: None))
+        assert bare.on_reconnecting is None and bare.on_resumed is None
+
+
+class TestOutbox:
+    """Tests for the bounded outbound queue."""
+    
+    def test_take_coalesces(self):
+        """Test queued packets come out as one buffer, capped by size."""
+        box = Outbox(limit=10)
+        for i in range(5):
+            box.put(b'%d' % i * 4)
+        assert box.take(max_bytes=12) == b'000011112222'
+        assert box.take() == b'33334444'
+        assert box.take() == b''
+        stats = box.stats()
+        assert stats['sent_messages'] == 5 and stats['writes'] == 2
+        assert stats['bytes_per_sec'] == 20
+        
+    def test_drop_oldest(self):
+        """Test the drop-oldest policy keeps the newest messages."""
+        box = Outbox(limit=2, policy='drop-oldest')
+        for packet in (b'a', b'b', b'c'):
+            assert box.put(packet)
+        assert box.take() == b'bc'
+        assert box.dropped == 1 and box.high_water == 2
+        
+    def test_disconnect_policy_raises(self):
+        """Test the disconnect policy reports a full queue."""
+        box = Outbox(limit=1, policy='disconnect')
+        box.put(b'a')
+        with pytest.raises(OutboxFull):
+            box.put(b'b')
+            
+    def test_block_waits_for_room(self):
+        """Test the block policy waits for the writer and honours timeouts."""
+        box = Outbox(limit=1)
+        box.put(b'a')
+        assert not box.put(b'b', timeout=0.01)
+        threading.Timer(0.05, box.take).start()
+        assert box.put(b'c', timeout=5)
+        assert box.take() == b'c'
+        
+    def test_close_wakes_writer(self):
+        """Test a waiting writer gets the remainder, then None after close."""
+        box = Outbox()
+        box.put(b'x')
+        box.close()
+        assert not box.put(b'y')
+        assert box.take(wait=True) == b'x'
+        assert box.take(wait=True) is None
+        
+    def test_unknown_policy(self):
+        """Test an unknown policy is rejected."""
+        with pytest.raises(ValueError):
+            Outbox(policy='ignore')
+            
+    def test_stalled_peer_does_not_block_sender(self):
+        """Test send() stays fast when the peer stops reading."""
+        rec = Recorder()
+        host = NetworkManager(rec.callbacks(), send_queue_size=8, send_policy='disconnect')
+        host.host_game(port=0)
+        peer = socket.create_connection(('127.0.0.1', host.port))
+        try:
+            rec.wait_for(lambda: rec.events)
+            payload = 'x' * 65536
+            slowest = 0.0
+            for _ in range(2000):
+                start = time.perf_counter()
+                if not host.send('GUESS', payload):
+                    break
+                slowest = max(slowest, time.perf_counter() - start)
+            assert ('disconnected', 'Send queue full') in rec.events
+            assert slowest < 0.5
+        finally:
+            peer.close()
+            host.disconnect()
+            
+    def test_stalled_peer_does_not_block_pump_mode(self):
+        """Test the default block policy never waits on the pumping thread."""
+        rec = Recorder()
+        host = NetworkManager(rec.callbacks(), threaded=False, send_queue_size=8)
+        host.host_game(port=0)
+        peer = socket.create_connection(('127.0.0.1', host.port))
+        try:
+            deadline = time.time() + 5
+            while not rec.events and time.time() < deadline:
+                host.pump()
+                time.sleep(0.01)
+            payload = 'x' * 65536
+            slowest = 0.0
+            for _ in range(2000):
+                start = time.perf_counter()
+                if not host.send('GUESS', payload):
+                    break
+                slowest = max(slowest, time.perf_counter() - start)
+            host.pump()
+            assert ('disconnected', 'Peer stopped reading') in rec.events
+            assert slowest < 0.5
+        finally:
+            peer.close()
+            host.disconnect()
+
+
+class TestSessionResume:
+    """Tests for resuming a session after the connection drops."""
+    
+    def connect_via_link(self, threaded: bool = True):
+        host_rec, join_rec = Recorder(), Recorder()
+        host = NetworkManager(host_rec.callbacks(), threaded=threaded)
+        join = NetworkManager(join_rec.callbacks(), threaded=threaded)
+        for manager in (host, join):
+            manager.HEARTBEAT_INTERVAL = 0.05
+        assert host.host_game(port=0)[0]
+        link = FaultyLink(host.port)
+        assert join.join_game('127.0.0.1', link.port)[0]
+        return host, host_rec, join, join_rec, link
+        
+    def test_resume_replays_unacknowledged(self):
+        """Test a cut link resumes and every message arrives exactly once."""
+        host, host_rec, join, join_rec, link = self.connect_via_link()
+        try:
+            host_rec.wait_for(lambda: host_rec.events)
+            host.send('NAME', 'h')
+            join.send('NAME', 'j')
+            join.send('GUESS', '11111')
+            host_rec.wait_messages(2)
+            join_rec.wait_messages(1)
+            assert join.session_token == host.session_token
+            
+            cut_at = time.perf_counter()
+            link.cut()
+            # Sent while the link is down (or before the drop is noticed)
+            join.send('GUESS', '22222')
+            host.send('RESULT', {'guess': '11111', 'count': 1, 'place': 0})
+            
+            host_rec.wait_for(lambda: any(e[0] == 'resumed' for e in host_rec.events))
+            join_rec.wait_for(lambda: any(e[0] == 'resumed' for e in join_rec.events))
+            resume_time = time.perf_counter() - cut_at
+            join.send('GUESS', '33333')
+            host_rec.wait_messages(4)
+            join_rec.wait_messages(2)
+            
+            assert [d for t, d in host_rec.messages] == ['j', '11111', '22222', '33333']
+            assert join_rec.messages[1] == ('RESULT', {'guess': '11111', 'count': 1, 'place': 0})
+            assert not any(e[0] == 'disconnected' for e in host_rec.events + join_rec.events)
+            assert join.resumes == host.resumes == 1
+            assert resume_time < 2.0
+            print(f"resume took {resume_time * 1000:.1f} ms (joiner: {join.last_resume_time * 1000:.1f} ms)")
+        finally:
+            join.disconnect()
+            host.disconnect()
+            link.close()
+            
+    def test_resume_in_pump_mode(self):
+        """Test the pump-driven managers resume on the caller's thread."""
+        host, host_rec, join, join_rec, link = self.connect_via_link(threaded=False)
+        pair = (host, join)
+        try:
+            TestPumpMode.pump_until(pair, lambda: host_rec.events and join_rec.events)
+            host.send('NAME', 'h')
+            join.send('NAME', 'j')
+            TestPumpMode.pump_until(pair, lambda: host_rec.messages and join_rec.messages)
+            link.cut()
+            join.send('GUESS', '12345')
+            TestPumpMode.pump_until(pair, lambda: len(host_rec.messages) == 2)
+            assert host_rec.messages[1] == ('GUESS', '12345')
+            assert host.resumes == join.resumes == 1
+            assert host.connected and join.connected
+        finally:
+            join.disconnect()
+            host.disconnect()
+            link.close()
+            
+    def test_gives_up_after_timeout(self):
+        """Test on_disconnected fires once the resume window closes."""
+        host, host_rec, join, join_rec, link = self.connect_via_link()
+        host.RESUME_TIMEOUT = join.RESUME_TIMEOUT = 0.3
+        try:
+            host_rec.wait_for(lambda: host_rec.events)
+            host.send('NAME', 'h')
+            join.send('NAME', 'j')
+            host_rec.wait_messages(1)
+            join_rec.wait_messages(1)
+            link.accepting = False
+            link.cut()
+            join_rec.wait_for(lambda: ('disconnected', 'Connection lost') in join_rec.events)
+            host_rec.wait_for(lambda: ('disconnected', 'Connection lost') in host_rec.events)
+            assert ('reconnecting', 'Connection lost') in join_rec.events
+            assert not host.online and not join.online
+            assert host.server_sock is None
+        finally:
+            join.disconnect()
+            host.disconnect()
+            link.close()
+            
+    def test_no_resume_without_session(self):
+        """Test a drop before NAME is exchanged ends the game as before."""
+        host, host_rec, join, join_rec, link = self.connect_via_link()
+        try:
+            host_rec.wait_for(lambda: host_rec.events)
+            link.cut()
+            join_rec.wait_for(lambda: ('disconnected', 'Connection lost') in join_rec.events)
+            assert not any(e[0] == 'reconnecting' for e in join_rec.events)
+        finally:
+            join.disconnect()
+            host.disconnect()
+            link.close()
+            
+    def test_replay_log(self):
+        """Test acknowledgements trim the log and overflow limits resume."""
+        log = ReplayLog(capacity=3)
+        for i in range(5):
+            log.append('GUESS', i)
+        assert log.first_seq == 3 and log.next_seq == 6
+        assert log.covers(2) and log.covers(5)
+        assert not log.covers(1)
+        assert log.since(3) == [('GUESS', 3), ('GUESS', 4)]
+        log.ack(4)
+        assert len(log) == 1 and log.first_seq == 5
+
+
+class TestDiscovery:
+    """Tests for LAN host discovery."""
+    
+    def test_browse_finds_responder(self):
+        """Test a probe is answered with the game port and name."""
+        responder = DiscoveryResponder(game_port=6000, name='Alice', port=0)
+        responder.start()
+        try:
+            browser = HostBrowser(port=responder.port, targets=('127.0.0.1',))
+            start = time.perf_counter()
+            hosts = browser.browse(timeout=0.2)
+            assert time.perf_counter() - start < 1.0
+            assert [(h.address, h.port, h.name) for h in hosts] == [('127.0.0.1', 6000, 'Alice')]
+            assert hosts[0].label == 'Alice (127.0.0.1)'
+        finally:
+            responder.close()
+            
+    def test_cache_limits_probes(self):
+        """Test repeated browsing within the TTL reuses cached answers."""
+        responder = DiscoveryResponder(game_port=6000, name='Bob', port=0)
+        responder.start()
+        try:
+            browser = HostBrowser(ttl=0.3, port=responder.port, targets=('127.0.0.1',))
+            for _ in range(5):
+                assert len(browser.browse(timeout=0.05)) == 1
+            assert browser.probes_sent == 1 and responder.answered == 1
+            time.sleep(0.35)
+            browser.browse(timeout=0.05)
+            assert browser.probes_sent == 2
+        finally:
+            responder.close()
+            
+    def test_ignores_noise(self):
+        """Test stray datagrams neither get answers nor break browsing."""
+        responder = DiscoveryResponder(game_port=6000, name='C', port=0)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.sendto(b'hello', ('127.0.0.1', responder.port))
+            time.sleep(0.05)
+            responder.handle()
+        assert responder.answered == 0
+        responder.close()
+        assert HostBrowser._parse_answer(b'NUMBERS-GAME/HOST/1 {bad', '1.2.3.4') is None
+        
+    @pytest.mark.parametrize('threaded', [True, False])
+    def test_host_advertises_until_joined(self, threaded):
+        """Test a hosting manager can be joined without an address."""
+        host_rec, join_rec = Recorder(), Recorder()
+        host = NetworkManager(host_rec.callbacks(), threaded=threaded)
+        host.DISCOVERY_PORT = 0
+        join = NetworkManager(join_rec.callbacks())
+        try:
+            assert host.host_game(port=0, name='Host')[0]
+            join.browser = HostBrowser(port=host.responder.port, targets=('127.0.0.1',))
+            result = []
+            prober = threading.Thread(target=lambda: result.append(join.join_game()))
+            prober.start()
+            while prober.is_alive():
+                if not threaded:
+                    host.pump(0.01)
+                else:
+                    time.sleep(0.01)
+            assert result == [(True, "Connected successfully")]
+            if not threaded:
+                TestPumpMode.pump_until((host,), lambda: host_rec.events)
+            host_rec.wait_for(lambda: host_rec.events)
+            assert host.responder is None
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    def test_join_without_hosts(self):
+        """Test joining with nobody advertising fails cleanly."""
+        join = NetworkManager(Recorder().callbacks())
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as quiet:
+            quiet.bind(('127.0.0.1', 0))
+            join.browser = HostBrowser(port=quiet.getsockname()[1], targets=('127.0.0.1',))
+            assert join.join_game() == (False, "No games found on the LAN")
+            
+    def test_local_ip(self):
+        """Test the local address is a dotted quad found without DNS or internet."""
+        assert len(local_ip().split('.')) == 4
+
+
+class TestRateLimiter:
+    """Tests for flood protection."""
+    
+    def test_burst_then_refill(self):
+        """Test a bucket allows its burst, then refills at its rate."""
+        limiter = RateLimiter({'GUESS': (2.0, 3)})
+        assert [limiter.check('GUESS', now=0.0) for _ in range(4)] == [ALLOW, ALLOW, ALLOW, DROP]
+        assert limiter.check('GUESS', now=0.5) == ALLOW
+        assert limiter.check('GUESS', now=0.5) == DROP
+        # Other types have their own bucket
+        assert limiter.check('NAME', now=0.5) == ALLOW
+        stats = limiter.stats()
+        assert stats['limited'] == 2
+        assert stats['limited_by_type'] == {'GUESS': 2}
+        
+    def test_unknown_types_share_one_bucket(self):
+        """Test made-up message types are limited together, not each afresh."""
+        limiter = RateLimiter({'GUESS': (2.0, 3)}, default=(1.0, 4))
+        verdicts = [limiter.check(f'X{i}', now=0.0) for i in range(6)]
+        assert verdicts == [ALLOW] * 4 + [DROP] * 2
+        assert limiter.check('NAME', now=0.0) == ALLOW
+        assert len(limiter._buckets) == 2
+        assert limiter.stats()['limited_by_type'] == {OTHER_TYPES: 2}
+        
+    def test_sustained_flood_disconnects(self):
+        """Test a peer that keeps flooding after being limited is cut off."""
+        limiter = RateLimiter({'GUESS': (1.0, 1)}, abuse_rate=1.0, abuse_burst=5)
+        verdicts = [limiter.check('GUESS', now=0.0) for _ in range(7)]
+        assert verdicts == [ALLOW] + [DROP] * 5 + [DISCONNECT]
+        assert limiter.disconnects == 1
+        limiter.reset()
+        assert limiter.check('GUESS', now=time.monotonic()) == ALLOW
+        
+    def test_host_drops_flood_and_disconnects(self):
+        """Test a flooding joiner is limited, then dropped without resume."""
+        host, host_rec, join, join_rec = connect_pair()
+        try:
+            host.send('NAME', 'h')
+            join.send('NAME', 'j')
+            for i in range(3000):
+                join.send('GUESS', str(10000 + i % 90000))
+            host_rec.wait_for(lambda: any(e[0] == 'disconnected' for e in host_rec.events))
+            guesses = [m for m in host_rec.messages if m[0] == 'GUESS']
+            limit = host.rate_limiter.limits['GUESS'][1]
+            assert limit <= len(guesses) < limit + 10
+            assert 'flooded GUESS' in host_rec.events[-1][1]
+            assert not any(e[0] == 'reconnecting' for e in host_rec.events)
+            stats = host.rate_limiter.stats()
+            assert stats['disconnects'] == 1
+            assert stats['limited_by_type']['GUESS'] > 0
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    def test_oversized_frame_disconnects(self):
+        """Test a frame over MAX_MESSAGE_SIZE is refused before it is buffered."""
+        rec = Recorder()
+        host = NetworkManager(rec.callbacks())
+        host.host_game(port=0)
+        peer = socket.create_connection(('127.0.0.1', host.port))
+        try:
+            rec.wait_for(lambda: rec.events)
+            peer.sendall((host.MAX_MESSAGE_SIZE + 1).to_bytes(4, 'big') + b'x' * 64)
+            rec.wait_for(lambda: len(rec.events) == 2)
+            assert rec.events[1][0] == 'disconnected'
+            assert 'Protocol error' in rec.events[1][1]
+            assert host.rate_limiter.frame_errors == 1
+        finally:
+            peer.close()
+            host.disconnect()
+
+
+class TestNetworkMetrics:
+    """Tests for traffic counters and handler latency histograms."""
+    
+    def test_histogram(self):
+        """Test bucketed percentiles bound the true values from above."""
+        hist = LatencyHistogram()
+        for ms in range(1, 101):
+            hist.record(ms / 1000)
+        assert 0.050 <= hist.percentile(50) < 0.1
+        assert 0.099 <= hist.percentile(99) <= 0.2
+        snap = hist.snapshot()
+        assert snap['count'] == 100
+        assert snap['max_ms'] == pytest.approx(100)
+        assert snap['mean_ms'] == pytest.approx(50.5)
+        assert LatencyHistogram().percentile(50) == 0.0
+        
+    def test_manager_counts_traffic(self, tmp_path):
+        """Test per-type counts and bytes match in both directions, with handler timings."""
+        host, host_rec, join, join_rec = connect_pair()
+        try:
+            host.send('NAME', 'h')
+            join.send('NAME', 'j')
+            for i in range(5):
+                join.send('GUESS', str(12345 + i))
+            host_rec.wait_messages(6)
+            snap = host.metrics.snapshot()
+            sent = join.metrics.snapshot()['sent']
+            assert snap['received']['GUESS'] == sent['GUESS']
+            assert snap['received']['GUESS']['count'] == 5
+            assert snap['received']['NAME'] == sent['NAME']
+            assert snap['handler_latency']['GUESS']['count'] == 5
+            assert snap['sent']['NAME']['count'] == 1
+            assert 'outbox' in snap and 'rtt' in snap and 'rate_limiter' in snap
+            
+            path = tmp_path / 'metrics.jsonl'
+            host.metrics.dump(str(path))
+            host.metrics.dump(str(path))
+            lines = path.read_text().splitlines()
+            assert len(lines) == 2
+            assert json.loads(lines[1])['received']['GUESS']['count'] == 5
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    def test_decode_errors_and_disconnects(self):
+        """Test undecodable payloads are counted instead of printed."""
+        rec = Recorder()
+        host = NetworkManager(rec.callbacks())
+        host.host_game(port=0)
+        peer = socket.create_connection(('127.0.0.1', host.port))
+        try:
+            peer.sendall(b'{not json|||{"type": "NAME", "data": "a"}|||')
+            rec.wait_messages(1)
+            assert host.metrics.decode_errors == 1
+            assert host.metrics.last_decode_error == b'{not json'
+            peer.close()
+            rec.wait_for(lambda: len(rec.events) == 2)
+            assert host.metrics.disconnects == 1
+        finally:
+            host.disconnect()
+            
+    def test_periodic_dump(self, tmp_path):
+        """Test start_dump appends snapshots until stopped."""
+        metrics = NetworkMetrics()
+        metrics.record(SENT, 'GUESS', 10)
+        path = tmp_path / 'dump.jsonl'
+        metrics.start_dump(str(path), interval=0.02)
+        deadline = time.time() + 5
+        while (not path.exists() or len(path.read_text().splitlines()) < 2) and time.time() < deadline:
+            time.sleep(0.01)
+        metrics.stop_dump()
+        assert json.loads(path.read_text().splitlines()[0])['sent']['GUESS'] == {'count': 1, 'bytes': 10}
+        
+    def test_unknown_types_counted_together(self):
+        """Test made-up message types share one counter and one histogram."""
+        metrics = NetworkMetrics()
+        for i in range(100):
+            metrics.record(RECEIVED, f'X{i}', 3)
+            metrics.record_handler(f'X{i}', 0.001)
+        metrics.record(RECEIVED, 'GUESS', 5)
+        snap = metrics.snapshot()
+        assert snap['received'] == {OTHER_TYPES: {'count': 100, 'bytes': 300},
+                                    'GUESS': {'count': 1, 'bytes': 5}}
+        assert list(snap['handler_latency']) == [OTHER_TYPES]
+        
+    def test_overhead(self):
+        """Test recording stays in the microsecond range."""
+        metrics = NetworkMetrics()
+        n = 100000
+        start = time.perf_counter()
+        for _ in range(n):
+            metrics.record(RECEIVED, 'GUESS', 12)
+            metrics.record_handler('GUESS', 0.0001)
+        per_message = (time.perf_counter() - start) / n
+        assert metrics.totals(RECEIVED) == {'count': n, 'bytes': 12 * n}
+        assert per_message < 50e-6
+        print(f"\n{per_message * 1e6:.2f} us per message recorded")
+
+
+class TestLoopbackTransport:
+    """Tests for in-process connections and bot matches."""
+    
+    def loopback_pair(self, threaded: bool = False, **kwargs):
+        host_rec, join_rec = Recorder(), Recorder()
+        host = NetworkManager(host_rec.callbacks(), threaded=threaded, **kwargs)
+        join = NetworkManager(join_rec.callbacks(), threaded=threaded, **kwargs)
+        a, b = LoopbackTransport.pair()
+        host.connect_transport(a, host=True)
+        join.connect_transport(b)
+        return host, host_rec, join, join_rec
+        
+    def pump_until(self, predicate, *managers, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            assert time.monotonic() < deadline, "timed out"
+            for manager in managers:
+                manager.pump()
+                
+    def test_transport_order_and_close(self):
+        """Test payloads arrive in order and are still delivered after close."""
+        a, b = LoopbackTransport.pair()
+        assert a.send(b'one') and a.send(b'two')
+        assert b.recv(timeout=0) == b'one'
+        a.close()
+        assert not a.send(b'three')
+        assert not b.closed
+        assert b.poll() == [b'two']
+        assert b.closed
+        assert b.recv(timeout=0) is None
+        
+    def test_pump_mode_exchange(self):
+        """Test messages and callbacks over a pumped loopback pair."""
+        host, host_rec, join, join_rec = self.loopback_pair()
+        try:
+            assert host_rec.events == [] and join_rec.events == []
+            join.send('NAME', 'j')
+            join.send('GUESS', '12345')
+            host.send('RESULT', {'guess': '12345', 'count': 2, 'place': 1})
+            self.pump_until(lambda: len(host_rec.messages) == 2 and join_rec.messages, host, join)
+            assert host_rec.events == [('connected', 'Player joined (loopback)')]
+            assert host_rec.messages == [('NAME', 'j'), ('GUESS', '12345')]
+            assert join_rec.messages == [('RESULT', {'guess': '12345', 'count': 2, 'place': 1})]
+            assert host.received_count == 2
+            assert host.metrics.snapshot()['received']['GUESS'] == join.metrics.snapshot()['sent']['GUESS']
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    @pytest.mark.parametrize('threaded', [True, False])
+    def test_disconnect_reaches_peer(self, threaded):
+        """Test closing one end reports a lost connection on the other."""
+        host, host_rec, join, join_rec = self.loopback_pair(threaded=threaded)
+        try:
+            join.send('NAME', 'j')
+            join.disconnect()
+            if threaded:
+                host_rec.wait_for(lambda: len(host_rec.events) == 2)
+            else:
+                self.pump_until(lambda: len(host_rec.events) == 2, host)
+            assert host_rec.messages == [('NAME', 'j')]
+            assert host_rec.events[1] == ('disconnected', 'Connection lost')
+            assert not host.online
+            assert not host.send('NAME', 'h')
+        finally:
+            host.disconnect()
+            
+    def test_rate_limit_applies(self):
+        """Test a flood over loopback is limited and disconnected like over TCP."""
+        host, host_rec, join, join_rec = self.loopback_pair(
+            rate_limiter=RateLimiter({'GUESS': (1.0, 5)}, abuse_rate=1.0, abuse_burst=10)
+        )
+        try:
+            for i in range(50):
+                join.send('GUESS', str(10000 + i))
+            self.pump_until(lambda: len(host_rec.events) == 2, host)
+            assert len(host_rec.messages) == 5
+            assert 'flooded GUESS' in host_rec.events[1][1]
+        finally:
+            join.disconnect()
+            host.disconnect()
+            
+    def test_bot_match_threaded(self):
+        """Test two bots finish a match on threaded managers."""
+        pool = all_numbers(4)[:30]
+        outcomes = play_loopback_match(BotPlayer('a', 4, pool), BotPlayer('b', 4, pool), threaded=True)
+        assert outcomes in ((WIN, LOSS), (LOSS, WIN), (DRAW, DRAW))
+        
+    def test_bot_pool_must_match_digits(self):
+        """Test a pool of the wrong length is rejected."""
+        with pytest.raises(ValueError):
+            BotPlayer('a', 5, all_numbers(4))
+            
+    def test_many_bot_matches(self):
+        """Test a thousand pumped bot matches all end consistently."""
+        rng = random.Random(7)
+        pool = all_numbers(4)[:20]
+        outcomes = {}
+        games = 1000
+        start = time.perf_counter()
+        for i in range(games):
+            host, joiner = BotPlayer('h', 4, pool, rng), BotPlayer('j', 4, pool, rng)
+            result = play_loopback_match(host, joiner)
+            outcomes[result] = outcomes.get(result, 0) + 1
+            assert joiner.opponent_name == 'h' and host.opponent_name == 'j'
+        rate = games / (time.perf_counter() - start)
+        assert set(outcomes) <= {(WIN, LOSS), (LOSS, WIN), (DRAW, DRAW)}
+        assert sum(outcomes.values()) == games
+        print(f"\n{rate:.0f} games/sec: {outcomes}")
+
+
+class TestRttStats:
+    """Tests for RTT tracking."""
+    
+    def test_ewma_and_percentiles(self):
+        """Test the smoothed estimate and percentiles."""
+        stats = RttStats(alpha=0.5)
+        for rtt in (0.010, 0.020, 0.030, 0.040, 1.0):
+            stats.add(rtt)
+        assert stats.ewma == pytest.approx(0.5 * 1.0 + 0.25 * 0.04 + 0.125 * 0.03 + 0.0625 * 0.02 + 0.0625 * 0.01)
+        assert stats.percentile(50) == 0.030
+        assert stats.percentile(99) == 1.0
+        assert stats.summary().startswith("RTT: ")
+        
+    def test_empty(self):
+        """Test an empty tracker reports no estimate."""
+        stats = RttStats()
+        assert stats.percentile(50) is None
+        assert stats.summary() == "RTT: --"
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
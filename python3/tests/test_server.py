@@ -0,0 +1,674 @@
+"""Tests for the asyncio match server."""
+
+import asyncio
+import pytest
+import socket
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numbers_game.core import GameEngine
+from numbers_game.network.bots import BOT_LIMIT
+from numbers_game.network.loadgen import percentile, run_local
+from numbers_game.network.matchmaking import Matchmaker
+from numbers_game.network.ratelimit import RateLimiter
+from numbers_game.network.scoring import EnginePool
+from numbers_game.network.server import MATCH_HISTORY, MatchServer
+from numbers_game.network.framing import FrameBuffer
+from numbers_game.network.protocol import CAPABILITIES, decode_message, encode_message
+
+
+class Client:
+    """Minimal asyncio client speaking the NetworkManager protocol.
+    
+    A legacy client sends and expects only '|||'-separated JSON; a modern
+    one advertises all capabilities and uses frames and the binary codec.
+    """
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, modern: bool) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.modern = modern
+        self.buffer = FrameBuffer()
+        self.pending = []
+        
+    @classmethod
+    async def connect(cls, port: int, modern: bool = False) -> 'Client':
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        return cls(reader, writer, modern)
+        
+    def send(self, msg_type: str, data=None) -> None:
+        if msg_type == 'NAME':
+            caps = CAPABILITIES if self.modern else None
+            self.writer.write(encode_message(msg_type, data, caps=caps))
+        else:
+            self.writer.write(encode_message(msg_type, data, framed=self.modern, binary=self.modern))
+            
+    async def recv(self):
+        while not self.pending:
+            data = await asyncio.wait_for(self.reader.read(65536), timeout=10)
+            assert data, "connection closed"
+            if not self.modern:
+                assert data[0] == ord('{'), "legacy client got a non-legacy message"
+            self.buffer.feed(data)
+            self.pending.extend(decode_message(p) for p in self.buffer.messages())
+        msg = self.pending.pop(0)
+        return msg['type'], msg['data']
+        
+    async def expect(self, msg_type: str):
+        got_type, data = await self.recv()
+        assert got_type == msg_type, f"expected {msg_type}, got {got_type}"
+        return data
+
+
+async def play_match(port: int, index: int, digit_count: int, modern=(False, False)) -> None:
+    """Connect two clients and play a short match through the server."""
+    a = await Client.connect(port, modern[0])
+    b = await Client.connect(port, modern[1])
+    a.send('NAME', f'a{index}')
+    b.send('NAME', f'b{index}')
+    assert await a.expect('NAME') == f'b{index}'
+    assert await b.expect('NAME') == f'a{index}'
+    assert await a.expect('SETUP_REQ') == digit_count
+    assert await b.expect('SETUP_REQ') == digit_count
+    
+    secret_b = GameEngine(digit_count)
+    a.send('SECRET_SET', True)
+    b.send('SECRET_SET', True)
+    await a.expect('SECRET_SET')
+    await b.expect('SECRET_SET')
+    assert await a.expect('START') == digit_count
+    assert await b.expect('START') == digit_count
+    
+    # a guesses b's secret; b scores it
+    for guess in (GameEngine(digit_count).num, secret_b.num):
+        a.send('GUESS', str(guess))
+        assert await b.expect('GUESS') == str(guess)
+        count, place = secret_b.compare(guess)
+        b.send('RESULT', {'guess': str(guess), 'count': count, 'place': place})
+        result = await a.expect('RESULT')
+        assert (result['count'], result['place']) == (count, place)
+    assert place == digit_count
+    
+    a.writer.close()
+    assert await b.expect('DISCONNECT') == "Opponent left"
+    b.writer.close()
+
+
+async def play_bot(port: int, name: str, digit_count: int, guesses: int = 3) -> str:
+    """Play one side of a match with scripted guesses; return the opponent's name."""
+    client = await Client.connect(port)
+    client.send('NAME', name)
+    opponent = await client.expect('NAME')
+    assert await client.expect('SETUP_REQ') == digit_count
+    secret = GameEngine(digit_count)
+    client.send('SECRET_SET', True)
+    
+    sent = results = answered = 0
+    while results < guesses or answered < guesses:
+        msg_type, data = await client.recv()
+        if msg_type == 'START':
+            assert data == digit_count
+            client.send('GUESS', str(GameEngine(digit_count).num))
+            sent += 1
+        elif msg_type == 'GUESS':
+            count, place = secret.compare(int(data))
+            client.send('RESULT', {'guess': data, 'count': count, 'place': place})
+            answered += 1
+        elif msg_type == 'RESULT':
+            results += 1
+            if sent < guesses:
+                client.send('GUESS', str(GameEngine(digit_count).num))
+                sent += 1
+        else:
+            assert msg_type == 'SECRET_SET'
+    client.writer.close()
+    return opponent
+
+
+async def run_matches(count: int) -> MatchServer:
+    """Run `count` simultaneous matches of scripted bots against one server."""
+    server = MatchServer('127.0.0.1', 0, digit_count=4)
+    _, port = await server.start()
+    names = [f'bot{i}' for i in range(2 * count)]
+    try:
+        # Start every bot before any finishes, so all matches are live at once
+        opponents = await asyncio.gather(*(play_bot(port, name, 4) for name in names))
+    finally:
+        await server.stop()
+    pairs = dict(zip(names, opponents))
+    assert all(pairs[opp] == name for name, opp in pairs.items())
+    return server
+
+
+class TestMatchServer:
+    """Tests for pairing and relaying in the match server."""
+    
+    @pytest.mark.parametrize('modern', [(False, False), (True, True), (True, False)])
+    def test_single_match(self, modern):
+        """Test one full match through the server, for legacy and modern clients."""
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=4)
+            _, port = await server.start()
+            await play_match(port, 0, 4, modern)
+            await server.stop()
+            return server
+        server = asyncio.run(scenario())
+        assert server.matches_started == 1
+        assert server.matches_finished == 1
+        
+    def test_name_before_pairing(self):
+        """Test a name sent while waiting reaches the opponent once paired."""
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0)
+            _, port = await server.start()
+            a = await Client.connect(port)
+            a.send('NAME', 'early')
+            await asyncio.sleep(0.05)
+            b = await Client.connect(port)
+            assert await b.expect('NAME') == 'early'
+            b.send('NAME', 'late')
+            assert await a.expect('NAME') == 'late'
+            assert await a.expect('SETUP_REQ') == server.digit_count
+            a.writer.close()
+            b.writer.close()
+            await server.stop()
+        asyncio.run(scenario())
+        
+    def test_load_many_simultaneous_matches(self):
+        """Load test: hundreds of concurrent matches on one event loop."""
+        matches = 250
+        start = time.perf_counter()
+        server = asyncio.run(run_matches(matches))
+        elapsed = time.perf_counter() - start
+        stats = server.stats()
+        assert stats['matches_started'] == matches
+        assert stats['matches_finished'] == matches
+        assert stats['connections_total'] == 2 * matches
+        print(f"\n{matches} simultaneous matches in {elapsed:.2f}s")
+
+
+
+class TestServerScoring:
+    """Tests for guesses scored by the server from players' secrets."""
+    
+    def test_engine_pool(self):
+        """Test engines are validated, reused and counted."""
+        pool = EnginePool(max_idle=1)
+        assert pool.acquire(4, '1123') is None
+        engine = pool.acquire(4, '1234')
+        assert engine.compare(1243) == (4, 2)
+        pool.release(engine)
+        assert pool.acquire(4, '5678') is engine
+        assert engine.compare(5678) == (4, 4)
+        assert pool.stats() == {'in_use': 1, 'idle': 0, 'created': 1, 'reused': 2, 'rejected': 1}
+        
+    def test_scored_and_relayed_directions(self):
+        """Test a secret held by the server is scored there, and a kept one is relayed."""
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=4)
+            _, port = await server.start()
+            a = await Client.connect(port, modern=True)
+            b = await Client.connect(port)
+            a.send('NAME', 'a')
+            b.send('NAME', 'b')
+            await a.expect('NAME')
+            await b.expect('NAME')
+            await a.expect('SETUP_REQ')
+            await b.expect('SETUP_REQ')
+            
+            # An invalid secret is refused and asked for again
+            a.send('SECRET_SET', '1123')
+            assert await a.expect('SETUP_REQ') == 4
+            a.send('SECRET_SET', '1234')
+            b.send('SECRET_SET', True)
+            assert await b.expect('SECRET_SET') is True
+            assert await a.expect('SECRET_SET') is True
+            await a.expect('START')
+            await b.expect('START')
+            
+            # b guesses a's secret: the server answers both at once
+            b.send('GUESS', '1243')
+            assert await b.expect('RESULT') == {'guess': '1243', 'count': 4, 'place': 2}
+            assert await a.expect('OPPONENT_RESULT') == {'guess': '1243', 'count': 4, 'place': 2}
+            # a cannot answer for its own secret any more
+            a.send('RESULT', {'guess': '1243', 'count': 4, 'place': 4})
+            
+            # a guesses b's secret: b still answers
+            a.send('GUESS', '5678')
+            assert await b.expect('GUESS') == '5678'
+            b.send('RESULT', {'guess': '5678', 'count': 0, 'place': 0})
+            assert await a.expect('RESULT') == {'guess': '5678', 'count': 0, 'place': 0}
+            
+            stats = server.stats()
+            assert stats['guesses_scored'] == 1
+            assert stats['engines_in_use'] == 1
+            a.writer.close()
+            await b.expect('DISCONNECT')
+            b.writer.close()
+            await server.stop()
+            return server
+        server = asyncio.run(scenario())
+        assert server.stats()['engines_in_use'] == 0
+        
+    def test_bad_guess_answered_with_error(self):
+        """Test malformed guesses get an ERROR and leave the connection usable."""
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=4)
+            _, port = await server.start()
+            a = await Client.connect(port, modern=True)
+            b = await Client.connect(port, modern=True)
+            a.send('NAME', 'a')
+            b.send('NAME', 'b')
+            for c in (a, b):
+                await c.expect('NAME')
+                await c.expect('SETUP_REQ')
+            # Non-ASCII digits pass str.isdigit() but are not valid numbers
+            a.send('SECRET_SET', '1\u00b234')
+            assert await a.expect('SETUP_REQ') == 4
+            a.send('SECRET_SET', '1234')
+            b.send('SECRET_SET', '5678')
+            for c in (a, b):
+                await c.expect('SECRET_SET')
+                await c.expect('START')
+                
+            for bad in ('12\u00b34', '\u0661\u0662\u0663\u0664', {'guess': 1}, None, '9' * 5000):
+                b.send('GUESS', bad)
+                assert 'Invalid guess' in await b.expect('ERROR')
+            b.send('GUESS', '1243')
+            assert await b.expect('RESULT') == {'guess': '1243', 'count': 4, 'place': 2}
+            assert server.stats()['guesses_scored'] == 1
+            a.writer.close()
+            b.writer.close()
+            await server.stop()
+        asyncio.run(scenario())
+
+
+class TestServerRateLimit:
+    """Tests for flood protection on player connections."""
+    
+    def test_guess_flood_is_limited(self):
+        """Test guesses over the limit are ignored and a flooder is closed."""
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=4, rate_limiter=lambda: RateLimiter(
+                {'GUESS': (1.0, 5)}, abuse_rate=1.0, abuse_burst=10
+            ))
+            _, port = await server.start()
+            a = await Client.connect(port, modern=True)
+            b = await Client.connect(port, modern=True)
+            a.send('NAME', 'a')
+            b.send('NAME', 'b')
+            for c in (a, b):
+                await c.expect('NAME')
+                await c.expect('SETUP_REQ')
+            a.send('SECRET_SET', '1234')
+            b.send('SECRET_SET', '5678')
+            for c in (a, b):
+                await c.expect('SECRET_SET')
+                await c.expect('START')
+                
+            # The burst is scored, the rest is dropped without a reply
+            for _ in range(10):
+                b.send('GUESS', '1243')
+            for _ in range(5):
+                await b.expect('RESULT')
+                await a.expect('OPPONENT_RESULT')
+            b.send('PING', 1)
+            assert await b.expect('PONG') == 1
+            assert server.stats()['guesses_scored'] == 5
+            
+            # Still flooding after being limited: closed, and the match ends
+            for _ in range(20):
+                b.send('GUESS', '1243')
+            assert await a.expect('DISCONNECT') == "Opponent left"
+            stats = server.stats()
+            a.writer.close()
+            b.writer.close()
+            await server.stop()
+            return stats
+            
+        stats = asyncio.run(scenario())
+        assert stats['guesses_scored'] == 5
+        assert stats['flooders_closed'] == 1
+        assert stats['messages_limited'] > 10
+
+
+class TestLoadGenerator:
+    """Tests for the bot load generator."""
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([7.0], 99) == 7.0
+        assert percentile([], 50) == 0.0
+        
+    @pytest.mark.parametrize('binary, scoring', [(True, True), (False, True), (True, False)])
+    def test_local_run(self, binary, scoring):
+        """Test a loopback run completes every match and reports latencies."""
+        report = asyncio.run(run_local(clients=20, guesses=5, digit_count=4, binary=binary, scoring=scoring))
+        assert report.errors == []
+        assert report.completed == 20
+        assert len(report.latencies) == 20 * 5
+        if scoring:
+            # Each bot: NAME, SECRET_SET, 5 GUESS sent; NAME, SETUP_REQ,
+            # SECRET_SET, START, 5 RESULT, 5 OPPONENT_RESULT received
+            assert report.messages == 20 * (7 + 14)
+            assert report.server_stats['guesses_scored'] == 20 * 5
+        else:
+            # Each bot: NAME, SECRET_SET, 5 GUESS, 5 RESULT sent; NAME, SETUP_REQ,
+            # SECRET_SET, START, 5 GUESS, 5 RESULT received
+            assert report.messages == 20 * (12 + 14)
+            assert report.server_stats['guesses_scored'] == 0
+        assert report.server_stats['engines_in_use'] == 0
+        assert report.server_stats['matches_started'] == 10
+        summary = report.summary()
+        assert summary['messages_per_sec'] > 0
+        assert 0 < summary['guess_p50_ms'] <= summary['guess_p99_ms']
+        print(f"\n{report.format()}")
+
+
+
+class TestMatchmaker:
+    """Tests for the skill-based matchmaking queue."""
+    
+    def test_close_ratings_pair_at_once(self):
+        """Test players within the base tolerance are paired on enqueue."""
+        mm = Matchmaker(base_tolerance=100)
+        assert mm.enqueue('a', 5, 1500, now=0.0) is None
+        assert mm.enqueue('b', 5, 1580, now=0.0) == ('a', 'b')
+        assert len(mm) == 0
+        
+    def test_tolerance_widens_with_wait(self):
+        """Test distant ratings wait, then pair once tolerance has grown."""
+        mm = Matchmaker(base_tolerance=100, widen_per_sec=50)
+        mm.enqueue('a', 5, 1500, now=0.0)
+        assert mm.enqueue('b', 5, 1800, now=0.0) is None
+        assert mm.sweep(now=3.0) == []
+        assert mm.sweep(now=4.0) == [('a', 'b')]
+        stats = mm.stats(now=4.0)
+        assert stats.matched == 1
+        assert stats.queue_length == 0
+        assert stats.wait_max == 4.0
+        
+    def test_max_tolerance(self):
+        """Test the tolerance stops growing at max_tolerance."""
+        mm = Matchmaker(base_tolerance=100, widen_per_sec=50, max_tolerance=200)
+        mm.enqueue('a', 5, 1000, now=0.0)
+        mm.enqueue('b', 5, 1500, now=0.0)
+        assert mm.sweep(now=1000.0) == []
+        
+    def test_digit_counts_are_separate(self):
+        """Test players asking for different difficulties never meet."""
+        mm = Matchmaker()
+        mm.enqueue('four', 4, 1500, now=0.0)
+        assert mm.enqueue('six', 6, 1500, now=0.0) is None
+        assert mm.queue_length(4) == mm.queue_length(6) == 1
+        assert mm.stats(now=2.0).queued == {4: 1, 6: 1}
+        assert mm.stats(now=2.0).longest_waiting == 2.0
+        
+    def test_closest_rating_wins(self):
+        """Test a newcomer is paired with the nearer of its two neighbours."""
+        mm = Matchmaker(base_tolerance=100)
+        mm.enqueue('low', 5, 1000, now=0.0)
+        mm.enqueue('high', 5, 1300, now=0.0)
+        assert mm.enqueue('new', 5, 1220, now=0.0) == ('high', 'new')
+        assert 'low' in mm
+        
+    def test_remove(self):
+        """Test a removed player (e.g. disconnected) is never paired."""
+        mm = Matchmaker()
+        mm.enqueue('a', 5, 1500, now=0.0)
+        assert mm.remove('a')
+        assert not mm.remove('a')
+        assert mm.enqueue('b', 5, 1500, now=0.0) is None
+        
+    def test_requeue_replaces_entry(self):
+        """Test enqueueing a waiting player again moves them to the new queue."""
+        mm = Matchmaker()
+        mm.enqueue('a', 5, 1500, now=0.0)
+        mm.enqueue('a', 4, 1500, now=0.0)
+        assert len(mm) == 1
+        assert mm.queue_length(5) == 0
+        
+    def test_many_players(self):
+        """Test queueing tens of thousands of spread-out players stays fast."""
+        mm = Matchmaker(base_tolerance=0.5, widen_per_sec=0)
+        start = time.perf_counter()
+        for i in range(20000):
+            mm.enqueue(i, 5, (i * 7919) % 20000, now=0.0)
+        elapsed = time.perf_counter() - start
+        assert len(mm) == 20000
+        assert mm.enqueue('x', 5, 12345.2, now=0.0) is not None
+        print(f"\n20000 enqueues in {elapsed * 1000:.1f} ms")
+        
+    def test_server_pairs_by_preferences(self):
+        """Test the server queues clients by SETUP_REQ and pairs matching ones."""
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=5, matchmaker=Matchmaker(), sweep_interval=0.01)
+            _, port = await server.start()
+            clients = [await Client.connect(port) for _ in range(3)]
+            for name, client, digits in zip('abc', clients, (6, 4, 6)):
+                client.send('SETUP_REQ', {'digit_count': digits, 'rating': 1500})
+                client.send('NAME', name)
+            a, b, c = clients
+            assert await a.expect('NAME') == 'c'
+            assert await c.expect('NAME') == 'a'
+            assert await a.expect('SETUP_REQ') == 6
+            assert await c.expect('SETUP_REQ') == 6
+            assert server.matchmaking_stats().queued == {4: 1}
+            assert server.stats()['waiting_players'] == 1
+            for client in clients:
+                client.writer.close()
+            await server.stop()
+        asyncio.run(scenario())
+        
+    def test_non_finite_rating_rejected(self):
+        """Test NaN and infinite ratings cannot enter the sorted queue."""
+        mm = Matchmaker()
+        mm.enqueue('a', 5, 1500, now=0.0)
+        for bad in (float('nan'), float('inf'), '-inf'):
+            with pytest.raises(ValueError):
+                mm.enqueue('bad', 5, bad, now=0.0)
+        assert mm.enqueue('b', 5, 1510, now=0.0) == ('a', 'b')
+        
+    def test_server_rejects_bad_ratings(self):
+        """Test bad SETUP_REQ ratings get ERROR and are never queued."""
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=5, matchmaker=Matchmaker(), sweep_interval=0.01)
+            _, port = await server.start()
+            bad = await Client.connect(port)
+            bad.send('NAME', 'bad')
+            for rating in ('nan', 'inf', 1e9, -5, [1]):
+                bad.send('SETUP_REQ', {'digit_count': 5, 'rating': rating})
+                assert (await bad.recv())[0] == 'ERROR'
+            # Queued once on NAME at the default rating; the bad requests changed nothing
+            assert server.matchmaker.queue_length(5) == 1
+            good = await Client.connect(port)
+            good.send('SETUP_REQ', {'digit_count': 5, 'rating': 1500})
+            good.send('NAME', 'good')
+            assert await good.expect('NAME') == 'bad'
+            for client in (bad, good):
+                client.writer.close()
+            await server.stop()
+        asyncio.run(scenario())
+        
+    def test_sweep_loop_survives_errors(self):
+        """Test a sweep that raises does not stop later sweeps."""
+        async def scenario():
+            matchmaker = Matchmaker(base_tolerance=0, widen_per_sec=1000)
+            server = MatchServer('127.0.0.1', 0, matchmaker=matchmaker, sweep_interval=0.01)
+            sweep = matchmaker.sweep
+            failures = [RuntimeError('boom')] * 3
+            
+            def flaky_sweep():
+                if failures:
+                    raise failures.pop()
+                return sweep()
+                
+            matchmaker.sweep = flaky_sweep
+            _, port = await server.start()
+            a, b = await Client.connect(port), await Client.connect(port)
+            a.send('SETUP_REQ', {'digit_count': 5, 'rating': 1000})
+            a.send('NAME', 'a')
+            b.send('SETUP_REQ', {'digit_count': 5, 'rating': 1100})
+            b.send('NAME', 'b')
+            assert await a.expect('NAME') == 'b'
+            assert server.sweep_errors == 3
+            for client in (a, b):
+                client.writer.close()
+            await server.stop()
+        asyncio.run(scenario())
+
+
+
+async def start_playing(port: int):
+    """Connect two modern players and take them through setup to START."""
+    a = await Client.connect(port, modern=True)
+    b = await Client.connect(port, modern=True)
+    a.send('NAME', 'a')
+    b.send('NAME', 'b')
+    for client in (a, b):
+        await client.expect('NAME')
+        await client.expect('SETUP_REQ')
+        client.send('SECRET_SET', True)
+    for client in (a, b):
+        await client.expect('SECRET_SET')
+        await client.expect('START')
+    return a, b
+
+
+async def watch(port: int, match_id) -> Client:
+    """Connect a spectator to a match and read the welcome message."""
+    spectator = await Client.connect(port, modern=True)
+    spectator.send('SPECTATE', match_id)
+    info = await spectator.expect('SPECTATE')
+    assert info['players'] == ['a', 'b']
+    return spectator
+
+
+async def collect_events(spectator: Client) -> list:
+    """Read match events until END; return (event, player, data) tuples."""
+    events = []
+    while True:
+        data = await spectator.expect('MATCH_EVENT')
+        events.append((data['event'], data['player'], data['data']))
+        if data['event'] == 'END':
+            return events
+
+
+class TestSpectators:
+    """Tests for spectator fan-out."""
+    
+    def test_hundreds_of_spectators(self):
+        """Test every spectator sees each GUESS/RESULT, encoded once per event."""
+        viewers = 300
+        
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=4)
+            _, port = await server.start()
+            a, b = await start_playing(port)
+            match_id = next(iter(server.matches))
+            spectators = await asyncio.gather(*(watch(port, match_id) for _ in range(viewers)))
+            # A late viewer asking for "the current match" gets the history too
+            spectators.append(await watch(port, None))
+            readers = [asyncio.ensure_future(collect_events(s)) for s in spectators]
+            
+            for guess in ('1234', '5678', '9012'):
+                a.send('GUESS', guess)
+                await b.expect('GUESS')
+                b.send('RESULT', {'guess': guess, 'count': 1, 'place': 0})
+                await a.expect('RESULT')
+            a.writer.close()
+            await b.expect('DISCONNECT')
+            results = await asyncio.gather(*readers)
+            b.writer.close()
+            await server.stop()
+            return server, results
+            
+        server, results = asyncio.run(scenario())
+        expected = results[0]
+        assert [e[0] for e in expected] == ['START'] + ['GUESS', 'RESULT'] * 3 + ['END']
+        assert expected[1] == ('GUESS', 'a', '1234')
+        assert all(events == expected for events in results)
+        stats = server.stats()
+        assert stats['spectators_total'] == viewers + 1
+        assert stats['events_broadcast'] == len(expected)
+        assert stats['spectators_dropped'] == 0
+        assert stats['matches_started'] == 1
+        
+    def test_slow_spectator_is_dropped(self):
+        """Test a viewer that stops reading is cut off without stalling the match."""
+        guesses = 6000
+        
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=4, spectator_buffer_limit=32 * 1024,
+                                 rate_limiter=lambda: RateLimiter({}, BOT_LIMIT))
+            _, port = await server.start()
+            a, b = await start_playing(port)
+            match_id = next(iter(server.matches))
+            fast = await watch(port, match_id)
+            fast_events = asyncio.ensure_future(collect_events(fast))
+            
+            loop = asyncio.get_running_loop()
+            slow = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            slow.setblocking(False)
+            await loop.sock_connect(slow, ('127.0.0.1', port))
+            await loop.sock_sendall(slow, encode_message('SPECTATE', match_id, framed=True))
+            await asyncio.sleep(0.05)
+            
+            for _ in range(0, guesses, 100):
+                a.writer.write(b''.join(
+                    encode_message('GUESS', '1234', framed=True, binary=True) for _ in range(100)
+                ))
+                await asyncio.sleep(0.002)
+            for _ in range(guesses):
+                await b.expect('GUESS')
+            a.writer.close()
+            events = await fast_events
+            slow.close()
+            b.writer.close()
+            await server.stop()
+            return server, events
+            
+        server, events = asyncio.run(scenario())
+        assert server.stats()['spectators_dropped'] == 1
+        assert sum(1 for e in events if e[0] == 'GUESS') == guesses
+        
+    def test_history_is_bounded(self):
+        """Test a long match keeps only the newest events for late viewers."""
+        guesses = MATCH_HISTORY
+        
+        async def scenario():
+            server = MatchServer('127.0.0.1', 0, digit_count=4,
+                                 rate_limiter=lambda: RateLimiter({}, BOT_LIMIT))
+            _, port = await server.start()
+            a, b = await start_playing(port)
+            match = next(iter(server.matches.values()))
+            a.writer.write(b''.join(
+                encode_message('GUESS', str(1000 + i), framed=True, binary=True) for i in range(guesses)
+            ))
+            for _ in range(guesses):
+                await b.expect('GUESS')
+            assert len(match.history) == MATCH_HISTORY
+            late = await watch(port, match.match_id)
+            a.writer.close()
+            events = await collect_events(late)
+            b.writer.close()
+            await server.stop()
+            return events
+            
+        events = asyncio.run(scenario())
+        # START fell out of the replay
+        assert len(events) == MATCH_HISTORY + 1
+        assert events[0] == ('GUESS', 'a', '1000')
+        assert events[-1][0] == 'END'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,125 @@
+"""Tests for seeded simulations and the distributed coordinator."""
+
+import json
+import multiprocessing
+import pytest
+import socket
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numbers_game.sim.solver import all_secrets, play_game, simulate_range
+from numbers_game.sim.distributed import Coordinator, run_local, run_worker
+
+
+def _wait_for(condition, timeout: float = 10.0) -> None:
+    """Poll until condition() is true."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestSolver:
+    """Tests for seeded self-play."""
+    
+    def test_game_depends_only_on_seed(self):
+        """Test a seed always plays out the same way."""
+        assert [play_game(s, 4) for s in range(20)] == [play_game(s, 4) for s in range(20)]
+        
+    def test_histogram_counts_every_game(self):
+        """Test a range's histogram covers each of its games once."""
+        histogram = simulate_range(100, 160, 4)
+        assert sum(histogram.values()) == 60
+        assert min(histogram) >= 1 and max(histogram) <= 12
+        
+    def test_secrets_follow_the_rules(self):
+        """Test the candidate secrets have distinct digits and no leading zero."""
+        secrets = all_secrets(4)
+        assert len(secrets) == 9 * 9 * 8 * 7
+        assert all(s[0] != '0' and len(set(s)) == 4 for s in secrets)
+
+
+class TestDistributed:
+    """Tests for the coordinator and its workers over localhost TCP."""
+    
+    def test_workers_match_local_run(self):
+        """Test worker processes produce the single-process histogram."""
+        assert run_local(240, 4, workers=3, chunk_size=40, report_every=10) == simulate_range(0, 240, 4)
+        
+    def test_dead_worker_range_reassigned(self):
+        """Test a killed worker's unreported seeds go to another worker, once."""
+        coordinator = Coordinator(200, 4, port=0, chunk_size=100)
+        host, port = coordinator.start()
+        try:
+            doomed = multiprocessing.Process(target=run_worker, args=(host, port, 'doomed', 5), daemon=True)
+            doomed.start()
+            _wait_for(lambda: coordinator.games_done >= 5)
+            doomed.kill()
+            doomed.join()
+            _wait_for(lambda: coordinator.stats()['workers'] == 0)
+            
+            survivors = [
+                multiprocessing.Process(target=run_worker, args=(host, port, f'w{i}', 20), daemon=True)
+                for i in range(2)
+            ]
+            for p in survivors:
+                p.start()
+            assert coordinator.wait(30)
+            for p in survivors:
+                p.join(5)
+        finally:
+            coordinator.stop()
+        assert coordinator.reassigned == 1
+        assert coordinator.histogram == simulate_range(0, 200, 4)
+        
+    def test_silent_worker_lease_expires(self):
+        """Test a lease without reports is taken back and its late report refused."""
+        coordinator = Coordinator(60, 4, port=0, chunk_size=30, lease_timeout=0.2)
+        host, port = coordinator.start()
+        try:
+            hung = socket.create_connection((host, port))
+            rfile = hung.makefile('rb')
+            
+            def call(request):
+                hung.sendall(json.dumps(request).encode('utf-8') + b'\n')
+                return json.loads(rfile.readline())
+                
+            lease = call({'op': 'lease', 'worker': 'hung'})
+            time.sleep(0.3)
+            worker = threading.Thread(target=run_worker, args=(host, port, 'ok', 10))
+            worker.start()
+            assert coordinator.wait(30)
+            worker.join(5)
+            late = call({'op': 'report', 'lease': lease['lease'], 'stop': lease['stop'],
+                         'histogram': simulate_range(lease['start'], lease['stop'], 4)})
+            assert late == {'ok': False}
+            assert call({'op': 'lease'}) == {'done': True}
+            hung.close()
+        finally:
+            coordinator.stop()
+        assert coordinator.expired == 1 and coordinator.rejected == 1
+        assert coordinator.histogram == simulate_range(0, 60, 4)
+        
+    def test_mismatched_report_rejected(self):
+        """Test a report that does not continue its lease is an error."""
+        coordinator = Coordinator(10, 4, port=0)
+        host, port = coordinator.start()
+        try:
+            with socket.create_connection((host, port)) as sock, sock.makefile('rb') as rfile:
+                sock.sendall(b'{"op":"lease"}\n')
+                lease = json.loads(rfile.readline())
+                sock.sendall(json.dumps({'op': 'report', 'lease': lease['lease'], 'stop': 5,
+                                         'histogram': {'4': 1}}).encode('utf-8') + b'\n')
+                assert 'error' in json.loads(rfile.readline())
+        finally:
+            coordinator.stop()
+        assert coordinator.games_done == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])